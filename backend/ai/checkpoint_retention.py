@@ -0,0 +1,189 @@
+import asyncio
+import logging
+
+from datetime import datetime, timezone
+from psycopg_pool import AsyncConnectionPool
+from config import settings
+
+
+# Tables written by langgraph's AsyncPostgresSaver. Checkpoint ids are uuid6,
+# so ordering by checkpoint_id is ordering by creation time.
+
+EXPIRE_IDLE_THREADS_SQL = """
+WITH idle AS (
+    SELECT thread_id
+    FROM checkpoints
+    GROUP BY thread_id
+    HAVING max((checkpoint->>'ts')::timestamptz) < now() - make_interval(secs => %(ttl_seconds)s)
+    LIMIT %(batch_size)s
+),
+deleted_writes AS (
+    DELETE FROM checkpoint_writes w USING idle i
+    WHERE w.thread_id = i.thread_id
+    RETURNING 1
+),
+deleted_blobs AS (
+    DELETE FROM checkpoint_blobs b USING idle i
+    WHERE b.thread_id = i.thread_id
+    RETURNING 1
+),
+deleted_checkpoints AS (
+    DELETE FROM checkpoints c USING idle i
+    WHERE c.thread_id = i.thread_id
+    RETURNING 1
+)
+SELECT
+    (SELECT count(*) FROM idle) AS threads,
+    (SELECT count(*) FROM deleted_checkpoints) AS checkpoints,
+    (SELECT count(*) FROM deleted_writes) AS writes,
+    (SELECT count(*) FROM deleted_blobs) AS blobs
+"""
+
+PRUNE_OLD_CHECKPOINTS_SQL = """
+WITH ranked AS (
+    SELECT
+        thread_id,
+        checkpoint_ns,
+        checkpoint_id,
+        row_number() OVER (
+            PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+        ) AS rn
+    FROM checkpoints
+),
+doomed AS (
+    SELECT thread_id, checkpoint_ns, checkpoint_id
+    FROM ranked
+    WHERE rn > %(keep_last)s
+    LIMIT %(batch_size)s
+),
+deleted_writes AS (
+    DELETE FROM checkpoint_writes w USING doomed d
+    WHERE w.thread_id = d.thread_id
+      AND w.checkpoint_ns = d.checkpoint_ns
+      AND w.checkpoint_id = d.checkpoint_id
+    RETURNING 1
+),
+deleted_checkpoints AS (
+    DELETE FROM checkpoints c USING doomed d
+    WHERE c.thread_id = d.thread_id
+      AND c.checkpoint_ns = d.checkpoint_ns
+      AND c.checkpoint_id = d.checkpoint_id
+    RETURNING 1
+)
+SELECT
+    (SELECT count(*) FROM deleted_checkpoints) AS checkpoints,
+    (SELECT count(*) FROM deleted_writes) AS writes
+"""
+
+# A blob is garbage once no remaining checkpoint of its thread references
+# its (channel, version) pair.
+PRUNE_ORPHANED_BLOBS_SQL = """
+WITH settled AS (
+    SELECT thread_id, checkpoint_ns
+    FROM checkpoints
+    GROUP BY thread_id, checkpoint_ns
+    HAVING max((checkpoint->>'ts')::timestamptz) < now() - make_interval(secs => %(grace_seconds)s)
+),
+doomed AS (
+    SELECT b.thread_id, b.checkpoint_ns, b.channel, b.version
+    FROM checkpoint_blobs b
+    JOIN settled s ON s.thread_id = b.thread_id AND s.checkpoint_ns = b.checkpoint_ns
+    WHERE NOT EXISTS (
+        SELECT 1
+        FROM checkpoints c
+        WHERE c.thread_id = b.thread_id
+          AND c.checkpoint_ns = b.checkpoint_ns
+          AND c.checkpoint->'channel_versions'->>b.channel = b.version
+    )
+    LIMIT %(batch_size)s
+),
+deleted_blobs AS (
+    DELETE FROM checkpoint_blobs b USING doomed d
+    WHERE b.thread_id = d.thread_id
+      AND b.checkpoint_ns = d.checkpoint_ns
+      AND b.channel = d.channel
+      AND b.version = d.version
+    RETURNING 1
+)
+SELECT (SELECT count(*) FROM deleted_blobs) AS blobs
+"""
+
+
+retention_stats = {
+    "runs": 0,
+    "threads_expired": 0,
+    "checkpoints_deleted": 0,
+    "writes_deleted": 0,
+    "blobs_deleted": 0,
+    "last_run_at": None,
+    "last_run": None,
+}
+
+
+async def _run_in_batches(pool: AsyncConnectionPool, sql: str, params: dict, size_key: str):
+    totals: dict[str, int] = {}
+    while True:
+        # Each batch is its own short autocommit statement, so chat
+        # requests never wait behind one long-running delete.
+        async with pool.connection() as conn:
+            cursor = await conn.execute(sql, params)  # type: ignore
+            row = await cursor.fetchone()
+
+        for key, value in (row or {}).items():  # type: ignore
+            totals[key] = totals.get(key, 0) + value
+
+        if not row or row[size_key] < params["batch_size"]:  # type: ignore
+            return totals
+        await asyncio.sleep(0)
+
+
+async def prune_checkpoints(
+    pool: AsyncConnectionPool,
+    keep_last: int = settings.CHECKPOINT_KEEP_LAST,
+    ttl_hours: float = settings.CHECKPOINT_THREAD_TTL_HOURS,
+    batch_size: int = settings.CHECKPOINT_PRUNE_BATCH_SIZE,
+) -> dict:
+    expired = await _run_in_batches(
+        pool,
+        EXPIRE_IDLE_THREADS_SQL,
+        {"ttl_seconds": ttl_hours * 3600, "batch_size": batch_size},
+        "threads",
+    )
+    pruned = await _run_in_batches(
+        pool,
+        PRUNE_OLD_CHECKPOINTS_SQL,
+        {"keep_last": keep_last, "batch_size": batch_size},
+        "checkpoints",
+    )
+    orphaned = await _run_in_batches(
+        pool,
+        PRUNE_ORPHANED_BLOBS_SQL,
+        {"grace_seconds": settings.CHECKPOINT_BLOB_GRACE_SECONDS, "batch_size": batch_size},
+        "blobs",
+    )
+
+    reclaimed = {
+        "threads_expired": expired.get("threads", 0),
+        "checkpoints_deleted": expired.get("checkpoints", 0) + pruned.get("checkpoints", 0),
+        "writes_deleted": expired.get("writes", 0) + pruned.get("writes", 0),
+        "blobs_deleted": expired.get("blobs", 0) + orphaned.get("blobs", 0),
+    }
+
+    retention_stats["runs"] += 1
+    for key, value in reclaimed.items():
+        retention_stats[key] += value
+    retention_stats["last_run_at"] = datetime.now(timezone.utc).isoformat()
+    retention_stats["last_run"] = reclaimed
+    return reclaimed
+
+
+async def run_retention_loop(pool: AsyncConnectionPool):
+    while True:
+        try:
+            reclaimed = await prune_checkpoints(pool)
+            logging.info(f"Checkpoint retention reclaimed: {reclaimed}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"Checkpoint retention failed: {str(e)}")
+        await asyncio.sleep(settings.CHECKPOINT_PRUNE_INTERVAL_SECONDS)
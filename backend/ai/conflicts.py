@@ -0,0 +1,194 @@
+"""Conflict detection for planned deadlines against a user's schedule.
+
+Each user's open task deadlines and Pomodoro sessions are loaded once into
+sorted arrays, so checking a whole plan is a handful of vectorized binary
+searches. Indexes are cached per user and dropped whenever a commit touches
+that user's tasks or sessions.
+"""
+
+import uuid
+import asyncio
+import threading
+import numpy as np
+
+from datetime import datetime, timedelta, timezone
+from itertools import chain
+from typing import List, Sequence, TypedDict
+from cachetools import TTLCache
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from config import settings
+
+from db.models import PomodoroSession, Task, TaskStatus, to_naive_utc
+
+
+class Conflict(TypedDict):
+    subtask: int
+    kind: str
+    id: str
+    start: datetime
+    end: datetime
+
+
+def _seconds(values: Sequence[datetime]) -> np.ndarray:
+    # Naive values are UTC, like every column in db.models.
+    return np.array(
+        [to_naive_utc(value).replace(tzinfo=timezone.utc).timestamp() for value in values], dtype=np.float64
+    )
+
+
+def _datetime(seconds: float) -> datetime:
+    return datetime.fromtimestamp(seconds, timezone.utc).replace(tzinfo=None)
+
+
+class ScheduleIndex:
+    """Sorted task deadlines plus Pomodoro intervals sorted by start, with a
+    running maximum of their ends for overlap queries."""
+
+    def __init__(self, tasks: List[tuple[uuid.UUID, datetime]], sessions: List[tuple[uuid.UUID, datetime, datetime]]):
+        tasks = sorted(tasks, key=lambda task: task[1])
+        self.task_ids = [task_id for task_id, _ in tasks]
+        self.due = _seconds([due for _, due in tasks])
+
+        sessions = sorted(sessions, key=lambda session: session[1])
+        self.session_ids = [session_id for session_id, _, _ in sessions]
+        self.starts = _seconds([start for _, start, _ in sessions])
+        self.ends = _seconds([end for _, _, end in sessions])
+        self.max_ends = np.maximum.accumulate(self.ends) if len(self.ends) else self.ends
+
+    def __len__(self):
+        return len(self.due) + len(self.starts)
+
+    def find(self, deadlines: Sequence[datetime], window: timedelta) -> List[Conflict]:
+        if not deadlines or not len(self):
+            return []
+        points = _seconds(deadlines)
+        low, high = points - window.total_seconds(), points + window.total_seconds()
+
+        conflicts: List[Conflict] = []
+        # Tasks due inside [deadline - window, deadline + window].
+        left = np.searchsorted(self.due, low, side="left")
+        right = np.searchsorted(self.due, high, side="right")
+        for i in np.nonzero(right > left)[0]:
+            for j in range(left[i], right[i]):
+                due = _datetime(self.due[j])
+                conflicts.append({"subtask": int(i), "kind": "task", "id": str(self.task_ids[j]), "start": due, "end": due})
+
+        # Sessions starting before the window ends and ending after it starts.
+        if len(self.starts):
+            candidates = np.searchsorted(self.starts, high, side="left")
+            hit = (candidates > 0) & (self.max_ends[np.maximum(candidates - 1, 0)] > low)
+            for i in np.nonzero(hit)[0]:
+                for j in range(candidates[i] - 1, -1, -1):
+                    if self.max_ends[j] <= low[i]:
+                        break
+                    if self.ends[j] > low[i]:
+                        conflicts.append({
+                            "subtask": int(i),
+                            "kind": "pomodoro",
+                            "id": str(self.session_ids[j]),
+                            "start": _datetime(self.starts[j]),
+                            "end": _datetime(self.ends[j]),
+                        })
+        return conflicts
+
+
+class ScheduleCache:
+    def __init__(self, max_users: int = settings.CONFLICT_INDEX_CACHE_SIZE, ttl: float = settings.CONFLICT_INDEX_TTL_SECONDS):
+        # The TTL bounds staleness from writes made by other processes;
+        # writes in this one invalidate immediately.
+        self.indexes: TTLCache = TTLCache(maxsize=max_users, ttl=ttl)
+        self.lock = threading.Lock()
+        self.builds: dict[uuid.UUID, asyncio.Future] = {}
+        self.generations: dict[uuid.UUID, int] = {}
+
+    def invalidate(self, user_id: uuid.UUID):
+        with self.lock:
+            self.indexes.pop(user_id, None)
+            # A build that started before the write must not repopulate the cache.
+            self.generations[user_id] = self.generations.get(user_id, 0) + 1
+            self.builds.pop(user_id, None)
+
+    async def get(self, user_id: uuid.UUID) -> ScheduleIndex:
+        with self.lock:
+            index = self.indexes.get(user_id)
+            if index is not None:
+                return index
+            # Single flight: concurrent plans for the same user share one load.
+            build = self.builds.get(user_id)
+            if build is None:
+                generation = self.generations.get(user_id, 0)
+                build = self.builds[user_id] = asyncio.ensure_future(load_schedule(user_id))
+
+                def store(done: asyncio.Future):
+                    with self.lock:
+                        if self.builds.get(user_id) is done:
+                            del self.builds[user_id]
+                        if not done.cancelled() and done.exception() is None and self.generations.get(user_id, 0) == generation:
+                            self.indexes[user_id] = done.result()
+
+                build.add_done_callback(store)
+        return await asyncio.shield(build)
+
+
+async def load_schedule(user_id: uuid.UUID) -> ScheduleIndex:
+    from sqlmodel import select
+    from db.session import AsyncSessionLocal
+
+    # Past items can't collide with new deadlines, so history stays out of the index.
+    horizon = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=1)
+    async with AsyncSessionLocal() as session:
+        tasks = await session.exec(
+            select(Task.task_id, Task.due_date).where(
+                Task.user_id == user_id,
+                Task.status != TaskStatus.completed,
+                Task.due_date >= horizon,  # type: ignore
+            )
+        )
+        sessions = await session.exec(
+            select(
+                PomodoroSession.session_id,
+                PomodoroSession.start_time,
+                PomodoroSession.end_time,
+                PomodoroSession.duration_minutes,
+            ).where(PomodoroSession.user_id == user_id, PomodoroSession.start_time >= horizon)
+        )
+        return ScheduleIndex(
+            list(tasks.all()),  # type: ignore
+            [
+                (session_id, start, end or start + timedelta(minutes=duration))
+                for session_id, start, end, duration in sessions.all()
+            ],
+        )
+
+
+schedule_cache = ScheduleCache()
+
+
+@event.listens_for(Session, "after_flush")
+def collect_changed_schedules(session, flush_context):
+    # Flushed rows aren't visible to the build's own session until commit.
+    changed = session.info.setdefault("changed_schedules", set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, (Task, PomodoroSession)):
+            changed.add(obj.user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_changed_schedules(session):
+    for user_id in session.info.pop("changed_schedules", ()):
+        schedule_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_changed_schedules(session):
+    session.info.pop("changed_schedules", None)
+
+
+async def find_conflicts(
+    user_id: uuid.UUID,
+    deadlines: Sequence[datetime],
+    window: timedelta = timedelta(minutes=settings.TASK_CONFLICT_WINDOW_MINUTES),
+) -> List[Conflict]:
+    index = await schedule_cache.get(user_id)
+    return index.find(deadlines, window)
@@ -1,20 +1,26 @@
 import os
+import hashlib
 
+from bisect import bisect_left
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import accumulate
 
 from dotenv import load_dotenv, find_dotenv
 from pydantic import SecretStr
-from tiktoken import encoding_for_model
+from tiktoken import Encoding, get_encoding as get_encoding_by_name
 # from langchain.schema import Document
 # from langchain_google_genai.embeddings import GoogleGenerativeAIEmbeddings
 # from langchain_pinecone import PineconeVectorStore
-from langchain_core.messages import  BaseMessage
+from langchain_core.messages import  BaseMessage, HumanMessage, SystemMessage
+from config import settings
 
 
 
 
 _=load_dotenv(find_dotenv())
 
-GOOGLE_API_KEY=os.environ["GOOGLE_API_KEY"]
+MESSAGE_OVERHEAD_TOKENS = 4  # Approximate overhead per message
 
 # pc= Pinecone(pinecone_api_key=PINECONE_KEY)
 
@@ -26,13 +32,38 @@ GOOGLE_API_KEY=os.environ["GOOGLE_API_KEY"]
 
 
 
+def get_encoding() -> Encoding:
+    return _get_encoding(settings.CONTEXT_TOKENIZER_ENCODING)
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(name: str) -> Encoding:
+    return get_encoding_by_name(name)
+
+
+# Token counts keyed by (message id, content hash); every chatbot turn re-trims
+# the whole thread, so each message is only tokenized the first time it's seen.
+_token_cache: OrderedDict[tuple, int] = OrderedDict()
+
+
+def message_tokens(message: BaseMessage) -> int:
+    content = str(message.content)
+    key = (message.id, hashlib.blake2b(content.encode(), digest_size=16).digest())
+
+    tokens = _token_cache.get(key)
+    if tokens is None:
+        tokens = len(get_encoding().encode(content)) + MESSAGE_OVERHEAD_TOKENS
+        _token_cache[key] = tokens
+        if len(_token_cache) > settings.CONTEXT_TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+    else:
+        _token_cache.move_to_end(key)
+    return tokens
+
+
 def count_tokens(messages: list[BaseMessage]) -> int:
-    encoding = encoding_for_model("gpt-3.5-turbo")
-    num_tokens = 0
-    for message in messages:
-        num_tokens += len(encoding.encode(str(message.content)))
-        num_tokens += 4  # Approximate overhead per message
-    return num_tokens
+    return sum(message_tokens(message) for message in messages)
+
 
 def trim_messages(messages: list[BaseMessage], max_tokens: int = 4000) -> list[BaseMessage]:
     if not messages:
@@ -45,16 +76,54 @@ def trim_messages(messages: list[BaseMessage], max_tokens: int = 4000) -> list[B
     if messages[0].type == "system":
         system_message = chat_messages.pop(0)
 
-    current_tokens = count_tokens(chat_messages)
-
-    while current_tokens > max_tokens and len(chat_messages) > 1:
-        chat_messages.pop(0)
-        current_tokens = count_tokens(chat_messages)
+    # prefix[i] is the token count of chat_messages[:i]; the cut point is the
+    # first index whose suffix fits the budget, keeping at least one message.
+    prefix = list(accumulate((message_tokens(m) for m in chat_messages), initial=0))
+    cut = bisect_left(prefix, prefix[-1] - max_tokens)
+    chat_messages = chat_messages[min(cut, max(len(chat_messages) - 1, 0)):]
 
     if system_message:
         chat_messages.insert(0, system_message)
 
-    for message in chat_messages:
-        print(message)
+    return chat_messages
+
+
+def find_compaction_cut(messages: list[BaseMessage], keep_tokens: int) -> int:
+    """Index of the first message to keep verbatim when compacting.
+
+    The cut always lands on a human message so an AI tool call is never
+    separated from its tool results.
+    """
+    prefix = list(accumulate((message_tokens(m) for m in messages), initial=0))
+    cut = bisect_left(prefix, prefix[-1] - keep_tokens)
+
+    human_indexes = [i for i, m in enumerate(messages) if m.type == "human"]
+    later = [i for i in human_indexes if i >= cut]
+    if later:
+        return later[0]
+    earlier = [i for i in human_indexes if i < cut]
+    return earlier[-1] if earlier else 0
+
+
+async def summarize_messages(summary: str, messages: list[BaseMessage]) -> str:
+    from .llm import get_llm
+
+    transcript = "\n".join(
+        f"{message.type}: {message.content}" for message in messages if message.content
+    )
+
+    system_message = SystemMessage(
+        content=f"""You maintain a running summary of a conversation between a user and an assistant.
+    Merge the existing summary with the new messages into one updated summary.
+    - Keep facts, names, dates, decisions, user preferences and open questions.
+    - Drop greetings, filler and tool-call mechanics.
+    - Write plain prose, no more than {settings.CONTEXT_SUMMARY_MAX_WORDS} words.
+    Only return the updated summary."""
+    )
+    human_message = HumanMessage(
+        content=f"Existing summary:\n{summary or '(none)'}\n\nNew messages:\n{transcript}"
+    )
 
-    return chat_messages
\ No newline at end of file
+    llm = await get_llm.aget()
+    response = await llm.ainvoke([system_message, human_message])
+    return str(response.content).strip()
@@ -0,0 +1,257 @@
+import json
+import time
+import asyncio
+import logging
+import aiohttp
+
+from pathlib import Path
+from typing import AsyncIterator
+from typing_extensions import TypedDict
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
+from bs4 import BeautifulSoup
+from config import settings
+
+from .web_fetch import USER_AGENT, extract_text
+
+
+TRACKING_PARAMS = {"fbclid", "gclid", "msclkid", "ref", "sessionid", "phpsessid"}
+SKIPPED_EXTENSIONS = (
+    ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".ico", ".css", ".js",
+    ".zip", ".rar", ".mp4", ".mp3", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx",
+)
+
+
+class CrawledPage(TypedDict):
+    url: str
+    title: str
+    text: str
+    unchanged: bool
+
+
+def canonicalize_url(url: str) -> str:
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and not (
+        (scheme == "http" and parts.port == 80) or (scheme == "https" and parts.port == 443)
+    ):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or "/"
+    if path != "/":
+        path = path.rstrip("/")
+
+    query = urlencode(
+        sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+        )
+    )
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+class HostRateLimiter:
+    """Spaces out requests to the same host by at least ``delay`` seconds."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.locks: dict[str, asyncio.Lock] = {}
+        self.next_slot: dict[str, float] = {}
+
+    async def wait(self, url: str):
+        host = urlsplit(url).netloc
+        lock = self.locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            slot = self.next_slot.get(host, now)
+            if slot > now:
+                await asyncio.sleep(slot - now)
+            self.next_slot[host] = max(slot, now) + self.delay
+
+
+class Crawler:
+    def __init__(
+        self,
+        base_url: str = settings.CRAWLER_BASE_URL,
+        workers: int = settings.CRAWLER_WORKERS,
+        host_delay: float = settings.CRAWLER_HOST_DELAY_SECONDS,
+        max_pages: int = settings.CRAWLER_MAX_PAGES,
+        timeout: float = settings.CRAWLER_TIMEOUT_SECONDS,
+        state_path: str = settings.CRAWLER_STATE_PATH,
+    ):
+        self.base_url = canonicalize_url(base_url)
+        self.workers = workers
+        self.host_delay = host_delay
+        self.max_pages = max_pages
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.state_path = Path(state_path)
+        self.robots = RobotFileParser()
+        self.seen: set[str] = set()
+        # url -> {"etag", "last_modified", "links"} from the previous crawl,
+        # so an unchanged page is a 304 that still yields its outgoing links.
+        self.validators: dict[str, dict] = {}
+        # Validators of pages fetched in this crawl. They only move into
+        # ``validators`` via ``commit`` once the caller has durably indexed
+        # the page; otherwise a failed batch would come back as 304s and
+        # never be indexed.
+        self.fetched_validators: dict[str, dict] = {}
+        self.stats = {"fetched": 0, "unchanged": 0, "errors": 0}
+
+    def in_scope(self, url: str) -> bool:
+        parts, base = urlsplit(url), urlsplit(self.base_url)
+        return (
+            parts.scheme in ("http", "https")
+            and parts.netloc == base.netloc
+            and parts.path.startswith(base.path.rstrip("/"))
+            and not parts.path.lower().endswith(SKIPPED_EXTENSIONS)
+            and self.robots.can_fetch(USER_AGENT, url)
+        )
+
+    def load_state(self):
+        if self.state_path.exists():
+            self.validators = json.loads(self.state_path.read_text())
+
+    def save_state(self):
+        self.state_path.write_text(json.dumps(self.validators))
+
+    def commit(self, urls: list[str]):
+        """Record that ``urls`` are indexed and persisted, so the next crawl
+        can skip them while they are unchanged."""
+        for url in urls:
+            validators = self.fetched_validators.pop(url, None)
+            if validators is not None:
+                self.validators[url] = validators
+        self.save_state()
+
+    async def _read_robots(self, session: aiohttp.ClientSession) -> list[str]:
+        robots_url = urljoin(self.base_url, "/robots.txt")
+        try:
+            async with session.get(robots_url) as response:
+                lines = (await response.text()).splitlines() if response.status == 200 else []
+        except Exception as e:
+            logging.warning(f"Could not read {robots_url}: {e!r}")
+            lines = []
+        self.robots.parse(lines)
+
+        crawl_delay = self.robots.crawl_delay(USER_AGENT)
+        if crawl_delay:
+            self.host_delay = max(self.host_delay, float(crawl_delay))
+        return self.robots.site_maps() or [urljoin(self.base_url, "/sitemap.xml")]
+
+    async def _read_sitemaps(self, session: aiohttp.ClientSession, sitemap_urls: list[str]) -> list[str]:
+        urls, pending, visited = [], list(sitemap_urls), set()
+        while pending and len(visited) < 50:
+            sitemap_url = pending.pop()
+            if sitemap_url in visited:
+                continue
+            visited.add(sitemap_url)
+            try:
+                async with session.get(sitemap_url) as response:
+                    if response.status != 200:
+                        continue
+                    xml = await response.text()
+            except Exception as e:
+                logging.warning(f"Could not read sitemap {sitemap_url}: {e!r}")
+                continue
+            soup = BeautifulSoup(xml, "html.parser")
+            # A sitemap index lists other sitemaps, a urlset lists pages.
+            if soup.find("sitemapindex"):
+                pending.extend(loc.get_text(strip=True) for loc in soup.find_all("loc"))
+            else:
+                urls.extend(loc.get_text(strip=True) for loc in soup.find_all("loc"))
+        return urls
+
+    def _enqueue(self, queue: asyncio.Queue, url: str):
+        url = canonicalize_url(url)
+        if url in self.seen or len(self.seen) >= self.max_pages or not self.in_scope(url):
+            return
+        self.seen.add(url)
+        queue.put_nowait(url)
+
+    async def _fetch(
+        self, session: aiohttp.ClientSession, limiter: HostRateLimiter, url: str
+    ) -> tuple[CrawledPage, list[str]] | None:
+        previous = self.validators.get(url, {})
+        headers = {}
+        if previous.get("etag"):
+            headers["If-None-Match"] = previous["etag"]
+        if previous.get("last_modified"):
+            headers["If-Modified-Since"] = previous["last_modified"]
+
+        await limiter.wait(url)
+        async with session.get(url, headers=headers) as response:
+            if response.status == 304:
+                self.stats["unchanged"] += 1
+                page = CrawledPage(url=url, title="", text="", unchanged=True)
+                return page, previous.get("links", [])
+            response.raise_for_status()
+            if "html" not in response.headers.get("Content-Type", ""):
+                return None
+            html = await response.text(errors="replace")
+            validators = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+
+        def parse():
+            soup = BeautifulSoup(html, "html.parser")
+            links = [urljoin(url, a["href"]) for a in soup.find_all("a", href=True)]  # type: ignore
+            title = soup.title.get_text(strip=True) if soup.title else ""
+            return title, links, extract_text(html, max_chars=1_000_000)
+
+        title, links, text = await asyncio.to_thread(parse)
+        self.fetched_validators[url] = {**validators, "links": links}
+        self.stats["fetched"] += 1
+        return CrawledPage(url=url, title=title, text=text, unchanged=False), links
+
+    async def crawl(self) -> AsyncIterator[CrawledPage]:
+        """Yield pages as soon as they are fetched, so callers can chunk and
+        embed them while the rest of the site is still being crawled."""
+        self.load_state()
+        frontier: asyncio.Queue[str] = asyncio.Queue()
+        # Bounded: if embedding falls behind, the workers wait for it.
+        pages: asyncio.Queue[CrawledPage | None] = asyncio.Queue(maxsize=self.workers * 4)
+        limiter = HostRateLimiter(self.host_delay)
+
+        async with aiohttp.ClientSession(
+            timeout=self.timeout, headers={"User-Agent": USER_AGENT}
+        ) as session:
+            sitemaps = await self._read_robots(session)
+            limiter.delay = self.host_delay
+            self._enqueue(frontier, self.base_url)
+            for url in await self._read_sitemaps(session, sitemaps):
+                self._enqueue(frontier, url)
+
+            async def worker():
+                while True:
+                    url = await frontier.get()
+                    try:
+                        result = await self._fetch(session, limiter, url)
+                        if result:
+                            page, links = result
+                            for link in links:
+                                self._enqueue(frontier, link)
+                            await pages.put(page)
+                    except Exception as e:
+                        self.stats["errors"] += 1
+                        logging.warning(f"Error visiting {url}: {e!r}")
+                    finally:
+                        frontier.task_done()
+
+            async def supervise():
+                await frontier.join()
+                await pages.put(None)
+
+            tasks = [asyncio.create_task(worker()) for _ in range(self.workers)]
+            supervisor = asyncio.create_task(supervise())
+            try:
+                while (page := await pages.get()) is not None:
+                    yield page
+            finally:
+                supervisor.cancel()
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(supervisor, *tasks, return_exceptions=True)
+                self.save_state()
@@ -1,25 +1,17 @@
 import os
-import requests
-import time
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+import asyncio
 from dotenv import load_dotenv, find_dotenv
-from pathlib import Path
 
 from typing import List
 
-from langchain_community.document_loaders import PyMuPDFLoader
-from langchain_community.document_loaders.parsers import TesseractBlobParser
-from langchain_experimental.open_clip import OpenCLIPEmbeddings
-from langchain_experimental.text_splitter import SemanticChunker
-from langchain.indexes import SQLRecordManager, index
-from langchain_pinecone import PineconeVectorStore
-from langchain_hyperbrowser import HyperbrowserLoader
-
+from langchain.indexes import index
 from langchain_core.runnables import chain
 from langchain_core.documents import Document
 from config import settings
-from pinecone import Pinecone, ServerlessSpec
+
+from .resources import lazy_resource
+from .crawler import CrawledPage, Crawler
+from .embedding_service import EmbeddingService
 
 # from langchain_google_genai import GoogleGenerativeAIEmbeddings
 
@@ -28,128 +20,202 @@ _ = load_dotenv(find_dotenv())
 
 PINECONE_KEY = settings.PINECONE_KEY
 GOOGLE_API_KEY = settings.GOOGLE_API_KEY
-HYPERBROWSER_API_KEY = settings.HYPERBROWSER_API_KEY
 
 # embeddings = GoogleGenerativeAIEmbeddings(
 #     model="models/embedding-001", google_api_key=SecretStr(GOOGLE_API_KEY)
 # )
 
-model_name = "ViT-H-14"
-checkpoint = "laion2b_s32b_b79k"
+index_name = "gecp"
 
-embeddings = OpenCLIPEmbeddings(model_name=model_name, checkpoint=checkpoint)
 
-text_splitter = SemanticChunker(
-    OpenCLIPEmbeddings(), breakpoint_threshold_type="gradient"
-)
+@lazy_resource("embeddings")
+def get_embeddings():
+    return EmbeddingService()
 
-pc = Pinecone(api_key=PINECONE_KEY)
-index_name = "gecp"
 
-if not pc.has_index(index_name):
-    pc.create_index(
-        name=index_name,
-        dimension=1024,
-        metric="cosine",
-        spec=ServerlessSpec(cloud="aws", region="us-east-1"),
-    )
+@lazy_resource("text_splitter")
+def get_text_splitter():
+    from langchain_experimental.text_splitter import SemanticChunker
 
+    # Same service for chunk breakpoints and for the index: one model in memory.
+    return SemanticChunker(get_embeddings(), breakpoint_threshold_type="gradient")
 
-pinecone_index = pc.Index(index_name)
-vector_store = PineconeVectorStore(
-    index=pinecone_index, embedding=embeddings, pinecone_api_key=PINECONE_KEY
-)
 
-namespace = f"pinecone/{index_name}"
-record_manager = SQLRecordManager(
-    namespace, db_url="sqlite:///record_manager_cache.sql"
-)
-record_manager.create_schema()
+@lazy_resource("vector_store")
+def get_vector_store():
+    if settings.VECTOR_STORE_BACKEND == "local":
+        from .local_vector_store import LocalVectorStore
 
+        return LocalVectorStore(get_embeddings())
 
-def load_and_embed_documents():
-    path = f"sample_data/somatosensory.pdf"
-    loader = PyMuPDFLoader(
-        file_path=Path(path).resolve(),
-        mode="page",
-        images_inner_format="html-img",
-        images_parser=TesseractBlobParser(),
-        extract_tables="markdown",
+    from langchain_pinecone import PineconeVectorStore
+    from pinecone import Pinecone, ServerlessSpec
+
+    pc = Pinecone(api_key=PINECONE_KEY)
+    if not pc.has_index(index_name):
+        pc.create_index(
+            name=index_name,
+            dimension=1024,
+            metric="cosine",
+            spec=ServerlessSpec(cloud="aws", region="us-east-1"),
+        )
+
+    pinecone_index = pc.Index(index_name)
+    return PineconeVectorStore(
+        index=pinecone_index, embedding=get_embeddings(), pinecone_api_key=PINECONE_KEY
     )
-    documents = loader.load()
 
-    docs = text_splitter.split_documents(documents)
 
-    for i, doc in enumerate(docs):
-        doc.metadata["source"] = str(Path(path).name)
+def persist_vector_store():
+    get_embeddings().flush()
+    vector_store = get_vector_store()
+    if hasattr(vector_store, "persist"):
+        vector_store.persist()  # type: ignore
 
-    index(
-        docs_source=docs,
-        record_manager=record_manager,
-        vector_store=vector_store,
-        cleanup="incremental",
-        source_id_key="source",
-    )
+    from .retrieval import get_bm25_index
 
-    print("Documents successfully added to Pinecone.")
+    get_bm25_index().persist()
 
 
-def load_and_embed_websites():
-    base_url = "https://gecpatan.ac.in/"
-    visited = set()
-    to_visit = [base_url]
-    discovered_urls = []
-    headers = {
-        "User-Agent": "Mozilla/5.0 (compatible; MyBot/1.0; +http://example.com/bot)"
-    }
-
-    while to_visit:
-        url = to_visit.pop()
-        if url in visited or not url.startswith(base_url):
-            continue
-        try:
-            resp = requests.get(url, headers=headers, timeout=5)
-            visited.add(url)
-            discovered_urls.append(url)
-            soup = BeautifulSoup(resp.text, "html.parser")
-            for a_tag in soup.find_all("a", href=True):
-                next_url = urljoin(url, a_tag["href"])  # type: ignore
-                if next_url.startswith(base_url) and next_url not in visited:
-                    to_visit.append(next_url)
-            time.sleep(1)
-
-        except Exception as e:
-            print(f"Error visiting {url}: {e}")
-
-    print(f"Found {discovered_urls} URLs")
-
-    loader = HyperbrowserLoader(
-        urls=discovered_urls,
-        api_key=HYPERBROWSER_API_KEY,
-    )
-    documents = loader.load()
+def update_keyword_index(docs: List[Document]):
+    # Keep the BM25 side of the hybrid retriever in step with the vector store.
+    from .retrieval import get_bm25_index
+
+    get_bm25_index().replace_sources(docs)
+
+
+def record_manager_url() -> str:
+    # Same Postgres database as the checkpointer when there is one, through
+    # SQLAlchemy's psycopg 3 driver; a local SQLite file otherwise.
+    url = settings.RECORD_MANAGER_DB_URL or settings.DB_URL
+    if url.startswith(("postgres://", "postgresql://")):
+        return "postgresql+psycopg://" + url.split("://", 1)[1]
+    return url or f"sqlite:///{settings.RECORD_MANAGER_SQLITE_PATH}"
+
+
+def create_record_manager_engine(url: str):
+    from sqlalchemy import create_engine, event
+
+    if not url.startswith("sqlite"):
+        return create_engine(url, pool_size=settings.RECORD_MANAGER_POOL_SIZE, pool_pre_ping=True)
+
+    engine = create_engine(url, connect_args={"timeout": settings.RECORD_MANAGER_BUSY_TIMEOUT_SECONDS})
 
-    docs = text_splitter.split_documents(documents)
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets readers run alongside the single writer, and the busy
+        # timeout makes parallel workers wait for the write lock instead of
+        # failing with "database is locked".
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.RECORD_MANAGER_BUSY_TIMEOUT_SECONDS * 1000)}")
+        cursor.close()
 
-    for i, doc in enumerate(docs):
-        source = doc.metadata.get("sourceURL") or doc.metadata.get("url") or f"doc_{i}"
-        doc.metadata["source"] = source
+    return engine
 
-    index(
-        docs_source=docs,
-        record_manager=record_manager,
-        vector_store=vector_store,
+
+@lazy_resource("record_manager")
+def get_record_manager():
+    from langchain.indexes import SQLRecordManager
+
+    namespace = f"{settings.VECTOR_STORE_BACKEND}/{index_name}"
+    record_manager = SQLRecordManager(
+        namespace, engine=create_record_manager_engine(record_manager_url())
+    )
+    record_manager.create_schema()
+    return record_manager
+
+
+def index_documents(docs_source):
+    # Larger batches mean one multi-row upsert and one DELETE ... IN per batch
+    # instead of hundreds of small record manager round trips.
+    return index(
+        docs_source=docs_source,
+        record_manager=get_record_manager(),
+        vector_store=get_vector_store(),
         cleanup="incremental",
         source_id_key="source",
+        batch_size=settings.INDEX_BATCH_SIZE,
+        cleanup_batch_size=settings.INDEX_CLEANUP_BATCH_SIZE,
     )
 
-    print("Documents successfully added to Pinecone.")
+
+def delete_sources(sources: List[str]) -> int:
+    """Drop every chunk indexed under ``sources`` from the record manager,
+    the vector store and BM25. Returns the number of vector store ids removed."""
+    from .retrieval import get_bm25_index
+
+    record_manager = get_record_manager()
+    keys = record_manager.list_keys(group_ids=sources)
+    for start in range(0, len(keys), settings.INDEX_CLEANUP_BATCH_SIZE):
+        batch = keys[start:start + settings.INDEX_CLEANUP_BATCH_SIZE]
+        get_vector_store().delete(batch)
+        record_manager.delete_keys(batch)
+    get_bm25_index().remove_sources(sources)
+    return len(keys)
+
+
+def load_and_embed_documents(pattern: str = "sample_data/*.pdf"):
+    from .pdf_ingest import ingest_pdfs
+
+    ingest_pdfs([pattern])
+    print(f"Documents successfully added to the {settings.VECTOR_STORE_BACKEND} vector store.")
+
+
+def index_pages(pages: List[CrawledPage]):
+    documents = [
+        Document(
+            page_content=page["text"],
+            metadata={"source": page["url"], "title": page["title"]},
+        )
+        for page in pages
+        if page["text"]
+    ]
+    docs = get_text_splitter().split_documents(documents)
+
+    # Each page is its own source, so indexing a batch incrementally never
+    # touches pages from other batches.
+    result = index_documents(docs)
+    update_keyword_index(docs)
+    return result
+
+
+async def aload_and_embed_websites():
+    crawler = Crawler()
+    batch: List[CrawledPage] = []
+    indexing = None
+    urls: List[str] = []
+
+    async for page in crawler.crawl():
+        if page["unchanged"]:
+            continue
+        batch.append(page)
+        urls.append(page["url"])
+        if len(batch) >= settings.CRAWLER_INDEX_BATCH_SIZE:
+            # Embed the previous batch in a thread while the crawl goes on.
+            if indexing:
+                await indexing
+            indexing = asyncio.create_task(asyncio.to_thread(index_pages, batch))
+            batch = []
+
+    if indexing:
+        await indexing
+    if batch:
+        await asyncio.to_thread(index_pages, batch)
+    persist_vector_store()
+    crawler.commit(urls)
+
+    print(f"Crawled {crawler.base_url}: {crawler.stats}")
+    print(f"Documents successfully added to the {settings.VECTOR_STORE_BACKEND} vector store.")
+
+
+def load_and_embed_websites():
+    asyncio.run(aload_and_embed_websites())
 
 
 @chain
 def retriever(query: str):
-    docs, scores = zip(*vector_store.similarity_search_with_score(query))
-    for doc, score in zip(docs, scores):
-        doc.metadata["score"] = score
+    from .retrieval import get_hybrid_retriever
 
-    return docs
+    return get_hybrid_retriever().retrieve(query)
@@ -0,0 +1,174 @@
+import json
+import os
+import re
+import hashlib
+import threading
+import numpy as np
+
+from pathlib import Path
+from typing import List
+from langchain_core.embeddings import Embeddings
+from config import settings
+
+from . import metrics
+
+
+class VectorCache:
+    """Content-hash -> vector cache backed by a memory-mapped float32 file.
+
+    ``vectors.f32`` holds one row per cached text and grows by doubling;
+    ``index.json`` maps content hashes to rows.
+    """
+
+    def __init__(self, cache_dir: str, initial_capacity: int = 4096):
+        self.dir = Path(cache_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = self.dir / "vectors.f32"
+        self.index_path = self.dir / "index.json"
+        self.initial_capacity = initial_capacity
+        self.lock = threading.Lock()
+        self.rows: dict[str, int] = {}
+        self.dim: int | None = None
+        self.matrix: np.memmap | None = None
+        self.dirty = 0
+
+        if self.index_path.exists():
+            meta = json.loads(self.index_path.read_text())
+            self.dim, self.rows = meta["dim"], meta["rows"]
+            capacity = self.vectors_path.stat().st_size // (4 * self.dim)
+            self.matrix = np.memmap(
+                self.vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim)
+            )
+
+    def _ensure_capacity(self, rows: int, dim: int):
+        if self.matrix is None:
+            self.dim = dim
+            capacity = max(self.initial_capacity, rows)
+        elif rows <= self.matrix.shape[0]:
+            return
+        else:
+            self.matrix.flush()
+            capacity = max(self.matrix.shape[0] * 2, rows)
+
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(capacity * dim * 4)
+        self.matrix = np.memmap(
+            self.vectors_path, dtype=np.float32, mode="r+", shape=(capacity, dim)
+        )
+
+    def get_many(self, keys: List[str]) -> List[np.ndarray | None]:
+        with self.lock:
+            return [
+                np.array(self.matrix[self.rows[key]]) if key in self.rows else None  # type: ignore
+                for key in keys
+            ]
+
+    def put_many(self, keys: List[str], vectors: np.ndarray):
+        with self.lock:
+            new = [(key, vector) for key, vector in zip(keys, vectors) if key not in self.rows]
+            if not new:
+                return
+            self._ensure_capacity(len(self.rows) + len(new), vectors.shape[1])
+            for key, vector in new:
+                row = len(self.rows)
+                self.matrix[row] = vector  # type: ignore
+                self.rows[key] = row
+            self.dirty += len(new)
+            if self.dirty >= 1024:
+                self._flush()
+
+    def _flush(self):
+        if self.matrix is None:
+            return
+        self.matrix.flush()
+        tmp = self.index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"dim": self.dim, "rows": self.rows}))
+        os.replace(tmp, self.index_path)
+        self.dirty = 0
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+
+class EmbeddingService(Embeddings):
+    """One OpenCLIP text encoder shared by chunking and indexing.
+
+    Texts are encoded in real batches (OpenCLIPEmbeddings encodes one text
+    at a time) and every vector is cached by content hash, so re-ingesting
+    unchanged chunks and repeated queries don't embed the same text twice.
+    The cache is kept per model and checkpoint.
+    """
+
+    def __init__(
+        self,
+        model_name: str = settings.EMBEDDING_MODEL_NAME,
+        checkpoint: str = settings.EMBEDDING_CHECKPOINT,
+        batch_size: int = settings.EMBEDDING_BATCH_SIZE,
+        cache_dir: str = settings.EMBEDDING_CACHE_DIR,
+        num_threads: int = settings.EMBEDDING_NUM_THREADS,
+    ):
+        self.model_name = model_name
+        self.checkpoint = checkpoint
+        self.batch_size = batch_size
+        self.num_threads = num_threads
+        # Vectors from another model (or another dimension) must never be served.
+        model_key = re.sub(r"[^\w.-]", "_", f"{model_name}-{checkpoint}")
+        self.cache = VectorCache(str(Path(cache_dir) / model_key))
+        self.stats = {"hits": 0, "misses": 0}
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    @property
+    def model(self):
+        with self._model_lock:
+            if self._model is None:
+                import torch
+                from langchain_experimental.open_clip import OpenCLIPEmbeddings
+
+                if self.num_threads > 0:
+                    torch.set_num_threads(self.num_threads)
+                self._model = OpenCLIPEmbeddings(
+                    model_name=self.model_name, checkpoint=self.checkpoint
+                )
+        return self._model
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        import torch
+
+        metrics.record_cost("embedding_batches")
+        clip = self.model
+        with torch.inference_mode():
+            features = clip.model.encode_text(clip.tokenizer(texts))
+            features = features / features.norm(p=2, dim=-1, keepdim=True)
+        return features.float().cpu().numpy()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [hashlib.blake2b(text.encode(), digest_size=16).hexdigest() for text in texts]
+        vectors = self.cache.get_many(keys)
+
+        missing: dict[str, str] = {}
+        for key, text, vector in zip(keys, texts, vectors):
+            if vector is None:
+                missing.setdefault(key, text)
+        self.stats["hits"] += len(texts) - len(missing)
+        self.stats["misses"] += len(missing)
+
+        computed: dict[str, np.ndarray] = {}
+        items = list(missing.items())
+        for start in range(0, len(items), self.batch_size):
+            batch = items[start : start + self.batch_size]
+            encoded = self._encode([text for _, text in batch])
+            self.cache.put_many([key for key, _ in batch], encoded)
+            computed.update(zip((key for key, _ in batch), encoded))
+
+        return [
+            (vector if vector is not None else computed[key]).tolist()
+            for key, vector in zip(keys, vectors)
+        ]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    def flush(self):
+        self.cache.flush()
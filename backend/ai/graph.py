@@ -4,35 +4,104 @@ from typing import Annotated, List
 from typing_extensions import TypedDict
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
+from langchain_core.messages import AIMessage, RemoveMessage
+from langchain_core.runnables import RunnableConfig
 from langgraph.checkpoint.base import BaseCheckpointSaver
+from config import settings
 
-from .llm import llm_model
-from .tools import tool_node
-from .context_manager import trim_messages
+from .llm import get_llm_model
+from .tools import get_tool_node
+from .context_manager import (
+    count_tokens,
+    find_compaction_cut,
+    summarize_messages,
+    trim_messages,
+)
 from .searchBuilder import web_search
+from .response_cache import is_cacheable, response_cache, ttl_for
 
 
 class State(TypedDict):
     messages: Annotated[list, add_messages]
     question: Annotated[list, operator.add]
     search_answer: str
+    summary: str
 
 
-def chatbot(state: State):
-    state["messages"] = trim_messages(state["messages"], max_tokens=4000)
+async def compact_history(state: State):
+    messages = state["messages"]
+    if count_tokens(messages) <= settings.CONTEXT_COMPACTION_TRIGGER_TOKENS:
+        return {}
+
+    cut = find_compaction_cut(messages, settings.CONTEXT_KEEP_RECENT_TOKENS)
+    if cut == 0:
+        return {}
+
+    evicted = messages[:cut]
+    summary = await summarize_messages(state.get("summary", ""), evicted)
+
+    # Removing the folded turns from state also keeps them out of the
+    # checkpoint that gets reloaded on the next turn.
+    return {
+        "summary": summary,
+        "messages": [RemoveMessage(id=message.id) for message in evicted],
+    }
+
+
+def cacheable_question(state: State) -> str | None:
+    # Only single-question threads are cached: once there is earlier
+    # context the same words can call for a different answer.
+    if state.get("summary"):
+        return None
+    human_messages = [m for m in state["messages"] if m.type == "human"]
+    if len(human_messages) != 1:
+        return None
+    return str(human_messages[0].content)
+
+
+async def chatbot(state: State, config: RunnableConfig):
+    # Answers are cached per user: without a user id nothing is shared.
+    user_id = config.get("configurable", {}).get("user_id")
+    question = cacheable_question(state) if response_cache and user_id else None
+    if question and state["messages"][-1].type == "human":
+        cached = await response_cache.lookup("chatbot", question, scope=str(user_id))  # type: ignore
+        if cached is not None:
+            return {"messages": [AIMessage(content=cached)]}
+
+    state["messages"] = trim_messages(
+        state["messages"], max_tokens=settings.CONTEXT_MAX_TOKENS
+    )
     system_message = """
     You are a friendly and helpful assistant who communicates like a real human — casual, natural, and thoughtful.
     You have access to a variety of tools, including the ability to search the web for real-time information.
+    For questions about the college (Government Engineering College, Patan), use college_search before web_search.
     Feel free to use them anytime they can help you give more accurate, current, or complete answers —
     especially when the user’s request involves breaking news, live data, recent updates, current events, or anything time-sensitive.
     Your goal is to be genuinely helpful, grounded, and easy to talk to — like a smart friend who always knows how to find the right info.
        """
-    response = llm_model.invoke(
+    if state.get("summary"):
+        system_message += (
+            f"\n    Summary of the earlier conversation:\n    {state['summary']}\n"
+        )
+    llm_model = await get_llm_model.aget()
+    response = await llm_model.ainvoke(
         {"system_message": system_message, "messages": state["messages"]}
     )
+
+    tool_names = {m.name for m in state["messages"] if m.type == "tool"} or {"chatbot"}
+    if question and not response.tool_calls and is_cacheable(tool_names):  # type: ignore
+        # Answers that went through tools inherit the shortest TTL of those
+        # tools, so a cached weather report expires like the weather does.
+        ttl = min(ttl_for(name, question) for name in tool_names)
+        await response_cache.store("chatbot", question, str(response.content), ttl, scope=str(user_id))  # type: ignore
     return {"messages": [response]}
 
 
+async def call_tools(state: State, config: RunnableConfig):
+    tool_node = await get_tool_node.aget()
+    return await tool_node.ainvoke(state, config)
+
+
 def should_continue(state: State):
     messages = state["messages"]
     last_message = messages[-1]
@@ -44,11 +113,13 @@ def should_continue(state: State):
 
 def compile_graph(saver: BaseCheckpointSaver):
     graph_builder = StateGraph(State)
+    graph_builder.add_node("compact_history", compact_history)
     graph_builder.add_node("chatbot", chatbot)
-    graph_builder.add_node("tools", tool_node)
+    graph_builder.add_node("tools", call_tools)
     graph_builder.add_node("search_graph", web_search)
 
-    graph_builder.add_edge(START, "chatbot")
+    graph_builder.add_edge(START, "compact_history")
+    graph_builder.add_edge("compact_history", "chatbot")
     graph_builder.add_conditional_edges("chatbot", should_continue, ["tools", END])
-    graph_builder.add_edge("chatbot", END)
+    graph_builder.add_edge("tools", "chatbot")
     return graph_builder.compile(checkpointer=saver)
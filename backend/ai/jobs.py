@@ -0,0 +1,305 @@
+"""Background ingestion jobs.
+
+Jobs are queued in-process and run by a small pool of asyncio workers, off
+the request path. Each job checkpoints which sources (PDF files, crawled
+URLs) it has finished to a JSON file, so after a crash or restart queued and
+interrupted jobs are picked up again and skip the sources already indexed.
+"""
+
+import json
+import time
+import uuid
+import asyncio
+import logging
+import threading
+
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional
+from config import settings
+
+from . import metrics
+
+
+JobHandler = Callable[["IngestJob"], Awaitable[None]]
+JOB_HANDLERS: dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str):
+    def decorator(handler: JobHandler) -> JobHandler:
+        JOB_HANDLERS[kind] = handler
+        return handler
+
+    return decorator
+
+
+class IngestJob:
+    def __init__(self, kind: str, params: dict, id: Optional[str] = None):
+        self.id = id or uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.total_sources: int | None = None
+        self.completed_sources: set[str] = set()
+        self.failed_sources: dict[str, str] = {}
+        self.pages = 0
+        self.chunks = 0
+        self.elapsed_seconds = 0.0
+        self.attempts = 0
+        self.error: str | None = None
+        self.checkpoint: Callable[[], None] = lambda: None
+        self._tick: float | None = None
+
+    def is_done(self, source: str) -> bool:
+        return source in self.completed_sources
+
+    def _advance_clock(self):
+        now = time.perf_counter()
+        if self._tick is not None:
+            self.elapsed_seconds += now - self._tick
+        self._tick = now
+
+    def record(self, sources: List[str], pages: int = 0, chunks: int = 0):
+        """Mark sources as indexed and checkpoint. Call only once their
+        chunks are durably written, or a resume would skip them."""
+        self._advance_clock()
+        self.completed_sources.update(sources)
+        for source in sources:
+            self.failed_sources.pop(source, None)
+        self.pages += pages
+        self.chunks += chunks
+        metrics.increment("ingest.pages", pages)
+        metrics.increment("ingest.chunks", chunks)
+        self.checkpoint()
+
+    def record_error(self, source: str, error: BaseException):
+        self._advance_clock()
+        self.failed_sources[source] = f"{type(error).__name__}: {error}"
+        metrics.increment("ingest.errors")
+        logging.warning(f"Ingest job {self.id} failed on {source}: {error}")
+        self.checkpoint()
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "total_sources": self.total_sources,
+            "completed_sources": sorted(self.completed_sources),
+            "failed_sources": self.failed_sources,
+            "pages": self.pages,
+            "chunks": self.chunks,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "attempts": self.attempts,
+            "error": self.error,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IngestJob":
+        job = cls(data["kind"], data["params"], id=data["id"])
+        for key in ("status", "created_at", "started_at", "finished_at", "total_sources",
+                    "failed_sources", "pages", "chunks", "elapsed_seconds", "attempts", "error"):
+            setattr(job, key, data[key])
+        job.completed_sources = set(data["completed_sources"])
+        return job
+
+    def progress(self) -> dict:
+        # The API view: counts instead of the full source lists.
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "attempts": self.attempts,
+            "sources_total": self.total_sources,
+            "sources_completed": len(self.completed_sources),
+            "errors": len(self.failed_sources),
+            "failed_sources": self.failed_sources,
+            "pages": self.pages,
+            "chunks": self.chunks,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "pages_per_second": round(self.pages / self.elapsed_seconds, 2) if self.elapsed_seconds else None,
+            "chunks_per_second": round(self.chunks / self.elapsed_seconds, 2) if self.elapsed_seconds else None,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    def __init__(
+        self,
+        state_path: str = settings.INGEST_JOBS_STATE_PATH,
+        workers: int = settings.INGEST_JOB_WORKERS,
+    ):
+        self.state_path = Path(state_path)
+        self.workers = workers
+        self.jobs: dict[str, IngestJob] = {}
+        self.queue: asyncio.Queue[str] | None = None
+        self.tasks: list[asyncio.Task] = []
+        self.lock = threading.Lock()
+
+    def save(self):
+        # Handlers may run in threads, so checkpoints are serialized here.
+        with self.lock:
+            data = [job.to_dict() for job in self.jobs.values()]
+            tmp = self.state_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data))
+            tmp.replace(self.state_path)
+
+    def _track(self, job: IngestJob):
+        job.checkpoint = self.save
+        self.jobs[job.id] = job
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        if self.state_path.exists():
+            for data in json.loads(self.state_path.read_text()):
+                self._track(IngestJob.from_dict(data))
+        for job in sorted(self.jobs.values(), key=lambda job: job.created_at):
+            # "running" here means the previous process died mid-job.
+            if job.status in ("queued", "running"):
+                job.status = "queued"
+                self.queue.put_nowait(job.id)
+        self.tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        if self.jobs:
+            self.save()
+
+    def submit(self, kind: str, params: dict) -> IngestJob:
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job kind {kind!r}, expected one of {sorted(JOB_HANDLERS)}")
+        if self.queue is None:
+            raise RuntimeError("Job queue is not started")
+        job = IngestJob(kind, params)
+        self._track(job)
+        self.save()
+        self.queue.put_nowait(job.id)
+        metrics.increment("ingest.jobs.submitted")
+        return job
+
+    def get(self, job_id: str) -> IngestJob | None:
+        return self.jobs.get(job_id)
+
+    def list(self) -> List[IngestJob]:
+        return sorted(self.jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    async def _worker(self):
+        assert self.queue is not None
+        while True:
+            job = self.jobs[await self.queue.get()]
+            try:
+                await self._run(job)
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, job: IngestJob):
+        job.status = "running"
+        job.attempts += 1
+        job.started_at = time.time()
+        job._tick = time.perf_counter()
+        self.save()
+        try:
+            await JOB_HANDLERS[job.kind](job)
+        except asyncio.CancelledError:
+            # Shutting down: stays "running" so the next start resumes it.
+            job._advance_clock()
+            self.save()
+            raise
+        except Exception as e:
+            logging.exception(f"Ingest job {job.id} failed")
+            job.status = "failed"
+            job.error = f"{type(e).__name__}: {e}"
+            metrics.increment("ingest.jobs.failed")
+        else:
+            job.status = "completed_with_errors" if job.failed_sources else "completed"
+            metrics.increment("ingest.jobs.completed")
+        job._advance_clock()
+        job.finished_at = time.time()
+        self.save()
+
+
+@job_handler("pdf")
+async def run_pdf_job(job: IngestJob):
+    from .embedding import persist_vector_store
+    from .pdf_ingest import PageCache, PdfIngestStats, create_pool, expand_patterns, ingest_pdf_file
+
+    paths = expand_patterns(job.params["patterns"])
+    job.total_sources = len(paths)
+    cache = PageCache()
+    indexed: dict[str, PdfIngestStats] = {}
+
+    async def checkpoint():
+        # Persisting rewrites the whole BM25 index and HNSW graph, so it
+        # happens once per batch of files rather than after every file.
+        try:
+            await asyncio.to_thread(persist_vector_store)
+        except Exception as e:
+            for path in indexed:
+                job.record_error(path, e)
+        else:
+            job.record(
+                list(indexed),
+                pages=sum(stats.pages for stats in indexed.values()),
+                chunks=sum(stats.chunks for stats in indexed.values()),
+            )
+        indexed.clear()
+
+    with create_pool() as executor:
+        for path in paths:
+            if job.is_done(path):
+                continue
+            stats = PdfIngestStats()
+            try:
+                await asyncio.to_thread(ingest_pdf_file, path, executor, cache, stats)
+            except Exception as e:
+                job.record_error(path, e)
+                continue
+            indexed[path] = stats
+            if len(indexed) >= settings.INGEST_JOB_CHECKPOINT_FILES:
+                await checkpoint()
+        if indexed:
+            await checkpoint()
+
+
+@job_handler("website")
+async def run_website_job(job: IngestJob):
+    from .crawler import Crawler
+    from .embedding import index_pages, persist_vector_store
+
+    crawler = Crawler(base_url=job.params.get("base_url") or settings.CRAWLER_BASE_URL)
+
+    async def index_batch(batch):
+        urls = [page["url"] for page in batch]
+        try:
+            result = await asyncio.to_thread(index_pages, batch)
+            await asyncio.to_thread(persist_vector_store)
+        except Exception as e:
+            for url in urls:
+                job.record_error(url, e)
+            return
+        crawler.commit(urls)
+        job.record(urls, pages=len(batch), chunks=result["num_added"] + result["num_updated"])
+
+    batch = []
+    async for page in crawler.crawl():
+        if page["unchanged"] or job.is_done(page["url"]):
+            continue
+        batch.append(page)
+        if len(batch) >= settings.CRAWLER_INDEX_BATCH_SIZE:
+            await index_batch(batch)
+            batch = []
+    if batch:
+        await index_batch(batch)
+
+
+job_queue = JobQueue()
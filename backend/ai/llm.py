@@ -1,24 +1,38 @@
 import os
 
 from dotenv import load_dotenv, find_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from pydantic import SecretStr
 from config import settings
-from .tools import tools
+
+from .resources import lazy_resource
 
 
 _ = load_dotenv(find_dotenv())
 
 GOOGLE_API_KEY = settings.GOOGLE_API_KEY
 
-llm = ChatGoogleGenerativeAI(
-    model="gemini-1.5-pro", api_key=SecretStr(GOOGLE_API_KEY), temperature=0
-)
 
-llm_with_tools = llm.bind_tools(tools)
-prompt_template = ChatPromptTemplate.from_messages(
-    [("system", "{system_message}"), MessagesPlaceholder("messages")]
-)
+@lazy_resource("llm")
+def get_llm():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI(
+        model="gemini-1.5-pro", api_key=SecretStr(GOOGLE_API_KEY), temperature=0
+    )
+
+
+@lazy_resource("llm_with_tools")
+def get_llm_with_tools():
+    from .tools import get_tools
+
+    return get_llm().bind_tools(get_tools())
+
+
+@lazy_resource("llm_model")
+def get_llm_model():
+    from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 
-llm_model = prompt_template | llm_with_tools
+    prompt_template = ChatPromptTemplate.from_messages(
+        [("system", "{system_message}"), MessagesPlaceholder("messages")]
+    )
+    return prompt_template | get_llm_with_tools()
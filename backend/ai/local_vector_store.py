@@ -0,0 +1,367 @@
+import os
+import json
+import uuid
+import threading
+import numpy as np
+
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, Sequence
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from config import settings
+
+try:
+    import hnswlib
+except ImportError:  # falls back to exact search
+    hnswlib = None
+
+
+def matches_filter(metadata: dict, filter: Optional[dict]) -> bool:
+    if not filter:
+        return True
+    for key, condition in filter.items():
+        value = metadata.get(key)
+        if isinstance(condition, dict):
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+            if "$ne" in condition and value == condition["$ne"]:
+                return False
+            if "$eq" in condition and value != condition["$eq"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class LocalVectorStore(VectorStore):
+    """In-process vector store for offline use and low-latency retrieval.
+
+    Vectors live in a memory-mapped float32 matrix (``vectors.f32``), one row
+    per chunk; ids, texts and metadata in an append-only ``docs.jsonl`` log of
+    adds and deletes. Queries go through an HNSW index (hnswlib) when it is
+    installed and through exact cosine search otherwise. ``add_texts`` with
+    ids and ``delete`` make it work with ``index(..., cleanup="incremental")``.
+    Replaced and deleted rows stay in the files until ``persist`` compacts
+    them away.
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        path: str = settings.LOCAL_VECTOR_STORE_DIR,
+        use_ann: bool = True,
+    ):
+        self.embedding = embedding
+        self.dir = Path(path)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = self.dir / "vectors.f32"
+        self.log_path = self.dir / "docs.jsonl"
+        self.hnsw_path = self.dir / "hnsw.bin"
+        self.compacted_vectors_path = self.dir / "vectors.f32.compact"
+        self.compacted_log_path = self.dir / "docs.jsonl.compact"
+        self.use_ann = use_ann and hnswlib is not None
+        self.lock = threading.RLock()
+
+        self.dim: int | None = None
+        self.matrix: np.memmap | None = None
+        self.size = 0  # rows written, including deleted ones
+        self.rows: dict[str, int] = {}  # live id -> row
+        self.docs: dict[int, tuple[str, str, dict]] = {}  # row -> (id, text, metadata)
+        self.ann = None
+        self._load()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    # ------------------ Storage ------------------ #
+    def _load(self):
+        self._finish_compaction()
+        if not self.log_path.exists():
+            return
+        with open(self.log_path) as f:
+            for line in f:
+                entry = json.loads(line)
+                if entry["op"] == "add":
+                    self.dim = entry["dim"]
+                    self.size = max(self.size, entry["row"] + 1)
+                    self.rows[entry["id"]] = entry["row"]
+                    self.docs[entry["row"]] = (entry["id"], entry["text"], entry["metadata"])
+                else:
+                    row = self.rows.pop(entry["id"], None)
+                    if row is not None:
+                        self.docs.pop(row, None)
+
+        capacity = self.vectors_path.stat().st_size // (4 * self.dim)  # type: ignore
+        self.matrix = np.memmap(
+            self.vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim)  # type: ignore
+        )
+        if self.use_ann:
+            self._load_ann()
+
+    def _ensure_capacity(self, rows: int, dim: int):
+        if self.matrix is None:
+            self.dim = dim
+            capacity = max(1024, rows)
+        elif rows <= self.matrix.shape[0]:
+            return
+        else:
+            self.matrix.flush()
+            capacity = max(self.matrix.shape[0] * 2, rows)
+
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(capacity * dim * 4)
+        self.matrix = np.memmap(
+            self.vectors_path, dtype=np.float32, mode="r+", shape=(capacity, dim)
+        )
+        if self.ann is not None:
+            self.ann.resize_index(capacity)
+
+    def _new_ann(self, capacity: int):
+        ann = hnswlib.Index(space="ip", dim=self.dim)  # type: ignore
+        ann.init_index(
+            max_elements=capacity,
+            M=settings.LOCAL_VECTOR_STORE_HNSW_M,
+            ef_construction=settings.LOCAL_VECTOR_STORE_HNSW_EF_CONSTRUCTION,
+        )
+        ann.set_ef(settings.LOCAL_VECTOR_STORE_HNSW_EF_SEARCH)
+        return ann
+
+    def _load_ann(self):
+        capacity = self.matrix.shape[0]  # type: ignore
+        if self.hnsw_path.exists():
+            ann = hnswlib.Index(space="ip", dim=self.dim)  # type: ignore
+            ann.load_index(str(self.hnsw_path), max_elements=capacity)
+            # The saved graph is only reused if it covers every row written
+            # since; otherwise rebuild it from the matrix.
+            if ann.get_current_count() == self.size:
+                ann.set_ef(settings.LOCAL_VECTOR_STORE_HNSW_EF_SEARCH)
+                self.ann = ann
+                # Rows deleted after the graph was saved are still live in it.
+                self._mark_dead_rows()
+                return
+
+        self.ann = self._new_ann(capacity)
+        if self.size:
+            self.ann.add_items(np.asarray(self.matrix[: self.size]), np.arange(self.size))  # type: ignore
+            self._mark_dead_rows()
+
+    def _mark_dead_rows(self):
+        for row in set(range(self.size)) - set(self.docs):
+            try:
+                self.ann.mark_deleted(row)  # type: ignore
+            except RuntimeError:  # already deleted in the saved graph
+                pass
+
+    def persist(self):
+        with self.lock:
+            if self.size and self.size - len(self.docs) > settings.LOCAL_VECTOR_STORE_COMPACT_RATIO * self.size:
+                self.compact()
+            if self.matrix is not None:
+                self.matrix.flush()
+            if self.ann is not None:
+                self.ann.save_index(str(self.hnsw_path))
+
+    def compact(self):
+        """Rewrite the matrix and the log with only live rows, renumbered
+        from 0, and rebuild the ANN index over them."""
+        with self.lock:
+            if self.matrix is None or len(self.docs) == self.size:
+                return
+            live = sorted(self.docs)
+            capacity = max(1024, len(live))
+            matrix = np.memmap(
+                self.compacted_vectors_path, dtype=np.float32, mode="w+", shape=(capacity, self.dim)  # type: ignore
+            )
+            if live:
+                matrix[: len(live)] = self.matrix[live]
+            matrix.flush()
+
+            partial_log = self.log_path.with_suffix(".partial")
+            with open(partial_log, "w") as f:
+                for row, old_row in enumerate(live):
+                    doc_id, text, metadata = self.docs[old_row]
+                    f.write(
+                        json.dumps(
+                            {"op": "add", "row": row, "dim": self.dim, "id": doc_id, "text": text, "metadata": metadata}
+                        )
+                        + "\n"
+                    )
+            # The renamed log marks the compacted files complete; from here
+            # a crash is finished by _finish_compaction on the next load.
+            os.replace(partial_log, self.compacted_log_path)
+            del matrix
+            self.matrix = None
+            self._finish_compaction()
+
+            self.docs = {row: self.docs[old_row] for row, old_row in enumerate(live)}
+            self.rows = {doc_id: row for row, (doc_id, _, _) in self.docs.items()}
+            self.size = len(live)
+            self.matrix = np.memmap(
+                self.vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim)  # type: ignore
+            )
+            self.ann = None
+            if self.use_ann:
+                self._load_ann()
+
+    def _finish_compaction(self):
+        if self.compacted_log_path.exists():
+            # A saved graph is numbered by the old rows.
+            self.hnsw_path.unlink(missing_ok=True)
+            if self.compacted_vectors_path.exists():
+                os.replace(self.compacted_vectors_path, self.vectors_path)
+            os.replace(self.compacted_log_path, self.log_path)
+        else:
+            self.compacted_vectors_path.unlink(missing_ok=True)
+            self.log_path.with_suffix(".partial").unlink(missing_ok=True)
+
+    # ------------------ VectorStore API ------------------ #
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        ids = [str(i) for i in ids] if ids else [str(uuid.uuid4()) for _ in texts]
+        if not texts:
+            return []
+
+        vectors = np.asarray(self.embedding.embed_documents(texts), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+
+        with self.lock:
+            # Re-adding an id replaces the old row.
+            self.delete([i for i in ids if i in self.rows])
+
+            start = self.size
+            self._ensure_capacity(start + len(texts), vectors.shape[1])
+            if self.use_ann and self.ann is None:
+                self.ann = self._new_ann(self.matrix.shape[0])  # type: ignore
+            self.matrix[start : start + len(texts)] = vectors  # type: ignore
+            rows = np.arange(start, start + len(texts))
+            if self.ann is not None:
+                self.ann.add_items(vectors, rows)
+
+            with open(self.log_path, "a") as f:
+                for row, doc_id, text, metadata in zip(rows, ids, texts, metadatas):
+                    row = int(row)
+                    self.rows[doc_id] = row
+                    self.docs[row] = (doc_id, text, metadata)
+                    f.write(
+                        json.dumps(
+                            {"op": "add", "row": row, "dim": self.dim, "id": doc_id, "text": text, "metadata": metadata}
+                        )
+                        + "\n"
+                    )
+            self.size = start + len(texts)
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return True
+        with self.lock:
+            with open(self.log_path, "a") as f:
+                for doc_id in ids:
+                    row = self.rows.pop(doc_id, None)
+                    if row is None:
+                        continue
+                    self.docs.pop(row, None)
+                    if self.ann is not None:
+                        self.ann.mark_deleted(row)
+                    f.write(json.dumps({"op": "delete", "id": doc_id}) + "\n")
+        return True
+
+    def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
+        documents = []
+        with self.lock:
+            for doc_id in ids:
+                row = self.rows.get(doc_id)
+                if row is not None:
+                    _, text, metadata = self.docs[row]
+                    documents.append(Document(id=doc_id, page_content=text, metadata=metadata))
+        return documents
+
+    def search_vectors(
+        self, vector: np.ndarray, k: int, filter: Optional[dict] = None, exact: bool = False
+    ) -> List[tuple[int, float]]:
+        """(row, cosine similarity) pairs of the k nearest live rows."""
+        with self.lock:
+            live = len(self.docs)
+            if not live:
+                return []
+            vector = vector / (np.linalg.norm(vector) or 1)
+
+            if self.ann is not None and not exact:
+                # Over-fetch so metadata filtering still leaves k results.
+                fetch = min(live, k * 4 if filter else k)
+                labels, distances = self.ann.knn_query(vector, k=fetch)
+                hits = [
+                    (int(row), 1.0 - float(distance))
+                    for row, distance in zip(labels[0], distances[0])
+                    if int(row) in self.docs and matches_filter(self.docs[int(row)][2], filter)
+                ]
+                if len(hits) >= min(k, live) or not filter:
+                    return hits[:k]
+
+            rows = np.fromiter(
+                (row for row, doc in self.docs.items() if matches_filter(doc[2], filter)),
+                dtype=np.int64,
+            )
+            if not len(rows):
+                return []
+            scores = np.asarray(self.matrix[rows]) @ vector  # type: ignore
+            top = np.argsort(-scores)[:k]
+            return [(int(rows[i]), float(scores[i])) for i in top]
+
+    def similarity_search_with_score_by_vector(
+        self, embedding: List[float], k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[tuple[Document, float]]:
+        results = []
+        # Under the lock: compaction renumbers rows.
+        with self.lock:
+            for row, score in self.search_vectors(np.asarray(embedding, dtype=np.float32), k, filter):
+                doc_id, text, metadata = self.docs[row]
+                results.append((Document(id=doc_id, page_content=text, metadata=metadata), score))
+        return results
+
+    # Same name as PineconeVectorStore, so callers can search either backend by vector.
+    similarity_search_by_vector_with_score = similarity_search_with_score_by_vector
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(
+            self.embedding.embed_query(query), k=k, filter=filter
+        )
+
+    def similarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, **kwargs: Any
+    ) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, **kwargs)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        # Scores are already cosine similarities.
+        return lambda score: score
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> "LocalVectorStore":
+        store = cls(embedding, **kwargs)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
@@ -0,0 +1,94 @@
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from threading import Lock
+
+
+# Latency buckets in seconds, roughly doubling from 5ms to 2 minutes.
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float | None:
+        # Upper bound of the bucket holding the q-th observation.
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": dict(
+                zip([*map(str, self.buckets), "+Inf"], self.counts)
+            ),
+        }
+
+
+_lock = Lock()
+_counters: defaultdict[str, float] = defaultdict(int)
+_histograms: dict[str, Histogram] = {}
+
+# Name of the answer route (e.g. "local", "web") the current task is serving,
+# so paid calls made deep inside a route can be attributed to it.
+current_route: ContextVar[str | None] = ContextVar("current_route", default=None)
+
+
+def increment(name: str, value: float = 1):
+    with _lock:
+        _counters[name] += value
+
+
+def observe(name: str, value: float, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram(buckets)
+        histogram.observe(value)
+
+
+def record_cost(kind: str, value: float = 1):
+    increment(f"cost.{kind}", value)
+    route = current_route.get()
+    if route is not None:
+        increment(f"route.{route}.cost.{kind}", value)
+
+
+def record_llm_usage(response):
+    record_cost("llm_calls")
+    usage = getattr(response, "usage_metadata", None) or {}
+    for key in ("input_tokens", "output_tokens"):
+        if usage.get(key):
+            record_cost(f"llm_{key}", usage[key])
+
+
+def snapshot() -> dict:
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "histograms": {name: h.snapshot() for name, h in _histograms.items()},
+        }
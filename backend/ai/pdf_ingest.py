@@ -0,0 +1,233 @@
+"""Parallel, incremental PDF ingestion.
+
+Pages are OCR'd and table-extracted in a process pool, and the output is
+cached by a hash of the page's content streams and images, so re-running
+over a directory only pays for pages that changed. Pages stream through
+chunking into ``index()`` instead of loading whole documents into memory.
+
+    python -m ai.pdf_ingest "sample_data/**/*.pdf" --workers 8
+"""
+
+import os
+import glob
+import json
+import time
+import hashlib
+import argparse
+import multiprocessing
+
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator, List
+from langchain_core.documents import Document
+from config import settings
+
+
+class PageCache:
+    """Extracted page text stored as one JSON file per page content hash."""
+
+    def __init__(self, cache_dir: str = settings.PDF_PAGE_CACHE_DIR):
+        self.dir = Path(cache_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> str | None:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        return json.loads(path.read_text())["text"]
+
+    def put(self, key: str, text: str):
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"text": text}))
+        tmp.replace(path)
+
+
+def page_hashes(path: str) -> List[str]:
+    # Hashing the raw content streams and image bytes is far cheaper than
+    # rendering or extracting the page, and changes whenever either does.
+    import fitz
+
+    hashes = []
+    with fitz.open(path) as pdf:
+        for page in pdf:
+            digest = hashlib.blake2b(page.read_contents(), digest_size=16)
+            for image in page.get_images(full=True):
+                digest.update(pdf.xref_stream_raw(image[0]) or b"")
+            hashes.append(digest.hexdigest())
+    return hashes
+
+
+@lru_cache(maxsize=8)
+def _open_pdf(path: str):
+    # One handle per file per worker process.
+    import fitz
+
+    return fitz.open(path)
+
+
+@lru_cache(maxsize=1)
+def _page_parser():
+    from langchain_community.document_loaders.parsers import (
+        PyMuPDFParser,
+        TesseractBlobParser,
+    )
+
+    return PyMuPDFParser(
+        mode="page",
+        images_inner_format="html-img",
+        images_parser=TesseractBlobParser(),
+        extract_tables="markdown",
+    )
+
+
+def extract_page(path: str, page_number: int) -> str:
+    """Runs in a worker process: text, OCR'd images and tables of one page."""
+    import fitz
+    from langchain_core.documents.base import Blob
+
+    single = fitz.open()
+    single.insert_pdf(_open_pdf(path), from_page=page_number, to_page=page_number)
+    data = single.tobytes()
+    single.close()
+
+    blob = Blob.from_data(data, path=path, mime_type="application/pdf")
+    return "\n".join(doc.page_content for doc in _page_parser().lazy_parse(blob))
+
+
+class PdfIngestStats:
+    def __init__(self):
+        self.files = 0
+        self.pages = 0
+        self.cached_pages = 0
+        self.chunks = 0
+        self.started = time.perf_counter()
+
+    def as_dict(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "files": self.files,
+            "pages": self.pages,
+            "cached_pages": self.cached_pages,
+            "chunks": self.chunks,
+            "seconds": round(elapsed, 2),
+            "pages_per_second": round(self.pages / elapsed, 2) if elapsed else None,
+        }
+
+
+def source_for(path: str) -> str:
+    # The incremental-cleanup key, so it must be unique per file: a bare file
+    # name would let a/report.pdf and b/report.pdf delete each other's chunks.
+    resolved = Path(path).resolve()
+    try:
+        return resolved.relative_to(settings.BASE_DIR).as_posix()
+    except ValueError:
+        return resolved.as_posix()
+
+
+def legacy_source_for(path: str) -> str:
+    # Before source_for, PDFs were indexed under their bare file name.
+    return Path(path).name
+
+
+def iter_pages(path: str, executor: Executor, cache: PageCache, stats: PdfIngestStats) -> Iterator[Document]:
+    """Yield the pages of ``path`` in order, extracting uncached ones in the pool.
+
+    Every uncached page is submitted up front so the pool stays busy while
+    earlier pages are chunked and embedded by the caller.
+    """
+    hashes = page_hashes(path)
+    pending: dict[int, Future] = {}
+    for number, key in enumerate(hashes):
+        if cache.get(key) is None:
+            pending[number] = executor.submit(extract_page, path, number)
+
+    source = source_for(path)
+    for number, key in enumerate(hashes):
+        if number in pending:
+            text = pending.pop(number).result()
+            cache.put(key, text)
+        else:
+            text = cache.get(key) or ""
+            stats.cached_pages += 1
+        stats.pages += 1
+        yield Document(
+            page_content=text,
+            metadata={"source": source, "page": number, "total_pages": len(hashes)},
+        )
+
+
+def iter_chunks(pages: Iterator[Document], chunks: List[Document], stats: PdfIngestStats) -> Iterator[Document]:
+    from .embedding import get_text_splitter
+
+    splitter = get_text_splitter()
+    for page in pages:
+        if not page.page_content.strip():
+            continue
+        for chunk in splitter.split_documents([page]):
+            stats.chunks += 1
+            chunks.append(chunk)
+            yield chunk
+
+
+def expand_patterns(patterns: List[str]) -> List[str]:
+    return sorted({path for pattern in patterns for path in glob.glob(pattern, recursive=True)})
+
+
+def create_pool(workers: int = settings.PDF_INGEST_WORKERS) -> ProcessPoolExecutor:
+    # spawn, not fork: the parent holds the embedding model and its threads.
+    return ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count(),
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def ingest_pdf_file(path: str, executor: Executor, cache: PageCache, stats: PdfIngestStats) -> dict:
+    from .embedding import delete_sources, index_documents, update_keyword_index
+
+    chunks: List[Document] = []
+    # One index() call per file: incremental cleanup only deletes stale
+    # chunks of sources seen in this call, after their new chunks are
+    # written, so streaming the file through is safe.
+    result = dict(index_documents(iter_chunks(iter_pages(path, executor, cache, stats), chunks, stats)))
+    update_keyword_index(chunks)
+    # Incremental cleanup never sees the old name-keyed source, so its
+    # chunks would otherwise sit next to the new ones forever. A PDF directly
+    # in BASE_DIR is keyed by its name either way; leave that key to it.
+    legacy = legacy_source_for(path)
+    if not Path(settings.BASE_DIR, legacy).is_file():
+        result["num_deleted"] = result.get("num_deleted", 0) + delete_sources([legacy])
+    stats.files += 1
+    return result
+
+
+def ingest_pdfs(patterns: List[str], workers: int = settings.PDF_INGEST_WORKERS) -> dict:
+    from .embedding import persist_vector_store
+
+    cache = PageCache()
+    stats = PdfIngestStats()
+    with create_pool(workers) as executor:
+        for path in expand_patterns(patterns):
+            result = ingest_pdf_file(path, executor, cache, stats)
+            print(f"Indexed {path}: {result}")
+
+    persist_vector_store()
+    report = stats.as_dict()
+    print(
+        f"Ingested {report['pages']} pages ({report['cached_pages']} cached) from "
+        f"{report['files']} files in {report['seconds']}s: {report['pages_per_second']} pages/sec"
+    )
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index PDFs into the vector store.")
+    parser.add_argument("patterns", nargs="+", help='Files or globs, e.g. "sample_data/**/*.pdf"')
+    parser.add_argument("--workers", type=int, default=settings.PDF_INGEST_WORKERS)
+    args = parser.parse_args()
+    ingest_pdfs(args.patterns, args.workers)
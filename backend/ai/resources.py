@@ -0,0 +1,82 @@
+import time
+import asyncio
+import logging
+import threading
+
+from typing import Callable, Generic, Iterable, TypeVar
+
+T = TypeVar("T")
+
+_registry: dict[str, "LazyResource"] = {}
+
+
+class LazyResource(Generic[T]):
+    """A heavy client or model that is built on first use, not at import."""
+
+    def __init__(self, name: str, factory: Callable[[], T]):
+        self.name = name
+        self.factory = factory
+        self.lock = threading.Lock()
+        self.value: T | None = None
+        self.ready = False
+        self.init_seconds: float | None = None
+
+    def __call__(self) -> T:
+        if not self.ready:
+            with self.lock:
+                if not self.ready:
+                    start = time.perf_counter()
+                    self.value = self.factory()
+                    self.init_seconds = time.perf_counter() - start
+                    self.ready = True
+                    logging.info(f"Initialized {self.name} in {self.init_seconds:.2f}s")
+        return self.value  # type: ignore
+
+    async def aget(self) -> T:
+        # Build off the event loop so a cold resource doesn't stall
+        # every other request on the worker.
+        if self.ready:
+            return self.value  # type: ignore
+        return await asyncio.to_thread(self)
+
+    def override(self, value: T):
+        with self.lock:
+            self.value = value
+            self.ready = True
+
+    def reset(self):
+        with self.lock:
+            self.value = None
+            self.ready = False
+            self.init_seconds = None
+
+
+def lazy_resource(name: str):
+    def decorator(factory: Callable[[], T]) -> LazyResource[T]:
+        resource = LazyResource(name, factory)
+        _registry[name] = resource
+        return resource
+
+    return decorator
+
+
+def override(name: str, value):
+    _registry[name].override(value)
+
+
+async def warm_up(names: Iterable[str]):
+    async def warm(name: str):
+        try:
+            await _registry[name].aget()
+        except Exception as e:
+            logging.error(f"Warm-up of {name} failed: {e!r}")
+
+    await asyncio.gather(*(warm(name) for name in names if name in _registry))
+
+
+def init_timings() -> dict:
+    return {
+        name: resource.init_seconds
+        for name, resource in _registry.items()
+        if resource.ready
+    }
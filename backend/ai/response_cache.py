@@ -0,0 +1,138 @@
+import re
+import math
+import time
+import hashlib
+import logging
+
+from collections import OrderedDict
+from config import settings
+
+from . import metrics
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # only needed for RESPONSE_CACHE_BACKEND=redis
+    redis = None
+
+
+# Questions about these go stale within minutes, everything else is cached
+# for the long TTL of the tool.
+TIME_SENSITIVE = re.compile(
+    r"\b(today|tonight|tomorrow|yesterday|now|current(ly)?|latest|live|news|"
+    r"breaking|weather|forecast|score|price|stock|this (week|month|year))\b"
+)
+
+# Only read-only tools are listed: replaying a cached answer must never stand
+# in for a tool call with side effects (sending mail, running code), so a
+# turn that used any other tool is not cached at all.
+TOOL_TTLS = {
+    "OpenWeatherMap": (settings.RESPONSE_CACHE_SHORT_TTL_SECONDS, settings.RESPONSE_CACHE_SHORT_TTL_SECONDS),
+    "college_search": (settings.RESPONSE_CACHE_LONG_TTL_SECONDS, settings.RESPONSE_CACHE_LONG_TTL_SECONDS),
+    "web_search": (settings.RESPONSE_CACHE_SHORT_TTL_SECONDS, settings.RESPONSE_CACHE_LONG_TTL_SECONDS),
+    "chatbot": (settings.RESPONSE_CACHE_SHORT_TTL_SECONDS, settings.RESPONSE_CACHE_LONG_TTL_SECONDS),
+}
+
+
+def normalize_query(text: str) -> str:
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return " ".join(text.split())
+
+
+def is_cacheable(tools: set[str]) -> bool:
+    return tools <= TOOL_TTLS.keys()
+
+
+def ttl_for(tool: str, query: str) -> float:
+    short_ttl, long_ttl = TOOL_TTLS[tool]
+    return short_ttl if TIME_SENSITIVE.search(normalize_query(query)) else long_ttl
+
+
+def cache_key(namespace: str, query: str, scope: str = "") -> str:
+    # Exact match on the normalized question. Similarity matching was
+    # dropped: near-identical questions ("computer" vs "civil" engineering
+    # fees) need different answers far more often than rephrasings recur.
+    digest = hashlib.sha1(f"{scope}\0{normalize_query(query)}".encode()).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+class MemoryBackend:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+
+    async def get(self, key: str) -> str | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.time():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl: float):
+        self.entries[key] = (value, time.time() + ttl)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+class RedisBackend:
+    """One string key per entry, expired by Redis itself; a sorted set of
+    last-access times drives LRU eviction so the cache stays bounded."""
+
+    def __init__(self, url: str, max_entries: int):
+        if redis is None:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires the redis package")
+        self.client = redis.from_url(url)
+        self.max_entries = max_entries
+
+    async def get(self, key: str) -> str | None:
+        value = await self.client.get(f"response_cache:{key}")
+        if value is None:
+            return None
+        await self.client.zadd("response_cache_lru", {key: time.time()})
+        return value.decode()
+
+    async def set(self, key: str, value: str, ttl: float):
+        await self.client.set(f"response_cache:{key}", value, ex=max(1, math.ceil(ttl)))
+        await self.client.zadd("response_cache_lru", {key: time.time()})
+
+        overflow = await self.client.zcard("response_cache_lru") - self.max_entries
+        if overflow > 0:
+            evicted = [k.decode() for k, _ in await self.client.zpopmin("response_cache_lru", overflow)]
+            await self.client.delete(*[f"response_cache:{k}" for k in evicted])
+
+
+class ResponseCache:
+    def __init__(self, backend):
+        self.backend = backend
+
+    async def lookup(self, namespace: str, query: str, scope: str = "") -> str | None:
+        try:
+            value = await self.backend.get(cache_key(namespace, query, scope))
+        except Exception as e:
+            logging.error(f"Response cache lookup failed: {str(e)}")
+            value = None
+        metrics.increment(f"response_cache.{namespace}.{'hits' if value is not None else 'misses'}")
+        return value
+
+    async def store(self, namespace: str, query: str, value: str, ttl: float, scope: str = ""):
+        try:
+            await self.backend.set(cache_key(namespace, query, scope), value, ttl)
+        except Exception as e:
+            logging.error(f"Response cache store failed: {str(e)}")
+
+
+def build_response_cache() -> ResponseCache | None:
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return None
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        backend = RedisBackend(settings.REDIS_URL, settings.RESPONSE_CACHE_MAX_ENTRIES)
+    else:
+        backend = MemoryBackend(settings.RESPONSE_CACHE_MAX_ENTRIES)
+    return ResponseCache(backend)
+
+
+response_cache = build_response_cache()
@@ -0,0 +1,243 @@
+import re
+import json
+import heapq
+import math
+import asyncio
+import hashlib
+import threading
+
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Iterable, List, Optional
+from cachetools import TTLCache
+from langchain_core.documents import Document
+from config import settings
+
+from .resources import lazy_resource
+from .embedding import get_embeddings, get_vector_store
+
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has he in is it its of on or that the to was "
+    "were will with what when where which who why how this these those i you we they".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in re.findall(r"\w+", text.lower()) if t not in STOPWORDS]
+
+
+def content_key(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+class BM25Index:
+    """Okapi BM25 over the ingested chunks, with an inverted index.
+
+    Chunks are grouped by their ``source`` metadata so re-ingesting a source
+    replaces its chunks, mirroring the incremental cleanup of the vector store.
+    """
+
+    def __init__(self, path: str = settings.BM25_INDEX_PATH, k1: float = 1.5, b: float = 0.75):
+        self.path = Path(path)
+        self.k1 = k1
+        self.b = b
+        self.lock = threading.RLock()
+        self.postings: defaultdict[str, dict[str, int]] = defaultdict(dict)
+        self.lengths: dict[str, int] = {}
+        self.docs: dict[str, tuple[str, dict]] = {}
+        self.sources: defaultdict[str, set[str]] = defaultdict(set)
+        self.total_length = 0
+        if self.path.exists():
+            data = json.loads(self.path.read_text())
+            self._add([Document(page_content=text, metadata=meta) for text, meta in data])
+
+    def __len__(self):
+        return len(self.docs)
+
+    def _add(self, documents: Iterable[Document]):
+        for doc in documents:
+            key = content_key(doc.page_content)
+            if key in self.docs:
+                continue
+            terms = Counter(tokenize(doc.page_content))
+            for term, tf in terms.items():
+                self.postings[term][key] = tf
+            self.lengths[key] = sum(terms.values())
+            self.total_length += self.lengths[key]
+            self.docs[key] = (doc.page_content, dict(doc.metadata))
+            self.sources[str(doc.metadata.get("source"))].add(key)
+
+    def _remove(self, key: str):
+        text, metadata = self.docs.pop(key)
+        for term in set(tokenize(text)):
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self.postings[term]
+        self.total_length -= self.lengths.pop(key)
+        self.sources[str(metadata.get("source"))].discard(key)
+
+    def remove_sources(self, sources: Iterable[str]):
+        with self.lock:
+            for source in sources:
+                for key in list(self.sources.pop(source, ())):
+                    self._remove(key)
+
+    def replace_sources(self, documents: List[Document]):
+        with self.lock:
+            self.remove_sources({str(doc.metadata.get("source")) for doc in documents})
+            self._add(documents)
+
+    def persist(self):
+        with self.lock:
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(list(self.docs.values())))
+            tmp.replace(self.path)
+
+    def search(self, query: str, k: int, filter: Optional[dict] = None) -> List[tuple[Document, float]]:
+        from .local_vector_store import matches_filter
+
+        with self.lock:
+            n = len(self.docs)
+            if not n:
+                return []
+            avg_length = self.total_length / n
+            scores: defaultdict[str, float] = defaultdict(float)
+            for term in set(tokenize(query)):
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for key, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.lengths[key] / avg_length)
+                    scores[key] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+            if filter:
+                ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+            else:
+                ranked = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            results = []
+            for key, score in ranked:
+                text, metadata = self.docs[key]
+                if matches_filter(metadata, filter):
+                    results.append((Document(page_content=text, metadata=dict(metadata)), score))
+                    if len(results) == k:
+                        break
+            return results
+
+
+@lazy_resource("bm25_index")
+def get_bm25_index():
+    bm25 = BM25Index()
+    vector_store = get_vector_store()
+    # The local store keeps its texts, so an empty BM25 index can be rebuilt
+    # from it; with Pinecone the index is filled during ingestion.
+    if not len(bm25) and hasattr(vector_store, "docs"):
+        bm25.replace_sources(
+            [Document(page_content=text, metadata=meta) for _, text, meta in vector_store.docs.values()]  # type: ignore
+        )
+    return bm25
+
+
+@lazy_resource("reranker")
+def get_reranker():
+    if not settings.RERANKER_MODEL:
+        return None
+    from sentence_transformers import CrossEncoder
+
+    return CrossEncoder(settings.RERANKER_MODEL, device="cpu")
+
+
+class HybridRetriever:
+    """BM25 + vector search fused with reciprocal rank fusion, optionally
+    reranked by a cross-encoder, with a per-query result cache."""
+
+    def __init__(
+        self,
+        k: int = settings.RETRIEVAL_K,
+        candidates: int = settings.RETRIEVAL_CANDIDATES,
+        rrf_k: int = settings.RETRIEVAL_RRF_K,
+    ):
+        self.k = k
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+        self.cache: TTLCache = TTLCache(
+            maxsize=settings.RETRIEVAL_CACHE_SIZE, ttl=settings.RETRIEVAL_CACHE_TTL_SECONDS
+        )
+        self.cache_lock = threading.Lock()
+
+    def _vector_search(self, embedding: List[float], filter: Optional[dict]):
+        return get_vector_store().similarity_search_by_vector_with_score(  # type: ignore
+            embedding, k=self.candidates, filter=filter
+        )
+
+    def _fuse(self, query: str, vector_hits, bm25_hits, k: int) -> List[Document]:
+        fused: dict[str, Document] = {}
+        scores: defaultdict[str, float] = defaultdict(float)
+        for field, hits in (("vector_score", vector_hits), ("bm25_score", bm25_hits)):
+            for rank, (doc, score) in enumerate(hits):
+                key = content_key(doc.page_content)
+                doc = fused.setdefault(key, doc)
+                doc.metadata[field] = float(score)
+                scores[key] += 1.0 / (self.rrf_k + rank + 1)
+
+        ranked = sorted(scores, key=scores.__getitem__, reverse=True)
+        documents = []
+        for key in ranked:
+            fused[key].metadata["score"] = scores[key]
+            documents.append(fused[key])
+
+        reranker = get_reranker()
+        if reranker is not None and documents:
+            documents = documents[: self.candidates]
+            rerank_scores = reranker.predict([(query, doc.page_content) for doc in documents])
+            for doc, score in zip(documents, rerank_scores):
+                doc.metadata["rerank_score"] = float(score)
+            documents.sort(key=lambda doc: doc.metadata["rerank_score"], reverse=True)
+        return documents[:k]
+
+    def _cache_key(self, query: str, k: int, filter: Optional[dict]):
+        return (" ".join(query.lower().split()), k, json.dumps(filter, sort_keys=True))
+
+    def batch(self, queries: List[str], k: Optional[int] = None, filter: Optional[dict] = None) -> List[List[Document]]:
+        k = k or self.k
+        results: dict[int, List[Document]] = {}
+        with self.cache_lock:
+            for i, query in enumerate(queries):
+                cached = self.cache.get(self._cache_key(query, k, filter))
+                if cached is not None:
+                    results[i] = cached
+
+        missing = [i for i in range(len(queries)) if i not in results]
+        if missing:
+            # One batched encoder call for every uncached query.
+            embeddings = get_embeddings().embed_documents([queries[i] for i in missing])
+            bm25 = get_bm25_index()
+            for i, embedding in zip(missing, embeddings):
+                documents = self._fuse(
+                    queries[i],
+                    self._vector_search(embedding, filter),
+                    bm25.search(queries[i], self.candidates, filter),
+                    k,
+                )
+                results[i] = documents
+                with self.cache_lock:
+                    self.cache[self._cache_key(queries[i], k, filter)] = documents
+
+        return [[doc.model_copy(deep=True) for doc in results[i]] for i in range(len(queries))]
+
+    def retrieve(self, query: str, k: Optional[int] = None, filter: Optional[dict] = None) -> List[Document]:
+        return self.batch([query], k, filter)[0]
+
+    async def aretrieve(self, query: str, k: Optional[int] = None, filter: Optional[dict] = None) -> List[Document]:
+        return await asyncio.to_thread(self.retrieve, query, k, filter)
+
+    async def abatch(self, queries: List[str], k: Optional[int] = None, filter: Optional[dict] = None) -> List[List[Document]]:
+        return await asyncio.to_thread(self.batch, queries, k, filter)
+
+
+@lazy_resource("hybrid_retriever")
+def get_hybrid_retriever():
+    return HybridRetriever()
@@ -0,0 +1,94 @@
+import math
+import time
+import logging
+
+from typing import List
+from langchain_core.documents import Document
+from config import settings
+
+from . import metrics
+from .searchBuilder import web_search_tool_fn
+
+
+# Cosine similarities and sigmoid-squashed reranker scores, both in [0, 1]
+# for anything worth answering from.
+CONFIDENCE_BUCKETS = tuple(round(0.05 * i, 2) for i in range(1, 21))
+
+
+def sigmoid(x: float) -> float:
+    # Split by sign so exp() never overflows on large logits.
+    if x >= 0:
+        return 1 / (1 + math.exp(-x))
+    z = math.exp(x)
+    return z / (1 + z)
+
+
+def retrieval_confidence(documents: List[Document]) -> float:
+    # The cross-encoder score is the better signal when a reranker is
+    # configured; otherwise fall back to the best embedding similarity.
+    if not documents:
+        return 0.0
+    if "rerank_score" in documents[0].metadata:
+        # ms-marco cross-encoders return unbounded logits; the sigmoid maps
+        # them to a relevance probability the threshold and buckets fit.
+        return sigmoid(documents[0].metadata["rerank_score"])
+    return max(doc.metadata.get("vector_score", 0.0) for doc in documents)
+
+
+def is_confident(documents: List[Document]) -> bool:
+    if documents and "rerank_score" in documents[0].metadata:
+        return retrieval_confidence(documents) >= settings.RETRIEVAL_MIN_RERANK_SCORE
+    return retrieval_confidence(documents) >= settings.RETRIEVAL_MIN_VECTOR_SCORE
+
+
+def format_documents(documents: List[Document]) -> str:
+    return "\n\n".join(
+        f"[{doc.metadata.get('title') or doc.metadata.get('source', 'document')}]"
+        f" ({doc.metadata.get('source', '')})\n{doc.page_content}"
+        for doc in documents
+    )
+
+
+async def run_route(route: str, coroutine):
+    # Everything awaited here, including tasks it spawns, books its LLM and
+    # search API calls under route.<route>.cost.*.
+    start = time.perf_counter()
+    token = metrics.current_route.set(route)
+    try:
+        return await coroutine
+    finally:
+        metrics.current_route.reset(token)
+        metrics.increment(f"route.{route}.requests")
+        metrics.observe(f"route.{route}.latency_seconds", time.perf_counter() - start)
+
+
+async def retrieve_local(query: str) -> List[Document]:
+    from .retrieval import get_hybrid_retriever
+
+    retriever = await get_hybrid_retriever.aget()
+    return await retriever.aretrieve(query)
+
+
+async def college_search_tool_fn(query: str) -> str:
+    """Answer from the local college index, escalating to web search only
+    when the retrieved chunks look unrelated to the question."""
+    try:
+        documents = await run_route("local", retrieve_local(query))
+    except Exception as e:
+        # An empty local index or an unreachable Pinecone shouldn't fail
+        # the tool call; the web route can still answer.
+        logging.warning(f"Local retrieval failed, escalating to web search: {e!r}")
+        metrics.increment("route.local.errors")
+        documents = []
+    else:
+        # Recorded so the escalation thresholds can be tuned from /ai/metrics.
+        metrics.observe("route.local.confidence", retrieval_confidence(documents), CONFIDENCE_BUCKETS)
+    if is_confident(documents):
+        return format_documents(documents)
+
+    metrics.increment("route.escalations")
+    return await run_route("web", web_search_tool_fn(query))
+
+
+async def web_search_route_fn(query: str) -> str:
+    return await run_route("web_direct", web_search_tool_fn(query))
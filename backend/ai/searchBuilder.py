@@ -1,29 +1,108 @@
+import re
+import time
+import asyncio
+
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_community.utilities import GoogleSerperAPIWrapper
 from typing_extensions import TypedDict
 from typing import List
 from langgraph.graph import StateGraph, START, END
 from dotenv import load_dotenv, find_dotenv
+from config import settings
+
+from .resources import lazy_resource
+from .serper import SerperClient
+from .web_fetch import PageFetcher
+from .web_cache import TTLCache
+from .response_cache import normalize_query, response_cache, ttl_for
+from . import metrics
 
 _ = load_dotenv(find_dotenv())
 
 
-search = GoogleSerperAPIWrapper(gl="in", hl="en")
+@lazy_resource("serper")
+def get_search():
+    return SerperClient(
+        api_key=settings.SERPER_API_KEY,
+        gl="in",
+        hl="en",
+        cache=TTLCache(
+            "serper",
+            ttl=settings.SERPER_CACHE_TTL_SECONDS,
+            stale_ttl=settings.SERPER_CACHE_STALE_SECONDS,
+            max_bytes=settings.SERPER_CACHE_MAX_BYTES,
+        ),
+    )
+
+
+@lazy_resource("page_fetcher")
+def get_page_fetcher():
+    return PageFetcher(
+        cache=TTLCache(
+            "pages",
+            ttl=settings.PAGE_CACHE_TTL_SECONDS,
+            stale_ttl=settings.PAGE_CACHE_STALE_SECONDS,
+            max_bytes=settings.PAGE_CACHE_MAX_BYTES,
+        )
+    )
+
+
+query_rewrites = TTLCache(
+    "query_rewrites",
+    ttl=settings.WEB_SEARCH_REWRITE_CACHE_TTL_SECONDS,
+    stale_ttl=0,
+    max_bytes=1024 * 1024,
+)
 
 
 class OptimizedWebSearchState(TypedDict):
     question: List[str]
     optimized_web_request: str
+    search_queries: List[str]
     documents: List[str]
     search_links: List[str]
     scraped_pages: List[str]
     final_answer: str
 
 
-def optimize_queries(state: OptimizedWebSearchState):
-    from .llm import llm_with_tools
+# Signs that a message is conversational rather than a search phrase.
+CONVERSATIONAL = re.compile(
+    r"\b(i|i'm|me|my|we|our|you|your|please|can|could|would|should|"
+    r"hey|hi|hello|tell|explain|help|think|best|good)\b"
+)
+
+
+def needs_rewrite(question: str) -> bool:
+    words = question.split()
+    if len(words) > 8 or len(words) < 2:
+        return True
+    return bool(CONVERSATIONAL.search(question.lower()))
+
 
-    print("\n[OPTIMIZE QUERIES] Input state:", state)
+async def optimize_queries(state: OptimizedWebSearchState):
+    question = state["question"][0]
+    print("\n[OPTIMIZE QUERIES] Question:", question)
+
+    if settings.WEB_SEARCH_REWRITE_FAST_PATH and not needs_rewrite(question):
+        metrics.increment("web_search.rewrite.skipped")
+        search_queries = [question]
+    else:
+        search_queries = await query_rewrites.get_or_fetch(
+            normalize_query(question), lambda _previous: rewrite_query(question)
+        )
+    print("[OPTIMIZE QUERIES] Optimized requests:", search_queries)
+
+    return {
+        **state,
+        "optimized_web_request": search_queries[0],
+        "search_queries": search_queries,
+    }
+
+
+async def rewrite_query(question: str) -> tuple[list[str], int]:
+    # The plain model: binding every tool schema only inflates this prompt.
+    from .llm import get_llm
+
+    metrics.increment("web_search.rewrite.llm")
 
     system_message = """
     You are a helpful assistant that improves user questions to make them clearer and more specific for web search.
@@ -40,50 +119,71 @@ def optimize_queries(state: OptimizedWebSearchState):
     - If the user asks about current events, sports, news, tools, etc., make sure the phrasing helps fetch **live or real-time** results.
     - NEVER return just a single word or ultra-short phrase—your output should be clear, structured, and useful.
 
-    Only return the improved query as plain text. No extra formatting, explanations, or responses—just the rewritten query.
-    """
+    Write {variants} different versions of the query, each phrased differently so together they cover the user's intent
+    (for example one precise, one broader, one using alternative keywords). Put the best one first.
+
+    Only return the improved queries as plain text, one per line. No numbering, formatting, explanations, or responses.
+    """.format(variants=settings.WEB_SEARCH_QUERY_VARIANTS)
 
-    human_message = HumanMessage(content=(f"user_request: {state['question'][0]}"))
+    human_message = HumanMessage(content=(f"user_request: {question}"))
 
-    optimized_response = llm_with_tools.invoke([system_message, human_message])
-    optimized_web_request = optimized_response.content
-    print("[OPTIMIZE QUERIES] Optimized request:", optimized_web_request)
+    llm = await get_llm.aget()
+    optimized_response = await llm.ainvoke([SystemMessage(content=system_message), human_message])
+    metrics.record_llm_usage(optimized_response)
+    search_queries = parse_query_variants(str(optimized_response.content), fallback=question)
+    return search_queries, sum(len(q) for q in search_queries)
 
-    return {**state, "optimized_web_request": optimized_web_request}
 
+def parse_query_variants(text: str, fallback: str) -> list[str]:
+    queries = []
+    for line in text.splitlines():
+        query = re.sub(r"^\s*(?:[-*•]|\d+[.)])\s*", "", line).strip().strip('"')
+        if query and query.lower() not in {q.lower() for q in queries}:
+            queries.append(query)
+    return queries[: settings.WEB_SEARCH_QUERY_VARIANTS] or [fallback]
 
-def search_web(state: OptimizedWebSearchState):
 
-    print("\n[SEARCH WEB] Optimized query:", state["optimized_web_request"])
+async def search_web(state: OptimizedWebSearchState):
+    queries = state["search_queries"] or [state["optimized_web_request"]]
+    print("\n[SEARCH WEB] Optimized queries:", queries)
 
-    response = search.results(state["optimized_web_request"])
-    print("[SEARCH WEB] Raw search response:", response)
+    responses = await asyncio.gather(
+        *(get_search().results(query) for query in queries), return_exceptions=True
+    )
 
-    if isinstance(response, str):
-        return {**state, "documents": [response], "search_links": []}
+    # Merge by URL: a page ranked well by several variants beats one that
+    # only a single variant found (reciprocal rank fusion).
+    scores: dict[str, float] = {}
+    snippets: dict[str, str] = {}
+    for query, response in zip(queries, responses):
+        if isinstance(response, BaseException):
+            print(f"[SEARCH WEB] Query {query!r} failed: {response!r}")
+            continue
+        for rank, result in enumerate(response.get("organic", [])):
+            link = result.get("link")
+            if not link:
+                continue
+            url = link.split("#")[0].rstrip("/")
+            scores[url] = scores.get(url, 0.0) + 1.0 / (60 + rank)
+            if "snippet" in result and url not in snippets:
+                snippets[url] = result["snippet"]
 
-    organic_results = response.get("organic", [])
-    links = []
-    snippets = []
+    ranked = sorted(scores, key=scores.__getitem__, reverse=True)
+    combined_snippets = "\n\n".join(snippets[url] for url in ranked if url in snippets)
+    links = ranked[: settings.WEB_SEARCH_MAX_PAGES]
+    print(f"[SEARCH WEB] {len(ranked)} unique results, top links:", links)
 
-    for result in organic_results:
-        if "link" in result:
-            links.append(result["link"])
-        if "snippet" in result:
-            snippets.append(result["snippet"])
-        for sitelink in result.get("sitelinks", []):
-            if "link" in sitelink:
-                links.append(sitelink["link"])
+    return {**state, "documents": [combined_snippets], "search_links": links}
 
-    combined_snippets = "\n\n".join(snippets)
-    print("[SEARCH WEB] Extracted snippets:", combined_snippets[:500])
-    print("[SEARCH WEB] Top links:", links[:3])
 
-    return {**state, "documents": [combined_snippets], "search_links": links[:3]}
+async def fetch_pages(state: OptimizedWebSearchState):
+    print("\n[FETCH PAGES] Fetching:", state["search_links"])
+    scraped_pages = await get_page_fetcher().fetch_many(state["search_links"])
+    return {**state, "scraped_pages": scraped_pages}
 
 
-def generate_answer(state: OptimizedWebSearchState):
-    from .llm import llm
+async def generate_answer(state: OptimizedWebSearchState):
+    from .llm import get_llm
 
     print("\n[GENERATE ANSWER] Generating answer from content...")
 
@@ -99,7 +199,9 @@ def generate_answer(state: OptimizedWebSearchState):
         Answer the user's question based only on the information above. If the documents don't help, say so clearly."""
     )
 
-    response = llm.invoke([system_message, human_message])
+    llm = await get_llm.aget()
+    response = await llm.ainvoke([system_message, human_message])
+    metrics.record_llm_usage(response)
     print("[GENERATE ANSWER] Final answer:", response.content)
 
     return {**state, "final_answer": response.content}
@@ -109,24 +211,39 @@ def generate_answer(state: OptimizedWebSearchState):
 optimized_web_search_builder = StateGraph(OptimizedWebSearchState)
 optimized_web_search_builder.add_node("optimize_queries", optimize_queries)
 optimized_web_search_builder.add_node("search_web", search_web)
+optimized_web_search_builder.add_node("fetch_pages", fetch_pages)
 optimized_web_search_builder.add_node("generate_answer", generate_answer)
 
 optimized_web_search_builder.add_edge(START, "optimize_queries")
 optimized_web_search_builder.add_edge("optimize_queries", "search_web")
-optimized_web_search_builder.add_edge("search_web", "generate_answer")
+optimized_web_search_builder.add_edge("search_web", "fetch_pages")
+optimized_web_search_builder.add_edge("fetch_pages", "generate_answer")
 optimized_web_search_builder.add_edge("generate_answer", END)
 
 web_search = optimized_web_search_builder.compile()
 
 
-def web_search_tool_fn(query: str) -> str:
+async def web_search_tool_fn(query: str) -> str:
+    start = time.perf_counter()
+    if response_cache:
+        cached = await response_cache.lookup("web_search", query)
+        if cached is not None:
+            return cached
+
     state = {
         "question": [query],
         "optimized_web_request": "",
+        "search_queries": [],
         "documents": [],
         "search_links": [],
         "scraped_pages": [],
         "final_answer": "",
     }
-    result = web_search.invoke(state)
+    result = await web_search.ainvoke(state)  # type: ignore
+    metrics.observe("web_search.latency_seconds", time.perf_counter() - start)
+
+    if response_cache:
+        await response_cache.store(
+            "web_search", query, result["final_answer"], ttl_for("web_search", query)
+        )
     return result["final_answer"]
@@ -0,0 +1,65 @@
+import json
+import asyncio
+import aiohttp
+
+from config import settings
+
+from . import metrics
+from .web_cache import TTLCache
+
+
+class SerperClient:
+    """Async client for the Serper Google Search API."""
+
+    def __init__(
+        self,
+        api_key: str,
+        gl: str = "in",
+        hl: str = "en",
+        base_url: str = settings.SERPER_BASE_URL,
+        timeout: float = settings.SERPER_TIMEOUT_SECONDS,
+        cache: TTLCache | None = None,
+    ):
+        self.api_key = api_key
+        self.gl = gl
+        self.hl = hl
+        self.base_url = base_url.rstrip("/")
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.cache = cache
+        self._session: aiohttp.ClientSession | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # aiohttp sessions are bound to the loop that created them.
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = aiohttp.ClientSession(timeout=self.timeout)
+            self._loop = loop
+        return self._session
+
+    async def results(self, query: str, num: int = 10) -> dict:
+        if self.cache is None:
+            return await self._search(query, num)
+
+        key = "|".join([" ".join(query.lower().split()), self.gl, self.hl, str(num)])
+
+        async def fetch(_previous):
+            response = await self._search(query, num)
+            return response, len(json.dumps(response))
+
+        return await self.cache.get_or_fetch(key, fetch)
+
+    async def _search(self, query: str, num: int) -> dict:
+        metrics.record_cost("serper_requests")
+        session = self._get_session()
+        async with session.post(
+            f"{self.base_url}/search",
+            headers={"X-API-KEY": self.api_key, "Content-Type": "application/json"},
+            json={"q": query, "gl": self.gl, "hl": self.hl, "num": num},
+        ) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
@@ -0,0 +1,114 @@
+import asyncio
+import json
+import logging
+
+from contextlib import suppress
+from typing import Any, AsyncIterator
+
+from fastapi import Request
+from langgraph.graph.state import CompiledStateGraph
+from config import settings
+
+
+STREAM_END = None
+
+
+def format_sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _chunk_text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    # Gemini can return content as a list of parts.
+    parts = []
+    for part in content or []:
+        if isinstance(part, str):
+            parts.append(part)
+        elif isinstance(part, dict) and part.get("type") == "text":
+            parts.append(part.get("text", ""))
+    return "".join(parts)
+
+
+def event_to_sse(event: dict) -> str | None:
+    kind = event["event"]
+    node = event.get("metadata", {}).get("langgraph_node")
+
+    # Only stream tokens produced by the chatbot node; the web_search
+    # sub-graph calls the LLM too, but those are intermediate results.
+    if kind == "on_chat_model_stream" and node == "chatbot":
+        text = _chunk_text(event["data"]["chunk"].content)
+        if text:
+            return format_sse("token", {"content": text})
+    elif kind == "on_tool_start":
+        return format_sse(
+            "tool_start",
+            {"name": event["name"], "run_id": event["run_id"], "input": event["data"].get("input")},
+        )
+    elif kind == "on_tool_end":
+        output = event["data"].get("output")
+        return format_sse(
+            "tool_end",
+            {
+                "name": event["name"],
+                "run_id": event["run_id"],
+                "output": getattr(output, "content", output),
+            },
+        )
+    return None
+
+
+async def stream_chat_events(
+    graph: CompiledStateGraph,
+    inputs: dict,
+    config: dict,
+    request: Request,
+) -> AsyncIterator[str]:
+    # A bounded queue between the graph and the response gives us
+    # backpressure: the graph stops producing while a slow client drains it.
+    queue: asyncio.Queue = asyncio.Queue(maxsize=settings.CHAT_STREAM_QUEUE_SIZE)
+
+    async def produce():
+        try:
+            async for event in graph.astream_events(inputs, config=config, version="v2"):  # type: ignore
+                frame = event_to_sse(event)
+                if frame:
+                    await queue.put(frame)
+
+            state = await graph.aget_state(config)  # type: ignore
+            final = state.values["messages"][-1]
+            await queue.put(format_sse("final", {"content": _chunk_text(final.content)}))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.exception(f"Error streaming chat: {str(e)}")
+            await queue.put(format_sse("error", {"detail": "Internal Server Error"}))
+        finally:
+            with suppress(asyncio.QueueFull):
+                queue.put_nowait(STREAM_END)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            try:
+                frame = await asyncio.wait_for(
+                    queue.get(), timeout=settings.CHAT_STREAM_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                frame = ": keep-alive\n\n"
+
+            if await request.is_disconnected():
+                logging.info("Client disconnected, cancelling chat stream.")
+                break
+            if frame is STREAM_END:
+                break
+            yield frame
+
+            if producer.done() and queue.empty():
+                break
+    finally:
+        # Cancelling the producer cancels the in-flight LLM/tool calls so an
+        # abandoned stream stops consuming quota.
+        producer.cancel()
+        with suppress(asyncio.CancelledError):
+            await producer
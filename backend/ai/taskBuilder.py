@@ -1,126 +1,189 @@
-import json
-
+import uuid
 
+from datetime import datetime, timezone
 from langchain_core.messages import HumanMessage, SystemMessage
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.types import interrupt
+from pydantic import BaseModel, Field
 from typing_extensions import TypedDict
-from typing import List
+from typing import List, Literal, Optional
 from langgraph.graph import StateGraph, START, END
 from dotenv import load_dotenv, find_dotenv
 
 _ = load_dotenv(find_dotenv())
 
 
-from typing import List, Optional
+# Task.priority runs from 1 (most urgent) to 5.
+PRIORITY_LEVELS = {"high": 1, "medium": 3, "low": 5}
+
+
+class PlannedSubtask(BaseModel):
+    title: str = Field(description="Short, actionable description of the subtask")
+    due_date: datetime = Field(description="Deadline as an ISO 8601 date-time in UTC")
+    priority: Literal["high", "medium", "low"]
+
+
+class Plan(BaseModel):
+    goal: str = Field(description="The user's main goal in one sentence, including any deadline")
+    subtasks: List[PlannedSubtask] = Field(description="3 to 6 subtasks that accomplish the goal")
 
 
 class SubTask(TypedDict):
-    goal: str
-    deadlines: str
+    title: str
+    due_date: datetime
     priority: str
 
 
 class TaskPlannerState(TypedDict):
     input: str
+    user_id: uuid.UUID
+    project_id: Optional[uuid.UUID]
     goal: Optional[str]
     subtasks: Optional[List[SubTask]]
     conflicts: Optional[bool]
+    conflict_details: Optional[List[dict]]
     approval: Optional[bool]
     changes: Optional[str]
     task_added: Optional[bool]
+    rejected_reason: Optional[Literal["declined", "conflicts"]]
+    task_ids: Optional[List[uuid.UUID]]
 
 
-def ExtractGoalNode(state: TaskPlannerState) -> TaskPlannerState:
-    from llm import llm_with_tools
+async def PlanTasksNode(state: TaskPlannerState) -> TaskPlannerState:
+    # Goal extraction and decomposition in one schema-constrained call: the
+    # model fills in the Plan schema, so there is nothing to eval or retry.
+    from .llm import get_llm
+    from db.models import to_naive_utc
 
-    user_input = state["input"]
+    llm = await get_llm.aget()
+    planner = llm.with_structured_output(Plan)
 
-    system_message = """You are a smart task planning assistant.
-    Your job is to extract the **main goal** the user wants to accomplish, based on their input.
-    - The goal should be a single sentence describing the primary task or objective.
-    - If the user mentions a **specific deadline or date**, include it in the goal.
-    - Do NOT include step-by-step instructions or unrelated details.
-    - The response should be concise, focused, and no more than 20 words.
+    system_message = f"""You are a smart task planning assistant.
+    First identify the **main goal** the user wants to accomplish: a single sentence of no more than 20 words,
+    including any specific deadline or date they mention, without step-by-step instructions.
+    Then break the goal down into 3 to 6 clear subtasks, each with
+    - a short description
+    - a realistic deadline with time, no later than the goal's deadline
+    - a priority (high, medium, or low)
+    The current date and time is {datetime.now(timezone.utc).isoformat(timespec="minutes")} (UTC).
+    Give every deadline in UTC.
     """
 
     messages = [
         SystemMessage(content=system_message),
-        HumanMessage(
-            content=f'The user said: "{user_input}"\n What is their main goal?'
-        ),
+        HumanMessage(content=f'The user said: "{state["input"]}"'),
     ]
-
-    response = llm_with_tools.invoke(messages)
-    goal = response.content.strip()  # type: ignore
-    return {**state, "goal": goal}
-
-
-def BreakIntoSubtasksNode(state: TaskPlannerState) -> TaskPlannerState:
-    from llm import llm_with_tools
-
-    goal = state["goal"]
-
-    system_message = """You are a task planning assistant.
-    Your job is to break down a high-level goal into 3 to 6 clear subtasks.
-    Each subtask must include:
-    - a short description (`goal`)
-    - a realistic deadline with time (in natural language or ISO format)
-    - a priority (high, medium, or low)
-
-    Ensure deadlines make sense given the overall goal.
-    Return the subtasks in the following format:
-    [
-    {"goal": "...", "deadline": "...", "priority": "..."},
-    ]"""
-
-    user_prompt = f"The main goal is: {goal}\nBreak it into subtasks."
-
-    messages = [
-        SystemMessage(content=system_message),
-        HumanMessage(content=user_prompt),
+    if state.get("changes"):
+        previous = "\n".join(
+            f'- {subtask["title"]} (due {subtask["due_date"].isoformat(timespec="minutes")}, {subtask["priority"]})'
+            for subtask in state["subtasks"] or []
+        )
+        messages.append(HumanMessage(
+            content=f"You proposed:\nGoal: {state['goal']}\n{previous}\n"
+            f'The user asked for these changes: "{state["changes"]}". Revise the plan accordingly.'
+        ))
+
+    plan: Plan = await planner.ainvoke(messages)  # type: ignore
+    subtasks: List[SubTask] = [
+        {"title": subtask.title, "due_date": to_naive_utc(subtask.due_date), "priority": subtask.priority}
+        for subtask in plan.subtasks
     ]
-
-    response = llm_with_tools.invoke(messages)
-    subtasks = eval(response.content.strip())  # type: ignore
-    return {**state, "subtasks": subtasks}
+    replan = {"approval": None, "changes": None} if state.get("changes") else {}
+    return {**state, "goal": plan.goal, "subtasks": subtasks, **replan}
 
 
-def ConflictCheckNode():
-    pass
+async def check_conflicts(state: TaskPlannerState) -> TaskPlannerState:
+    from .conflicts import find_conflicts
 
-
-def RequestApprovalNode(state: TaskPlannerState):
-    pass
-
-
-def check_conflicts(state: TaskPlannerState) -> TaskPlannerState:
-    # Mock calendar conflict check
-    conflicts = False  # Imagine checking with Google Calendar here
-    return {**state, "conflicts": conflicts}
+    deadlines = [subtask["due_date"] for subtask in state["subtasks"] or []]
+    details = await find_conflicts(state["user_id"], deadlines)
+    return {**state, "conflicts": bool(details), "conflict_details": details}
 
 
 def ask_human_approval(state: TaskPlannerState) -> TaskPlannerState:
-    # Simulate human approval
-    print("Prompting user: Add to task manager?")
-    approval = True  # Replace with FastAPI endpoint for real-time approval
-    return {**state, "approval": approval}
-
+    # Callers that already have the user's answer pass "approval" in the
+    # input; otherwise the run pauses here until resumed with Command(resume=...).
+    if state.get("approval") is not None:
+        if not state["approval"]:
+            return {**state, "task_added": False, "rejected_reason": "declined"}
+        if state["conflicts"]:
+            # Approved up front, before anyone saw the conflicts.
+            return {**state, "task_added": False, "rejected_reason": "conflicts"}
+        return state
+    answer = interrupt(
+        {
+            "question": "Add these tasks to your task manager?",
+            "goal": state["goal"],
+            "subtasks": state["subtasks"],
+            "conflicts": state["conflict_details"],
+        }
+    )
+    # The human has seen the conflicts, so their answer stands either way.
+    if isinstance(answer, dict):
+        approval, changes = bool(answer.get("approval")), answer.get("changes")
+    else:
+        approval, changes = bool(answer), None
+    if approval or changes:
+        return {**state, "approval": approval, "changes": None if approval else changes}
+    return {**state, "approval": False, "task_added": False, "rejected_reason": "declined"}
+
+
+def should_add_tasks(state: TaskPlannerState):
+    if state.get("rejected_reason"):
+        return END
+    if state["approval"]:
+        return "add_task"
+    # Requested changes go back to the planner, which asks again.
+    return "plan_tasks"
+
+
+async def add_task(state: TaskPlannerState) -> TaskPlannerState:
+    from db.models import Task, to_naive_utc
+    from db.session import AsyncSessionLocal
+
+    tasks = [
+        Task(
+            title=subtask["title"],
+            description=state["goal"],
+            due_date=to_naive_utc(subtask["due_date"]),
+            priority=PRIORITY_LEVELS[subtask["priority"]],
+            user_id=state["user_id"],
+            project_id=state.get("project_id"),
+        )
+        for subtask in state["subtasks"] or []
+    ]
+    # One transaction for the whole plan; the primary keys are generated
+    # client-side, so the flush sends the rows as a single batched INSERT.
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            session.add_all(tasks)
+    return {**state, "task_added": True, "task_ids": [task.task_id for task in tasks]}
 
-def add_task(state: TaskPlannerState) -> TaskPlannerState:
-    added = state["approval"] and not state["conflicts"]
-    return {**state, "task_added": added}
 
+def compile_task_planner(saver: Optional[BaseCheckpointSaver] = None):
+    # Without a checkpointer the input must carry "approval"; interrupting
+    # for a human needs somewhere to save the paused run.
+    builder = StateGraph(TaskPlannerState)
+    builder.add_node("plan_tasks", PlanTasksNode)
+    builder.add_node("check_conflicts", check_conflicts)
+    builder.add_node("ask_human_approval", ask_human_approval)
+    builder.add_node("add_task", add_task)
 
-# ExtractGoalNode: Parse input to get the goal.
+    builder.add_edge(START, "plan_tasks")
+    builder.add_edge("plan_tasks", "check_conflicts")
+    builder.add_edge("check_conflicts", "ask_human_approval")
+    builder.add_conditional_edges("ask_human_approval", should_add_tasks, ["add_task", "plan_tasks", END])
+    builder.add_edge("add_task", END)
+    return builder.compile(checkpointer=saver)
 
-# BreakIntoSubtasksNode: Create subtasks with deadline and priority.
 
-# ConflictCheckNode: Evaluate subtasks against existing schedules → set conflicts.
+# plan_tasks: One structured-output call for the goal and its subtasks.
 
-# RequestApprovalNode: Ask user for confirmation or edits → set approval and possibly changes.
+# check_conflicts: Evaluate subtasks against the user's open tasks → set conflicts.
 
-# ApplyChangesNode (optional): Apply changes if any.
+# ask_human_approval: Ask user for confirmation or edits → set approval, or changes to re-plan.
 
-# FinalizeTaskNode: If approval, mark task_added = True.
+# add_task: If approved after seeing any conflicts, insert the subtasks as Task rows in one transaction.
 
 
 # def human_review_node(state) -> Command[Literal["call_llm", "run_tool"]]:
@@ -0,0 +1,142 @@
+import time
+import asyncio
+import logging
+
+from typing import Any, List, Sequence
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
+from config import settings
+
+from . import metrics
+
+
+def parse_timeouts(spec: str) -> dict[str, float]:
+    # "web_search=45,OpenWeatherMap=10" -> {"web_search": 45.0, "OpenWeatherMap": 10.0}
+    timeouts = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, seconds = item.split("=", 1)
+            timeouts[name.strip()] = float(seconds)
+    return timeouts
+
+
+class CircuitBreaker:
+    """Opens after ``failures`` consecutive errors or timeouts and rejects
+    calls for ``reset_seconds``; then lets a single trial call through and
+    closes again if it succeeds."""
+
+    def __init__(self, failures: int, reset_seconds: float):
+        self.failures = failures
+        self.reset_seconds = reset_seconds
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self.trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.trial_running:
+            self.trial_running = True
+            return True
+        return False
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self.trial_running = False
+        if self.opened_at is not None or self.consecutive_failures >= self.failures:
+            self.opened_at = time.monotonic()
+
+    def record_cancelled(self):
+        # A cancelled call says nothing about the tool; let the next one be the trial.
+        self.trial_running = False
+
+
+class ToolExecutor:
+    """Drop-in for LangGraph's ToolNode: runs every tool call of the last AI
+    message concurrently, each under its own deadline and circuit breaker."""
+
+    def __init__(
+        self,
+        tools: Sequence[BaseTool],
+        default_timeout: float = settings.TOOL_TIMEOUT_SECONDS,
+        timeouts: dict[str, float] = parse_timeouts(settings.TOOL_TIMEOUTS),
+        breaker_failures: int = settings.TOOL_BREAKER_FAILURES,
+        breaker_reset_seconds: float = settings.TOOL_BREAKER_RESET_SECONDS,
+    ):
+        self.tools = {tool.name: tool for tool in tools}
+        self.default_timeout = default_timeout
+        self.timeouts = timeouts
+        self.breakers = {
+            name: CircuitBreaker(breaker_failures, breaker_reset_seconds) for name in self.tools
+        }
+
+    def breaker_states(self) -> dict[str, str]:
+        return {name: breaker.state for name, breaker in self.breakers.items()}
+
+    async def _call(self, call: dict, config: RunnableConfig | None) -> ToolMessage:
+        name = call["name"]
+
+        def error(content: str) -> ToolMessage:
+            return ToolMessage(content=content, name=name, tool_call_id=call["id"], status="error")
+
+        tool = self.tools.get(name)
+        if tool is None:
+            return error(f"Error: {name} is not a valid tool, try one of [{', '.join(self.tools)}].")
+
+        breaker = self.breakers[name]
+        if not breaker.allow():
+            metrics.increment(f"tools.{name}.short_circuited")
+            return error(f"Error: {name} is temporarily unavailable after repeated failures. Answer without it.")
+
+        timeout = self.timeouts.get(name, self.default_timeout)
+        start = time.perf_counter()
+        try:
+            # Tools without a coroutine run in a thread; a timed-out thread
+            # can't be killed, but the turn no longer waits for it.
+            result = await asyncio.wait_for(
+                tool.ainvoke({**call, "type": "tool_call"}, config), timeout
+            )
+        except asyncio.CancelledError:
+            # Client disconnects cancel the turn; a trial call must not
+            # leave the breaker half-open forever.
+            breaker.record_cancelled()
+            raise
+        except asyncio.TimeoutError:
+            breaker.record_failure()
+            metrics.increment(f"tools.{name}.timeouts")
+            logging.warning(f"Tool {name} timed out after {timeout}s")
+            return error(f"Error: {name} did not respond within {timeout:g} seconds.")
+        except Exception as e:
+            breaker.record_failure()
+            metrics.increment(f"tools.{name}.errors")
+            logging.warning(f"Tool {name} failed: {e!r}")
+            return error(f"Error: {e!r}\n Please fix your mistakes.")
+        finally:
+            metrics.observe(f"tools.{name}.latency_seconds", time.perf_counter() - start)
+
+        breaker.record_success()
+        if isinstance(result, ToolMessage):
+            return result
+        return ToolMessage(content=str(result), name=name, tool_call_id=call["id"])
+
+    async def ainvoke(self, state: dict, config: RunnableConfig | None = None) -> dict[str, List[Any]]:
+        message = state["messages"][-1]
+        if not isinstance(message, AIMessage) or not message.tool_calls:
+            return {"messages": []}
+        results = await asyncio.gather(*(self._call(call, config) for call in message.tool_calls))  # type: ignore
+        return {"messages": list(results)}
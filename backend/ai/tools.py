@@ -1,59 +1,108 @@
 import os
+import asyncio
 
+from functools import wraps
 from dotenv import load_dotenv, find_dotenv
 from langchain_core.tools import Tool
-from langgraph.prebuilt import ToolNode
-from langchain_google_community import GmailToolkit
-from langchain_experimental.utilities import PythonREPL
-from langchain_community.utilities import OpenWeatherMapAPIWrapper
 from config import settings
 
-from .searchBuilder import web_search_tool_fn
-from langchain_google_community.gmail.utils import (
-    get_gmail_credentials,
-    build_resource_service,
-)
+from .resources import lazy_resource
+from .tool_executor import ToolExecutor
+from .routing import college_search_tool_fn, web_search_route_fn
 
 _ = load_dotenv(find_dotenv())
 OPENWEATHERMAP_API_KEY = settings.OPENWEATHERMAP_API_KEY
 
 
-weather = OpenWeatherMapAPIWrapper()
-
-credentials = get_gmail_credentials(
-    scopes=["https://mail.google.com/"],
-    client_secrets_file="credentials/credentials.json",
-)
-api_resource = build_resource_service(credentials=credentials)
-toolkit = GmailToolkit(api_resource=api_resource)
-gmail_tools = toolkit.get_tools()
-
-python_repl = PythonREPL()
-
-
-tools = []
-
-tools = [
-    *gmail_tools,
-    Tool(
-        name="python_repl",
-        description="A Python shell. Use this to execute python commands. Input should be a valid python command. If you want to see the output of a value, you should print it out with `print(...)`.",
-        func=python_repl.run,
-    ),
-    Tool(
-        name="OpenWeatherMap",
-        func=weather.run,
-        description="Useful for getting current weather information for a given location. Input should be a city name.",
-    ),
-    Tool(
-        name="web_search",
-        func=web_search_tool_fn,
-        description=(
-            "Searches the web for up-to-date information using a search engine. "
-            "Useful for answering questions about current events, live sports, product availability, etc. "
-            "Input should be a plain-text search query."
+@lazy_resource("weather")
+def get_weather():
+    from langchain_community.utilities import OpenWeatherMapAPIWrapper
+
+    return OpenWeatherMapAPIWrapper()
+
+
+@lazy_resource("gmail_tools")
+def get_gmail_tools():
+    from langchain_google_community import GmailToolkit
+    from langchain_google_community.gmail.utils import (
+        get_gmail_credentials,
+        build_resource_service,
+    )
+
+    credentials = get_gmail_credentials(
+        scopes=["https://mail.google.com/"],
+        client_secrets_file="credentials/credentials.json",
+    )
+    api_resource = build_resource_service(credentials=credentials)
+    toolkit = GmailToolkit(api_resource=api_resource)
+    return toolkit.get_tools()
+
+
+@lazy_resource("python_repl")
+def get_python_repl():
+    from langchain_experimental.utilities import PythonREPL
+
+    return PythonREPL()
+
+
+def run_in_thread(func):
+    # Blocking client libraries run off the event loop so a slow call
+    # doesn't stall every other request on the worker.
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    return wrapper
+
+
+def python_repl_run(command: str) -> str:
+    return get_python_repl().run(command)
+
+
+def weather_run(location: str) -> str:
+    return get_weather().run(location)
+
+
+@lazy_resource("tools")
+def get_tools():
+    return [
+        *get_gmail_tools(),
+        Tool(
+            name="python_repl",
+            description="A Python shell. Use this to execute python commands. Input should be a valid python command. If you want to see the output of a value, you should print it out with `print(...)`.",
+            func=python_repl_run,
+            coroutine=run_in_thread(python_repl_run),
+        ),
+        Tool(
+            name="OpenWeatherMap",
+            func=weather_run,
+            coroutine=run_in_thread(weather_run),
+            description="Useful for getting current weather information for a given location. Input should be a city name.",
+        ),
+        Tool(
+            name="college_search",
+            func=None,
+            coroutine=college_search_tool_fn,
+            description=(
+                "Searches the indexed Government Engineering College, Patan website and documents. "
+                "Use this first for anything about the college: admissions, courses, syllabus, faculty, "
+                "fees, notices, events or campus facilities. Falls back to a web search by itself when "
+                "the college documents don't cover the question. Input should be a plain-text question."
+            ),
         ),
-    ),
-]
+        Tool(
+            name="web_search",
+            func=None,
+            coroutine=web_search_route_fn,
+            description=(
+                "Searches the web for up-to-date information using a search engine. "
+                "Useful for answering questions about current events, live sports, product availability, etc. "
+                "Input should be a plain-text search query."
+            ),
+        ),
+    ]
+
 
-tool_node = ToolNode(tools)
+@lazy_resource("tool_node")
+def get_tool_node():
+    return ToolExecutor(get_tools())
@@ -0,0 +1,107 @@
+import time
+import asyncio
+import logging
+
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+from . import metrics
+
+
+class TTLCache:
+    """Byte-bounded LRU cache with stale-while-revalidate.
+
+    Entries are fresh for ``ttl`` seconds and then served stale for another
+    ``stale_ttl`` seconds while a single background task refreshes them.
+    Concurrent misses for the same key share one fetch.
+    """
+
+    def __init__(self, name: str, ttl: float, stale_ttl: float, max_bytes: int):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+        self.size = 0
+        # key -> (value, size, stored_at)
+        self.entries: OrderedDict[str, tuple[Any, int, float]] = OrderedDict()
+        self.inflight: dict[str, asyncio.Future] = {}
+        self.background: set[asyncio.Task] = set()
+
+    def _store(self, key: str, value: Any, size: int):
+        if key in self.entries:
+            self.size -= self.entries.pop(key)[1]
+        if size > self.max_bytes:
+            return
+        self.entries[key] = (value, size, time.monotonic())
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (_, evicted_size, _) = self.entries.popitem(last=False)
+            self.size -= evicted_size
+
+    async def _fetch(
+        self,
+        key: str,
+        fetch: Callable[[Any], Awaitable[tuple[Any, int]]],
+        previous: Any,
+    ) -> Any:
+        future = self.inflight.get(key)
+        while future is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The leader was cancelled (e.g. its client disconnected), not
+                # us: take over the fetch instead of failing every follower.
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+            future = self.inflight.get(key)
+
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        try:
+            value, size = await fetch(previous)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting.
+            future.exception()
+            raise
+        else:
+            self._store(key, value, size)
+            future.set_result(value)
+            return value
+        finally:
+            if self.inflight.get(key) is future:
+                del self.inflight[key]
+
+    async def _revalidate(self, key: str, fetch, previous: Any):
+        try:
+            await self._fetch(key, fetch, previous)
+        except Exception as e:
+            logging.warning(f"[{self.name} cache] Background refresh of {key!r} failed: {e!r}")
+
+    async def get_or_fetch(
+        self, key: str, fetch: Callable[[Any], Awaitable[tuple[Any, int]]]
+    ) -> Any:
+        """``fetch`` receives the previous value (possibly expired) so it can
+        revalidate, and returns ``(value, size_in_bytes)``."""
+        entry = self.entries.get(key)
+        if entry is not None:
+            value, _, stored_at = entry
+            age = time.monotonic() - stored_at
+            if age < self.ttl:
+                self.entries.move_to_end(key)
+                metrics.increment(f"web_cache.{self.name}.hits")
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self.entries.move_to_end(key)
+                metrics.increment(f"web_cache.{self.name}.stale_hits")
+                if key not in self.inflight:
+                    task = asyncio.create_task(self._revalidate(key, fetch, value))
+                    self.background.add(task)
+                    task.add_done_callback(self.background.discard)
+                return value
+
+        metrics.increment(f"web_cache.{self.name}.misses")
+        return await self._fetch(key, fetch, entry[0] if entry else None)
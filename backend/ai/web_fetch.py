@@ -0,0 +1,94 @@
+import asyncio
+import aiohttp
+
+from bs4 import BeautifulSoup
+from config import settings
+
+from .web_cache import TTLCache
+
+
+USER_AGENT = "Mozilla/5.0 (compatible; MyBot/1.0; +http://example.com/bot)"
+
+
+def extract_text(html: str, max_chars: int = settings.WEB_SEARCH_MAX_PAGE_CHARS) -> str:
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(["script", "style", "noscript", "header", "footer", "nav", "form"]):
+        tag.decompose()
+    text = " ".join(soup.get_text(separator=" ").split())
+    return text[:max_chars]
+
+
+class PageFetcher:
+    """Fetches pages concurrently, each bounded by its own timeout."""
+
+    def __init__(
+        self,
+        timeout: float = settings.WEB_SEARCH_FETCH_TIMEOUT_SECONDS,
+        cache: TTLCache | None = None,
+    ):
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.cache = cache
+        self._session: aiohttp.ClientSession | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = aiohttp.ClientSession(
+                timeout=self.timeout, headers={"User-Agent": USER_AGENT}
+            )
+            self._loop = loop
+        return self._session
+
+    async def fetch_text(self, url: str) -> str:
+        if self.cache is None:
+            page = await self._fetch(url, None)
+        else:
+            page = await self.cache.get_or_fetch(
+                url, lambda previous: self._fetch_sized(url, previous)
+            )
+        return page["text"]
+
+    async def _fetch_sized(self, url: str, previous: dict | None):
+        page = await self._fetch(url, previous)
+        return page, len(page["text"]) + 256
+
+    async def _fetch(self, url: str, previous: dict | None) -> dict:
+        # Revalidate with the validators of the cached copy, if any, so an
+        # unchanged page costs a 304 instead of a download and re-parse.
+        headers = {}
+        if previous and previous.get("etag"):
+            headers["If-None-Match"] = previous["etag"]
+        if previous and previous.get("last_modified"):
+            headers["If-Modified-Since"] = previous["last_modified"]
+
+        session = self._get_session()
+        async with session.get(url, headers=headers) as response:
+            if response.status == 304 and previous:
+                return previous
+            response.raise_for_status()
+            validators = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+            if "html" not in response.headers.get("Content-Type", "text/html"):
+                return {"text": "", **validators}
+            html = await response.text(errors="replace")
+        # Parsing is CPU-bound, keep it off the event loop.
+        return {"text": await asyncio.to_thread(extract_text, html), **validators}
+
+    async def fetch_many(self, urls: list[str]) -> list[str]:
+        results = await asyncio.gather(
+            *(self.fetch_text(url) for url in urls), return_exceptions=True
+        )
+        pages = []
+        for url, result in zip(urls, results):
+            if isinstance(result, BaseException):
+                print(f"[FETCH PAGES] Skipping {url}: {result!r}")
+            elif result:
+                pages.append(f"Source: {url}\n{result}")
+        return pages
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
@@ -0,0 +1,62 @@
+import hmac
+import json
+import time
+import uuid
+import base64
+import hashlib
+
+from config import settings
+
+
+# HMAC-signed tokens only; verified with the standard library since no JWT
+# package is in the requirements.
+ALGORITHMS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(message: bytes, algorithm: str) -> bytes:
+    if not settings.JWT_SECRET:
+        raise InvalidToken("JWT_SECRET is not set")
+    if algorithm not in ALGORITHMS:
+        raise InvalidToken(f"Unsupported JWT algorithm {algorithm!r}")
+    return hmac.new(settings.JWT_SECRET.encode(), message, ALGORITHMS[algorithm]).digest()
+
+
+def create_access_token(user_id: uuid.UUID, expires_minutes: int = settings.ACCESS_TOKEN_EXPIRE_MINUTES) -> str:
+    header = {"alg": settings.JWT_ALGORITHM, "typ": "JWT"}
+    payload = {"sub": str(user_id), "exp": int(time.time()) + expires_minutes * 60}
+    signing_input = ".".join(
+        _b64encode(json.dumps(part, separators=(",", ":")).encode()) for part in (header, payload)
+    )
+    return f"{signing_input}.{_b64encode(_sign(signing_input.encode(), settings.JWT_ALGORITHM))}"
+
+
+def decode_access_token(token: str) -> dict:
+    try:
+        header_b64, payload_b64, signature_b64 = token.split(".")
+        header = json.loads(_b64decode(header_b64))
+        payload = json.loads(_b64decode(payload_b64))
+        signature = _b64decode(signature_b64)
+    except ValueError as e:
+        raise InvalidToken("Malformed token") from e
+
+    # The algorithm is pinned by configuration, never taken from the token.
+    if header.get("alg") != settings.JWT_ALGORITHM:
+        raise InvalidToken("Unexpected token algorithm")
+    expected = _sign(f"{header_b64}.{payload_b64}".encode(), settings.JWT_ALGORITHM)
+    if not hmac.compare_digest(signature, expected):
+        raise InvalidToken("Bad signature")
+    if not isinstance(payload.get("exp"), (int, float)) or payload["exp"] < time.time():
+        raise InvalidToken("Token expired")
+    return payload
@@ -0,0 +1,3 @@
+from api.auth.dependencies import get_current_user_id
+
+__all__ = ["get_current_user_id"]
@@ -0,0 +1,14 @@
+import uuid
+
+from fastapi import APIRouter, Depends
+
+from .dependencies import get_current_user_id
+from .schemas import DashboardResponse
+from .services import get_dashboard
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+
+@router.get("/", response_model=DashboardResponse)
+async def dashboard(user_id: uuid.UUID = Depends(get_current_user_id)):
+    return await get_dashboard(user_id)
@@ -0,0 +1,41 @@
+import uuid
+
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class DayStats(BaseModel):
+    date: datetime
+    tasks_created: int = 0
+    tasks_completed: int = 0
+    pomodoro_sessions: int = 0
+    focus_minutes: int = 0
+
+
+class WeekStats(BaseModel):
+    week_start: datetime
+    tasks_completed: int = 0
+    pomodoro_sessions: int = 0
+    focus_minutes: int = 0
+
+
+class ProjectSummary(BaseModel):
+    project_id: uuid.UUID
+    name: str
+    open_tasks: int
+
+
+class UpcomingTask(BaseModel):
+    task_id: uuid.UUID
+    title: str
+    due_date: Optional[datetime]
+    priority: Optional[int]
+
+
+class DashboardResponse(BaseModel):
+    today: DayStats
+    this_week: WeekStats
+    streak_days: int
+    top_projects: List[ProjectSummary]
+    upcoming_tasks: List[UpcomingTask]
@@ -0,0 +1,185 @@
+import uuid
+import asyncio
+
+from datetime import timedelta
+from itertools import chain
+from cachetools import TTLCache
+from sqlalchemy import DateTime, Integer, event, func, literal, null, select, union_all
+from sqlalchemy.orm import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from config import settings
+
+from db.models import PomodoroSession, Project, Task, TaskStatus, UserDailyStats
+from db.rollups import day_start, utcnow, week_start
+from db.session import AsyncSessionLocal
+from .schemas import DashboardResponse, DayStats, ProjectSummary, UpcomingTask, WeekStats
+
+
+OPEN_STATUSES = (TaskStatus.pending, TaskStatus.in_progress)
+
+
+class DashboardCache:
+    """Per-user dashboard responses with single-flight loads. Entries are
+    dropped when a commit in this process touches the user's tasks, projects
+    or sessions; the TTL bounds staleness from other workers."""
+
+    def __init__(self, max_users: int = settings.DASHBOARD_CACHE_SIZE, ttl: float = settings.DASHBOARD_CACHE_TTL_SECONDS):
+        self.responses: TTLCache = TTLCache(maxsize=max_users, ttl=ttl)
+        self.loads: dict[uuid.UUID, asyncio.Future] = {}
+        self.generations: dict[uuid.UUID, int] = {}
+
+    def invalidate(self, user_id: uuid.UUID):
+        self.responses.pop(user_id, None)
+        # A load that started before the write must not repopulate the cache.
+        self.generations[user_id] = self.generations.get(user_id, 0) + 1
+        self.loads.pop(user_id, None)
+
+    async def get(self, user_id: uuid.UUID, load) -> DashboardResponse:
+        response = self.responses.get(user_id)
+        if response is not None:
+            return response
+        future = self.loads.get(user_id)
+        if future is None:
+            generation = self.generations.get(user_id, 0)
+            future = self.loads[user_id] = asyncio.ensure_future(load())
+
+            def store(done: asyncio.Future):
+                if self.loads.get(user_id) is done:
+                    del self.loads[user_id]
+                if not done.cancelled() and done.exception() is None and self.generations.get(user_id, 0) == generation:
+                    self.responses[user_id] = done.result()
+
+            future.add_done_callback(store)
+        return await asyncio.shield(future)
+
+
+dashboard_cache = DashboardCache()
+
+
+@event.listens_for(Session, "after_flush")
+def collect_changed_dashboards(session, flush_context):
+    # Invalidate only once the rows are committed: a load that ran between
+    # the flush and the commit would otherwise cache the old rows under the
+    # new generation.
+    changed = session.info.setdefault("changed_dashboards", set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, (Task, Project, PomodoroSession)):
+            changed.add(obj.user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_changed_dashboards(session):
+    for user_id in session.info.pop("changed_dashboards", ()):
+        dashboard_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_changed_dashboards(session):
+    session.info.pop("changed_dashboards", None)
+
+
+def streak_days(active_days: set, today) -> int:
+    # Today still counts as part of the streak before anything is done today.
+    day = today if today in active_days else today - timedelta(days=1)
+    streak = 0
+    while day in active_days:
+        streak += 1
+        day -= timedelta(days=1)
+    return streak
+
+
+async def load_dashboard(session: AsyncSession, user_id: uuid.UUID) -> DashboardResponse:
+    now = utcnow()
+    today, monday = day_start(now), week_start(now)
+
+    # Round trip 1: the rollup rows. One indexed range scan over at most a
+    # year of single-row-per-day stats covers today, this week and the streak.
+    daily_rows = (
+        await session.exec(
+            select(UserDailyStats).where(  # type: ignore
+                UserDailyStats.user_id == user_id,
+                UserDailyStats.date >= today - timedelta(days=settings.DASHBOARD_STREAK_LOOKBACK_DAYS),
+            )
+        )
+    ).scalars().all()
+
+    # Round trip 2: top projects and upcoming tasks as one UNION ALL, shaped
+    # to shared columns, instead of walking User.tasks / Project.tasks.
+    projects = (
+        select(
+            literal("project").label("kind"),
+            Project.project_id.label("id"),  # type: ignore
+            Project.name.label("title"),  # type: ignore
+            null().cast(DateTime).label("due_date"),
+            null().cast(Integer).label("priority"),
+            func.count(Task.task_id).label("open_tasks"),  # type: ignore
+        )
+        .join(Task, Task.project_id == Project.project_id)  # type: ignore
+        .where(Task.user_id == user_id, Task.status.in_(OPEN_STATUSES))  # type: ignore
+        .group_by(Project.project_id, Project.name)  # type: ignore
+        .order_by(func.count(Task.task_id).desc(), Project.name)  # type: ignore
+        .limit(settings.DASHBOARD_TOP_PROJECTS)
+        .subquery()
+    )
+    upcoming = (
+        select(
+            literal("task").label("kind"),
+            Task.task_id.label("id"),  # type: ignore
+            Task.title.label("title"),  # type: ignore
+            Task.due_date.label("due_date"),  # type: ignore
+            Task.priority.label("priority"),  # type: ignore
+            null().cast(Integer).label("open_tasks"),
+        )
+        .where(Task.user_id == user_id, Task.status.in_(OPEN_STATUSES), Task.due_date >= now)  # type: ignore
+        .order_by(Task.due_date)  # type: ignore
+        .limit(settings.DASHBOARD_UPCOMING_TASKS)
+        .subquery()
+    )
+    rows = (await session.exec(union_all(select(projects), select(upcoming)))).all()  # type: ignore
+
+    by_date = {row.date: row for row in daily_rows}
+    today_row = by_date.get(today)
+    week_rows = [row for row in daily_rows if row.date >= monday]
+    return DashboardResponse(
+        today=DayStats(
+            date=today,
+            tasks_created=today_row.total_tasks_created if today_row else 0,
+            tasks_completed=today_row.tasks_completed if today_row else 0,
+            pomodoro_sessions=today_row.pomodoro_sessions if today_row else 0,
+            focus_minutes=today_row.focus_minutes if today_row else 0,
+        ),
+        this_week=WeekStats(
+            week_start=monday,
+            tasks_completed=sum(row.tasks_completed for row in week_rows),
+            pomodoro_sessions=sum(row.pomodoro_sessions for row in week_rows),
+            focus_minutes=sum(row.focus_minutes for row in week_rows),
+        ),
+        streak_days=streak_days(
+            {row.date for row in daily_rows if row.tasks_completed > 0 or row.pomodoro_sessions > 0},
+            today,
+        ),
+        top_projects=[
+            ProjectSummary(project_id=row.id, name=row.title, open_tasks=row.open_tasks)
+            for row in rows
+            if row.kind == "project"
+        ],
+        upcoming_tasks=sorted(
+            (
+                UpcomingTask(task_id=row.id, title=row.title, due_date=row.due_date, priority=row.priority)
+                for row in rows
+                if row.kind == "task"
+            ),
+            key=lambda task: task.due_date or now,
+        ),
+    )
+
+
+async def _load_with_own_session(user_id: uuid.UUID) -> DashboardResponse:
+    # The load is shared by every request waiting on this user, so it must
+    # not borrow a session that the first request's teardown would close.
+    async with AsyncSessionLocal() as session:
+        return await load_dashboard(session, user_id)
+
+
+async def get_dashboard(user_id: uuid.UUID) -> DashboardResponse:
+    return await dashboard_cache.get(user_id, lambda: _load_with_own_session(user_id))
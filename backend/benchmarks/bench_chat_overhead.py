@@ -0,0 +1,73 @@
+"""Per-request overhead of /ai/chat before and after the lifespan-managed graph.
+
+Run from ``backend/`` with ``DB_URL`` pointing at a Postgres instance:
+
+    python -m benchmarks.bench_chat_overhead --requests 200
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from psycopg_pool import AsyncConnectionPool
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+
+from ai.graph import compile_graph
+from main import connection_kwargs
+
+
+async def per_request_setup(pool: AsyncConnectionPool):
+    # What chat() used to do on every request before running the graph.
+    async with pool.connection() as conn:
+        saver = AsyncPostgresSaver(conn)  # type: ignore
+        await saver.setup()
+        return compile_graph(saver)
+
+
+async def shared_graph(graph):
+    # What chat() does now: the graph already lives on app.state.
+    return graph
+
+
+def report(label: str, timings: list[float]):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"{label:<22} mean={statistics.mean(timings) * 1000:8.3f}ms "
+        f"p50={statistics.median(timings) * 1000:8.3f}ms p95={p95 * 1000:8.3f}ms"
+    )
+
+
+async def main(requests: int):
+    pool = AsyncConnectionPool(
+        conninfo=os.environ["DB_URL"], max_size=20, open=False, kwargs=connection_kwargs
+    )
+    await pool.open()
+    try:
+        checkpointer = AsyncPostgresSaver(pool)  # type: ignore
+        await checkpointer.setup()
+        graph = compile_graph(checkpointer)
+
+        before, after = [], []
+        for _ in range(requests):
+            start = time.perf_counter()
+            await per_request_setup(pool)
+            before.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            await shared_graph(graph)
+            after.append(time.perf_counter() - start)
+
+        report("per-request compile", before)
+        report("lifespan compile", after)
+    finally:
+        await pool.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,64 @@
+"""N parallel chats against the async chat graph with a fake LLM.
+
+The fake model sleeps for ``--latency`` seconds like a slow Gemini call. With
+the async chatbot node N chats should finish in roughly one call's latency;
+the blocking variant shows what happens when a node blocks the event loop.
+
+    python -m benchmarks.bench_concurrent_chat --chats 20 --latency 0.5
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.checkpoint.memory import MemorySaver
+
+from ai.graph import compile_graph
+from ai.resources import override
+
+
+def fake_llm(latency: float, blocking: bool):
+    async def respond(_input):
+        if blocking:
+            time.sleep(latency)
+        else:
+            await asyncio.sleep(latency)
+        return AIMessage(content="ok")
+
+    return RunnableLambda(respond)
+
+
+async def run_chats(chats: int) -> float:
+    graph = compile_graph(MemorySaver())
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            graph.ainvoke(
+                {"messages": ["hello"]},
+                config={"configurable": {"thread_id": str(uuid.uuid4())}},
+            )
+            for _ in range(chats)
+        )
+    )
+    return time.perf_counter() - start
+
+
+async def main(chats: int, latency: float):
+    for label, blocking in (("async", False), ("blocking", True)):
+        override("llm_model", fake_llm(latency, blocking))
+        elapsed = await run_chats(chats)
+        print(
+            f"{label:<9} {chats} chats in {elapsed:.2f}s "
+            f"({elapsed / latency:.1f}x single-call latency)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chats", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+    asyncio.run(main(args.chats, args.latency))
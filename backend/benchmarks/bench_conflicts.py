@@ -0,0 +1,71 @@
+"""Validating a plan against a user's schedule: per-item scan vs ScheduleIndex.
+
+Synthetic schedule of ``--tasks`` open deadlines and ``--sessions`` Pomodoro
+sessions over three months; no database needed.
+
+    python -m benchmarks.bench_conflicts --tasks 5000 --sessions 5000 --subtasks 50
+"""
+
+import argparse
+import random
+import time
+import uuid
+
+from datetime import datetime, timedelta
+
+from ai.conflicts import ScheduleIndex
+from config import settings
+
+
+def naive(tasks, sessions, deadlines, window):
+    # What one query (or scan) per subtask amounts to.
+    found = set()
+    for i, deadline in enumerate(deadlines):
+        for task_id, due in tasks:
+            if abs(due - deadline) <= window:
+                found.add((i, str(task_id)))
+        for session_id, start, end in sessions:
+            if start < deadline + window and end > deadline - window:
+                found.add((i, str(session_id)))
+    return found
+
+
+def main(tasks: int, sessions: int, subtasks: int, repeats: int):
+    rng = random.Random(0)
+    now = datetime.now().replace(microsecond=0)
+    minutes = 60 * 24 * 90
+    task_rows = [(uuid.uuid4(), now + timedelta(minutes=rng.randint(0, minutes))) for _ in range(tasks)]
+    session_rows = []
+    for _ in range(sessions):
+        start = now + timedelta(minutes=rng.randint(0, minutes))
+        session_rows.append((uuid.uuid4(), start, start + timedelta(minutes=rng.choice([25, 50, 90]))))
+    window = timedelta(minutes=settings.TASK_CONFLICT_WINDOW_MINUTES)
+
+    start = time.perf_counter()
+    index = ScheduleIndex(task_rows, session_rows)
+    build = time.perf_counter() - start
+
+    naive_time = indexed_time = 0.0
+    for _ in range(repeats):
+        deadlines = [now + timedelta(minutes=rng.randint(0, minutes)) for _ in range(subtasks)]
+        start = time.perf_counter()
+        expected = naive(task_rows, session_rows, deadlines, window)
+        naive_time += time.perf_counter() - start
+        start = time.perf_counter()
+        conflicts = index.find(deadlines, window)
+        indexed_time += time.perf_counter() - start
+        assert {(c["subtask"], c["id"]) for c in conflicts} == expected
+
+    print(f"index build ({tasks} tasks, {sessions} sessions): {build * 1000:.1f}ms (once per user, cached)")
+    print(f"per-item scan, {subtasks} subtasks: {naive_time / repeats * 1000:.2f}ms/plan")
+    print(f"ScheduleIndex, {subtasks} subtasks: {indexed_time / repeats * 1000:.2f}ms/plan")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--subtasks", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+    main(args.tasks, args.sessions, args.subtasks, args.repeats)
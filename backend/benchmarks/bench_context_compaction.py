@@ -0,0 +1,82 @@
+"""Prompt size per turn as a thread grows, with summarizing compaction.
+
+Both the chat model and the summarizer are replaced with fakes, so this runs
+without API keys. Prompt size should level off once compaction kicks in
+instead of growing with the thread; the run fails if compaction never ran
+or if the history sent to the model ever exceeds the compaction trigger.
+Token counts use tiktoken, which downloads ``CONTEXT_TOKENIZER_ENCODING`` on
+first use; offline, point ``TIKTOKEN_CACHE_DIR`` at a directory holding it.
+
+    python -m benchmarks.bench_context_compaction --turns 60
+"""
+
+import argparse
+import asyncio
+
+from langchain_core.messages import AIMessage, SystemMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.checkpoint.memory import MemorySaver
+
+from ai.context_manager import count_tokens
+from ai.graph import compile_graph
+from ai.resources import override
+from config import settings
+
+prompt_sizes: list[int] = []
+history_sizes: list[int] = []
+
+
+async def fake_chat_model(inputs):
+    system_message = SystemMessage(content=inputs["system_message"])
+    history_sizes.append(count_tokens(inputs["messages"]))
+    prompt_sizes.append(count_tokens([system_message, *inputs["messages"]]))
+    return AIMessage(content="Sure, here is a fairly detailed answer. " * 15)
+
+
+async def fake_summarizer(messages):
+    return AIMessage(content="The user and assistant discussed many things. " * 10)
+
+
+async def main(turns: int):
+    override("llm_model", RunnableLambda(fake_chat_model))
+    override("llm", RunnableLambda(fake_summarizer))
+
+    graph = compile_graph(MemorySaver())
+    config = {"configurable": {"thread_id": "bench"}}
+    for turn in range(1, turns + 1):
+        await graph.ainvoke(
+            {"messages": [f"question {turn}: " + "tell me more about this " * 10]},
+            config=config,  # type: ignore
+        )
+        state = await graph.aget_state(config)  # type: ignore
+        if turn % 5 == 0:
+            print(
+                f"turn {turn:>4}  prompt_tokens={prompt_sizes[-1]:>5}  "
+                f"stored_messages={len(state.values['messages']):>4}"
+            )
+
+    # Compaction runs before the model call whenever the history passes the
+    # trigger, so the history in every prompt stays under it no matter how
+    # long the thread gets; the rest of the prompt is the system message and
+    # the bounded summary.
+    assert state.values.get("summary"), f"compaction never ran in {turns} turns"
+    assert max(history_sizes) <= settings.CONTEXT_COMPACTION_TRIGGER_TOKENS, (
+        f"history reached {max(history_sizes)} tokens, "
+        f"over the {settings.CONTEXT_COMPACTION_TRIGGER_TOKENS}-token trigger"
+    )
+    # The system message only grows by the summary, which is replaced rather
+    # than appended to, so it must not grow after the first compaction.
+    system_sizes = [prompt - history for prompt, history in zip(prompt_sizes, history_sizes)]
+    first_compacted = next(i for i, size in enumerate(system_sizes) if size > system_sizes[0])
+    assert max(system_sizes[first_compacted:]) <= system_sizes[first_compacted] * 1.5, "summary kept growing"
+    print(
+        f"prompt tokens bounded over {turns} turns: max {max(prompt_sizes)}, "
+        f"last turn {prompt_sizes[-1]}, history trigger {settings.CONTEXT_COMPACTION_TRIGGER_TOKENS}: OK"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=60)
+    args = parser.parse_args()
+    asyncio.run(main(args.turns))
@@ -0,0 +1,140 @@
+"""Load test of ``GET /dashboard/`` at realistic concurrency.
+
+Seeds ``--users`` users with projects, tasks and finished Pomodoro sessions
+(through the ORM, so the rollup listeners fill the stats tables), then drives
+the endpoint in-process over ASGI with ``--concurrency`` clients, each
+sending a signed access token, and reports
+latency percentiles with the per-user cache disabled and enabled. With
+``--write-ratio`` that share of requests first completes a task, which
+invalidates the user's cached dashboard. Point ``DATABASE_URL`` at a scratch
+database and set any ``JWT_SECRET``:
+
+    DATABASE_URL=sqlite+aiosqlite:////tmp/dashboard.db JWT_SECRET=bench python -m benchmarks.bench_dashboard_load --users 200 --requests 5000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+
+from datetime import datetime, timedelta
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlmodel import SQLModel, select
+
+from api.auth.services import create_access_token
+from api.dashboard import services
+from api.dashboard.routes import router
+from config import settings
+from db.models import PomodoroSession, Project, Task, TaskStatus, User
+from db.session import AsyncSessionLocal, engine
+
+
+async def seed(users: int, tasks_per_user: int) -> list[uuid.UUID]:
+    rng = random.Random(0)
+    now = datetime.now().replace(microsecond=0)
+    user_ids = []
+    for u in range(users):
+        async with AsyncSessionLocal() as session:
+            user = User(username=f"user{u}", email=f"user{u}@example.com", password_hash="x")
+            projects = [Project(user_id=user.user_id, name=f"project {p}") for p in range(8)]
+            session.add(user)
+            session.add_all(projects)
+            for t in range(tasks_per_user):
+                task = Task(
+                    user_id=user.user_id,
+                    project_id=rng.choice(projects).project_id,
+                    title=f"task {t}",
+                    priority=rng.randint(1, 5),
+                    due_date=now + timedelta(hours=rng.randint(-24 * 30, 24 * 30)),
+                    status=rng.choice(list(TaskStatus)),
+                    created_at=now - timedelta(days=rng.randint(0, 60)),
+                )
+                task.updated_at = task.created_at
+                session.add(task)
+                if rng.random() < 0.5:
+                    start = now - timedelta(days=rng.randint(0, 60), minutes=rng.randint(30, 600))
+                    session.add(PomodoroSession(
+                        task_id=task.task_id,
+                        user_id=user.user_id,
+                        start_time=start,
+                        end_time=start + timedelta(minutes=25),
+                        duration_minutes=25,
+                    ))
+            await session.commit()
+        user_ids.append(user.user_id)
+    return user_ids
+
+
+async def complete_a_task(user_id: uuid.UUID):
+    async with AsyncSessionLocal() as session:
+        task = (await session.exec(
+            select(Task).where(Task.user_id == user_id, Task.status != TaskStatus.completed).limit(1)
+        )).first()
+        if task is not None:
+            task.status = TaskStatus.completed
+            await session.commit()
+
+
+async def run(client: AsyncClient, user_ids, requests: int, concurrency: int, write_ratio: float):
+    rng = random.Random(1)
+    # Skewed like real traffic: a minority of users refresh most often.
+    weights = [1 / (rank + 1) for rank in range(len(user_ids))]
+    plan = [(uid, rng.random() < write_ratio) for uid in rng.choices(user_ids, weights, k=requests)]
+    latencies: list[float] = []
+    queue = iter(plan)
+    headers = {uid: {"Authorization": f"Bearer {create_access_token(uid)}"} for uid in user_ids}
+
+    async def worker():
+        for user_id, write in queue:
+            if write:
+                await complete_a_task(user_id)
+            start = time.perf_counter()
+            response = await client.get("/dashboard/", headers=headers[user_id])
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start
+
+
+def report(label: str, latencies: list[float], elapsed: float):
+    cuts = statistics.quantiles(latencies, n=100)
+    print(
+        f"{label:<8} {len(latencies) / elapsed:8.0f} req/s  "
+        f"p50 {cuts[49] * 1000:7.2f}ms  p95 {cuts[94] * 1000:7.2f}ms  p99 {cuts[98] * 1000:7.2f}ms"
+    )
+
+
+async def main(users: int, tasks_per_user: int, requests: int, concurrency: int, write_ratio: float):
+    engine.echo = False
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    start = time.perf_counter()
+    user_ids = await seed(users, tasks_per_user)
+    print(f"seeded {users} users x {tasks_per_user} tasks in {time.perf_counter() - start:.1f}s")
+
+    app = FastAPI()
+    app.include_router(router)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        print(f"{requests} requests, {concurrency} concurrent, {write_ratio:.0%} preceded by a write")
+        for label, ttl in (("no cache", 0), ("cached", settings.DASHBOARD_CACHE_TTL_SECONDS)):
+            services.dashboard_cache = services.DashboardCache(ttl=ttl)
+            report(label, *await run(client, user_ids, requests, concurrency, write_ratio))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--tasks-per-user", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--write-ratio", type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.tasks_per_user, args.requests, args.concurrency, args.write_ratio))
@@ -0,0 +1,55 @@
+"""Chunk-and-embed throughput on the sample PDF.
+
+Runs semantic chunking plus embedding of the resulting chunks (what indexing
+does) three ways: the previous setup with two OpenCLIPEmbeddings instances,
+the shared EmbeddingService with a cold cache, and again with a warm cache.
+
+    python -m benchmarks.bench_embedding_throughput --pdf sample_data/somatosensory.pdf
+"""
+
+import argparse
+import tempfile
+import time
+
+from pathlib import Path
+from langchain_community.document_loaders import PyMuPDFLoader
+from langchain_experimental.open_clip import OpenCLIPEmbeddings
+from langchain_experimental.text_splitter import SemanticChunker
+
+from ai.embedding_service import EmbeddingService
+from config import settings
+
+
+def run(label: str, chunk_embeddings, index_embeddings, documents):
+    start = time.perf_counter()
+    splitter = SemanticChunker(chunk_embeddings, breakpoint_threshold_type="gradient")
+    chunks = splitter.split_documents(documents)
+    index_embeddings.embed_documents([chunk.page_content for chunk in chunks])
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<16} {len(documents)} pages, {len(chunks)} chunks in {elapsed:7.2f}s "
+        f"({len(documents) / elapsed:6.2f} pages/s, {len(chunks) / elapsed:7.2f} chunks/s)"
+    )
+
+
+def main(pdf: str, batch_size: int, skip_legacy: bool):
+    documents = PyMuPDFLoader(file_path=Path(pdf).resolve(), mode="page").load()
+
+    if not skip_legacy:
+        model = dict(model_name=settings.EMBEDDING_MODEL_NAME, checkpoint=settings.EMBEDDING_CHECKPOINT)
+        run("two models", OpenCLIPEmbeddings(**model), OpenCLIPEmbeddings(**model), documents)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        service = EmbeddingService(batch_size=batch_size, cache_dir=cache_dir)
+        run("service (cold)", service, service, documents)
+        run("service (warm)", service, service, documents)
+        print(f"cache stats: {service.stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pdf", default="sample_data/somatosensory.pdf")
+    parser.add_argument("--batch-size", type=int, default=settings.EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+    main(args.pdf, args.batch_size, args.skip_legacy)
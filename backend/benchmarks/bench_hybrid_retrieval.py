@@ -0,0 +1,115 @@
+"""Hit rate and latency of vector-only vs hybrid (BM25 + vector) retrieval.
+
+Builds a synthetic corpus where each chunk mentions a unique identifier (a
+course code, like the ones students search for) and embeds it with hashed
+word and character-trigram features, so no model is downloaded.
+
+    python -m benchmarks.bench_hybrid_retrieval --chunks 20000 --queries 500
+"""
+
+import argparse
+import hashlib
+import random
+import tempfile
+import time
+import numpy as np
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from ai.resources import override
+from ai.response_cache import normalize_query
+from ai.local_vector_store import LocalVectorStore
+from ai.retrieval import BM25Index, HybridRetriever
+
+TOPICS = ["admission", "hostel", "exam", "syllabus", "placement", "library", "fees", "scholarship"]
+
+
+def embed_query(text: str, dim: int = 512) -> np.ndarray:
+    normalized = normalize_query(text)
+    vector = np.zeros(dim, dtype=np.float32)
+    padded = f" {normalized} "
+    features = normalized.split() + [padded[i : i + 3] for i in range(len(padded) - 2)]
+    for feature in features:
+        digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+        vector[int.from_bytes(digest[:4], "little") % dim] += 1.0 if digest[4] & 1 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class HashedEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [embed_query(text).tolist() for text in texts]
+
+    def embed_query(self, text):
+        return embed_query(text).tolist()
+
+
+def percentile(timings, q):
+    timings = sorted(timings)
+    return timings[min(len(timings) - 1, int(len(timings) * q))] * 1000
+
+
+def main(chunks: int, queries: int, k: int):
+    rng = random.Random(0)
+    codes = [f"{rng.choice('ABCDEFGH')}{rng.randint(1000, 9999)}{i}" for i in range(chunks)]
+    topics = [rng.choice(TOPICS) for _ in range(chunks)]
+    documents = [
+        Document(
+            page_content=f"Details about {topic} for course {code}, "
+            f"semester {rng.randint(1, 8)} of the {rng.choice(TOPICS)} programme.",
+            metadata={"source": f"page-{i // 10}"},
+        )
+        for i, (code, topic) in enumerate(zip(codes, topics))
+    ]
+    targets = rng.sample(range(chunks), queries)
+    questions = [f"what are the {topics[i]} details for {codes[i]}" for i in targets]
+
+    with tempfile.TemporaryDirectory() as path:
+        embeddings = HashedEmbeddings()
+        store = LocalVectorStore(embeddings, path=path)
+        store.add_documents(documents)
+        bm25 = BM25Index(path=f"{path}/bm25.json")
+        start = time.perf_counter()
+        bm25.replace_sources(documents)
+        print(f"bm25 indexed {chunks} chunks in {time.perf_counter() - start:.2f}s")
+
+        override("embeddings", embeddings)
+        override("vector_store", store)
+        override("bm25_index", bm25)
+        override("reranker", None)
+
+        for label, search in (
+            ("vector only", lambda q: store.similarity_search(q, k=k)),
+            ("bm25 only", lambda q: [doc for doc, _ in bm25.search(q, k)]),
+            ("hybrid", lambda q: HybridRetriever(k=k).retrieve(q)),
+        ):
+            hits, timings = 0, []
+            for question, target in zip(questions, targets):
+                begin = time.perf_counter()
+                results = search(question)
+                timings.append(time.perf_counter() - begin)
+                hits += any(codes[target] in doc.page_content for doc in results)
+            print(
+                f"{label:<12} hit@{k}={hits / queries:.3f} "
+                f"p50={percentile(timings, 0.5):.2f}ms p95={percentile(timings, 0.95):.2f}ms"
+            )
+
+        retriever = HybridRetriever(k=k)
+        begin = time.perf_counter()
+        retriever.batch(questions)
+        batched = time.perf_counter() - begin
+        begin = time.perf_counter()
+        for question in questions:
+            retriever.retrieve(question)
+        cached = time.perf_counter() - begin
+        print(f"batched: {batched / queries * 1000:.2f}ms/query, cached: {cached / queries * 1000:.3f}ms/query")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+    main(args.chunks, args.queries, args.k)
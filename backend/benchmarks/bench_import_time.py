@@ -0,0 +1,63 @@
+"""Startup import-time report with a regression guard.
+
+Runs ``python -X importtime -c "import main"`` in a fresh interpreter, prints
+the slowest top-level packages by cumulative import time and exits non-zero
+when the total exceeds ``--budget-seconds``. Heavy clients (Gemini, Gmail,
+CLIP, Pinecone, ...) are built lazily, so they must not show up here.
+
+    python -m benchmarks.bench_import_time --budget-seconds 3
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def import_times(module: str) -> list[tuple[str, int, int]]:
+    env = {**os.environ, "DB_URL": os.environ.get("DB_URL", "postgresql://localhost/bench")}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append((name.rstrip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main(module: str, top: int, budget_seconds: float):
+    rows = import_times(module)
+    # Top-level imports are the ones without indentation in the module name.
+    top_level = [(name.strip(), cumulative) for name, _, cumulative in rows if not name.startswith("  ")]
+    total = sum(cumulative for _, cumulative in top_level) / 1e6
+
+    print(f"{'package':<50} {'cumulative':>12}")
+    for name, cumulative in sorted(top_level, key=lambda row: row[1], reverse=True)[:top]:
+        print(f"{name:<50} {cumulative / 1000:>10.1f}ms")
+    print(f"\ntotal import time for {module}: {total:.3f}s (budget {budget_seconds:.3f}s)")
+
+    if total > budget_seconds:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--budget-seconds", type=float, default=3.0)
+    args = parser.parse_args()
+    main(args.module, args.top, args.budget_seconds)
@@ -0,0 +1,103 @@
+"""Crash-and-resume check of the ingestion job queue, with no external services.
+
+Registers a fake ``@job_handler`` that "indexes" ``--sources`` sources,
+runs it in a child process that hard-exits after ``--crash-after`` of them
+(no shutdown, no final save), then starts a fresh ``JobQueue`` on the same
+state file and checks that the job resumes, skips every source it had
+already recorded and completes.
+
+    python -m benchmarks.bench_job_resume --sources 50 --crash-after 20
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+
+from ai.jobs import IngestJob, JobQueue, job_handler
+
+
+@job_handler("fake")
+async def run_fake_job(job: IngestJob):
+    log = Path(job.params["log"])
+    crash_after = job.params.get("crash_after") if os.environ.get("BENCH_JOB_CHILD") else None
+    sources = [f"source-{i}" for i in range(job.params["sources"])]
+    job.total_sources = len(sources)
+    for source in sources:
+        if job.is_done(source):
+            continue
+        await asyncio.sleep(0.001)
+        with open(log, "a") as f:
+            f.write(source + "\n")
+        job.record([source], pages=1, chunks=1)
+        if crash_after and len(job.completed_sources) >= crash_after:
+            os._exit(1)  # a crash: nothing after the last checkpoint runs
+
+
+async def wait_for(queue: JobQueue, job_id: str, timeout: float = 30) -> IngestJob:
+    deadline = time.monotonic() + timeout
+    while True:
+        job = queue.get(job_id)
+        if job and job.status not in ("queued", "running"):
+            return job
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Job {job_id} did not finish")
+        await asyncio.sleep(0.01)
+
+
+async def child(state_path: str, sources: int, crash_after: int, log: str):
+    queue = JobQueue(state_path, workers=1)
+    await queue.start()
+    job = queue.submit("fake", {"sources": sources, "crash_after": crash_after, "log": log})
+    await wait_for(queue, job.id)
+    raise AssertionError("the child was supposed to crash mid-job")
+
+
+async def resume(state_path: str) -> IngestJob:
+    queue = JobQueue(state_path, workers=1)
+    start = time.perf_counter()
+    await queue.start()
+    (job,) = queue.list()
+    job = await wait_for(queue, job.id)
+    await queue.stop()
+    print(f"resumed and finished in {time.perf_counter() - start:.2f}s")
+    return job
+
+
+def main(sources: int, crash_after: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        state_path, log = str(Path(tmp) / "jobs.json"), Path(tmp) / "processed.log"
+        result = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_job_resume", "--child", state_path,
+             "--sources", str(sources), "--crash-after", str(crash_after)],
+            env={**os.environ, "BENCH_JOB_CHILD": "1", "BENCH_JOB_LOG": str(log)},
+        )
+        assert result.returncode == 1, f"child exited with {result.returncode}, expected a crash"
+        before = log.read_text().splitlines()
+        print(f"child crashed after {len(before)} sources")
+
+        job = asyncio.run(resume(state_path))
+        after = log.read_text().splitlines()[len(before):]
+
+        assert job.status == "completed", job.progress()
+        assert not set(before) & set(after), "resumed job redid recorded sources"
+        assert sorted(before + after) == sorted(f"source-{i}" for i in range(sources))
+        assert job.attempts == 2 and len(job.completed_sources) == sources
+        print(f"resume skipped {len(before)} recorded sources and indexed the remaining {len(after)}: OK")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sources", type=int, default=50)
+    parser.add_argument("--crash-after", type=int, default=20)
+    parser.add_argument("--child", metavar="STATE_PATH", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        asyncio.run(child(args.child, args.sources, args.crash_after, os.environ["BENCH_JOB_LOG"]))
+    else:
+        main(args.sources, args.crash_after)
@@ -0,0 +1,118 @@
+"""EXPLAIN plans and timings of the dashboard-style queries at 1M rows.
+
+Seeds ``--users`` users with ``--rows`` tasks and as many Pomodoro sessions
+(generate_series, so seeding takes seconds), then runs each query with the
+migration's indexes and again with them dropped inside a rolled-back
+transaction. Needs a scratch Postgres database migrated to head:
+
+    DATABASE_URL=postgresql+asyncpg://.../bench alembic upgrade head
+    DATABASE_URL=postgresql+asyncpg://.../bench python -m benchmarks.bench_query_plans --rows 1000000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from datetime import datetime, timedelta
+from sqlalchemy import text
+
+from db.session import engine
+
+SEED = [
+    """INSERT INTO "user" (user_id, username, email, is_active, password_hash, created_at, updated_at)
+       SELECT gen_random_uuid(), 'user' || i, 'user' || i || '@example.com', true, 'x', now(), now()
+       FROM generate_series(1, :users) AS i""",
+    """INSERT INTO project (project_id, user_id, name, created_at, updated_at)
+       SELECT gen_random_uuid(), user_id, 'project ' || p, now(), now()
+       FROM "user", generate_series(1, 10) AS p""",
+    """INSERT INTO task (task_id, user_id, project_id, title, status, priority, due_date, created_at, updated_at)
+       WITH p AS (SELECT user_id, project_id, row_number() OVER () - 1 AS n FROM project)
+       SELECT gen_random_uuid(), p.user_id, p.project_id, 'task ' || i,
+              (ARRAY['pending', 'in_progress', 'completed'])[1 + (i % 3)]::taskstatus,
+              1 + (i % 5), now() + (random() * interval '365 days') - interval '180 days', now(), now()
+       FROM generate_series(1, :rows) AS i
+       JOIN p ON p.n = i % (:users * 10)""",
+    """INSERT INTO pomodorosession (session_id, task_id, user_id, start_time, end_time, duration_minutes)
+       SELECT gen_random_uuid(), t.task_id, t.user_id, s, s + interval '25 minutes', 25
+       FROM (SELECT task_id, user_id, now() - (random() * interval '365 days') AS s FROM task) t""",
+    "ANALYZE",
+]
+
+# query -> (sql, indexes added by 0002, the 0001 indexes it replaced)
+QUERIES = {
+    "pending tasks due this week": (
+        """SELECT task_id, title, due_date FROM task
+           WHERE user_id = :user_id AND status = 'pending' AND due_date >= :now AND due_date < :week
+           ORDER BY due_date""",
+        ["ix_task_user_id_status_due_date"],
+        ["CREATE INDEX ix_task_user_id ON task (user_id)"],
+    ),
+    "sessions today": (
+        """SELECT session_id, start_time, end_time FROM pomodorosession
+           WHERE user_id = :user_id AND start_time >= :today AND start_time < :tomorrow""",
+        ["ix_pomodorosession_user_id_start_time"],
+        ["CREATE INDEX ix_pomodorosession_user_id ON pomodorosession (user_id)"],
+    ),
+    "tasks in a project": (
+        "SELECT task_id, title FROM task WHERE project_id = :project_id",
+        ["ix_task_project_id"],
+        [],
+    ),
+}
+
+
+async def explain(conn, sql: str, params: dict) -> tuple[str, float]:
+    result = await conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params)
+    plan = result.scalar()
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    node = plan[0]["Plan"]
+    kinds = []
+    while node:
+        kinds.append(f"{node['Node Type']}" + (f" on {node['Index Name']}" if "Index Name" in node else ""))
+        node = (node.get("Plans") or [None])[0]
+    return " -> ".join(kinds), plan[0]["Execution Time"]
+
+
+async def main(users: int, rows: int, seed: bool):
+    async with engine.begin() as conn:
+        if seed:
+            start = time.perf_counter()
+            for sql in SEED:
+                await conn.execute(text(sql), {"users": users, "rows": rows})
+            print(f"seeded {rows} tasks and sessions in {time.perf_counter() - start:.1f}s")
+
+    async with engine.connect() as conn:
+        user_id, project_id = (await conn.execute(text("SELECT user_id, project_id FROM project LIMIT 1"))).one()
+        await conn.rollback()
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        params = {
+            "user_id": user_id,
+            "project_id": project_id,
+            "now": datetime.now(),
+            "week": datetime.now() + timedelta(days=7),
+            "today": today,
+            "tomorrow": today + timedelta(days=1),
+        }
+        for label, (sql, indexes, baseline) in QUERIES.items():
+            for variant in ("0002", "0001"):
+                # DDL is transactional in Postgres: the rollback restores the indexes.
+                transaction = await conn.begin()
+                if variant == "0001":
+                    for name in indexes:
+                        await conn.execute(text(f"DROP INDEX {name}"))
+                    for ddl in baseline:
+                        await conn.execute(text(ddl))
+                    await conn.execute(text("ANALYZE task, pomodorosession"))
+                plan, ms = await explain(conn, sql, params)
+                await transaction.rollback()
+                print(f"{label:<28} {variant} {ms:9.2f}ms  {plan}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--no-seed", dest="seed", action="store_false")
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.rows, args.seed))
@@ -0,0 +1,95 @@
+"""Incremental indexing throughput of the record manager at 10k+ chunks.
+
+Indexes ``--chunks`` synthetic chunks with fake embeddings into an in-memory
+vector store, so the timings are the record manager's: first a cold index,
+then a re-index where every chunk is unchanged, then ``--workers`` parallel
+writers over disjoint sources. Compares LangChain's default batch sizes on a
+rollback-journal SQLite file with the configured batches on WAL (or on
+Postgres with ``--db-url``).
+
+    python -m benchmarks.bench_record_manager --chunks 20000 --workers 4
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from langchain.indexes import SQLRecordManager, index
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.vectorstores import InMemoryVectorStore
+from sqlalchemy import create_engine
+
+from ai.embedding import create_record_manager_engine, record_manager_url
+from config import settings
+
+
+def make_documents(chunks: int, sources: int):
+    return [
+        Document(page_content=f"chunk {i} of source {i % sources}", metadata={"source": f"source-{i % sources}"})
+        for i in range(chunks)
+    ]
+
+
+def run(label: str, engine, documents, workers: int, batch_size: int, cleanup_batch_size: int):
+    record_manager = SQLRecordManager(f"bench/{label}/{time.time_ns()}", engine=engine)
+    record_manager.create_schema()
+    vector_store = InMemoryVectorStore(DeterministicFakeEmbedding(size=8))
+
+    def index_part(part):
+        return index(
+            part,
+            record_manager,
+            vector_store,
+            cleanup="incremental",
+            source_id_key="source",
+            batch_size=batch_size,
+            cleanup_batch_size=cleanup_batch_size,
+        )
+
+    for phase in ("cold", "unchanged"):
+        start = time.perf_counter()
+        index_part(documents)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<22} {phase:<10} {len(documents) / elapsed:9.0f} chunks/s")
+
+    # Disjoint sources per worker, as parallel ingestion jobs would write.
+    parts = [[doc for doc in documents if hash(doc.metadata["source"]) % workers == w] for w in range(workers)]
+    for part in parts:
+        for doc in part:
+            doc.page_content += " (edited)"
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        list(pool.map(index_part, parts))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {f'{workers} writers':<10} {len(documents) / elapsed:9.0f} chunks/s")
+
+
+def main(chunks: int, sources: int, workers: int, db_url: str):
+    with tempfile.TemporaryDirectory() as path:
+        baseline = create_engine(f"sqlite:///{os.path.join(path, 'baseline.sql')}")
+        run("sqlite, batch 100", baseline, make_documents(chunks, sources), workers, 100, 1000)
+
+        settings.RECORD_MANAGER_SQLITE_PATH = os.path.join(path, "wal.sql")
+        url = db_url or record_manager_url()
+        engine = create_record_manager_engine(url)
+        run(
+            f"{engine.dialect.name}, batch {settings.INDEX_BATCH_SIZE}",
+            engine,
+            make_documents(chunks, sources),
+            workers,
+            settings.INDEX_BATCH_SIZE,
+            settings.INDEX_CLEANUP_BATCH_SIZE,
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=20_000)
+    parser.add_argument("--sources", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--db-url", default="", help="SQLAlchemy URL; defaults to the configured record manager")
+    args = parser.parse_args()
+    main(args.chunks, args.sources, args.workers, args.db_url)
@@ -0,0 +1,94 @@
+"""Latency and paid calls per question: always web_search vs college_search routing.
+
+Uses the fake Serper/page server from ``bench_web_search_fanout``, the fake LLM
+from ``bench_web_search_fastpath`` and a fake retriever that is confident for
+``--local-share`` of the questions, as the college index would be for
+questions about the college.
+
+    python -m benchmarks.bench_routing --questions 40 --local-share 0.7
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from aiohttp import web
+from langchain_core.documents import Document
+
+from ai import metrics, routing, searchBuilder
+from ai.resources import override
+from config import settings
+from benchmarks.bench_web_search_fanout import fake_server
+from benchmarks.bench_web_search_fastpath import fake_llm
+
+
+class FakeRetriever:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def aretrieve(self, query, k=None, filter=None):
+        await asyncio.sleep(self.latency)
+        score = 0.9 if query.startswith("college") else 0.3
+        return [Document(page_content=f"chunk for {query}", metadata={"source": "local", "vector_score": score})]
+
+
+async def measure(label: str, tool, questions):
+    before = metrics.snapshot()["counters"]
+    timings = []
+    for question in questions:
+        start = time.perf_counter()
+        await tool(question)
+        timings.append(time.perf_counter() - start)
+    after = metrics.snapshot()["counters"]
+    cost = {
+        kind: after.get(f"cost.{kind}", 0) - before.get(f"cost.{kind}", 0)
+        for kind in ("llm_calls", "serper_requests")
+    }
+    print(
+        f"{label:<10} mean={statistics.mean(timings):.3f}s p50={statistics.median(timings):.3f}s "
+        f"llm_calls={cost['llm_calls']} serper_requests={cost['serper_requests']}"
+    )
+
+
+async def main(questions: int, local_share: float, llm_latency: float, http_latency: float):
+    runner = web.AppRunner(fake_server(http_latency))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore
+
+    searchBuilder.get_search().base_url = f"http://127.0.0.1:{port}"
+    override("llm", fake_llm(llm_latency))
+    override("hybrid_retriever", FakeRetriever(0.02))
+    settings.WEB_SEARCH_REWRITE_FAST_PATH = False
+
+    rng = random.Random(0)
+    batch = [
+        f"{'college' if rng.random() < local_share else 'news'} question {i}"
+        for i in range(questions)
+    ]
+    try:
+        # Distinct suffixes keep the Serper and rewrite caches cold for both runs.
+        await measure("web only", routing.web_search_route_fn, [f"{q} a" for q in batch])
+        await measure("routed", routing.college_search_tool_fn, [f"{q} b" for q in batch])
+        routes = metrics.snapshot()["histograms"]
+        for route in ("local", "web", "web_direct"):
+            histogram = routes.get(f"route.{route}.latency_seconds")
+            if histogram:
+                print(f"route.{route:<10} count={histogram['count']} p50={histogram['p50']}s p95={histogram['p95']}s")
+    finally:
+        await searchBuilder.get_search().close()
+        await searchBuilder.get_page_fetcher().close()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=40)
+    parser.add_argument("--local-share", type=float, default=0.7)
+    parser.add_argument("--llm-latency", type=float, default=0.8)
+    parser.add_argument("--http-latency", type=float, default=0.1)
+    args = parser.parse_args()
+    asyncio.run(main(args.questions, args.local_share, args.llm_latency, args.http_latency))
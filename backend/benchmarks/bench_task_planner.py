@@ -0,0 +1,97 @@
+"""Per-plan latency of the task planner: two sequential LLM calls vs one.
+
+A fake LLM answers every call after ``--llm-latency`` seconds, so the numbers
+are the planner's round trips plus the conflict query and the single-
+transaction insert. Run from ``backend/`` with ``DATABASE_URL`` pointing at
+an async database (e.g. ``postgresql+asyncpg://...``):
+
+    python -m benchmarks.bench_task_planner --plans 50 --llm-latency 0.8
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from datetime import datetime, timedelta
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from sqlmodel import SQLModel
+
+from ai.resources import override
+from ai.taskBuilder import Plan, PlannedSubtask, compile_task_planner
+from db.models import User
+from db.session import AsyncSessionLocal, engine
+
+
+class FakeLLM:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.plans = 0
+
+    async def _plan(self, messages):
+        await asyncio.sleep(self.latency)
+        # A week apart per plan, so plans don't conflict with each other.
+        start = datetime.now() + timedelta(weeks=self.plans)
+        self.plans += 1
+        return Plan(
+            goal="Prepare for the data structures exam on Friday",
+            subtasks=[
+                PlannedSubtask(title=f"Revise unit {i}", due_date=start + timedelta(days=i), priority="medium")
+                for i in range(1, 6)
+            ],
+        )
+
+    def with_structured_output(self, schema):
+        return RunnableLambda(self._plan)
+
+    async def ainvoke(self, messages):
+        await asyncio.sleep(self.latency)
+        return AIMessage(content="ok")
+
+
+def report(label: str, timings: list[float]):
+    timings = sorted(timings)
+    p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+    print(
+        f"{label:<28} mean={statistics.mean(timings) * 1000:8.1f}ms "
+        f"p50={statistics.median(timings) * 1000:8.1f}ms p95={p95 * 1000:8.1f}ms"
+    )
+
+
+async def main(plans: int, llm_latency: float):
+    llm = FakeLLM(llm_latency)
+    override("llm", llm)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    user = User(username="bench", email="bench@example.com", password_hash="x")
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            session.add(user)
+
+    # The old pipeline: extract the goal, then a second call to decompose it.
+    before = []
+    for _ in range(plans):
+        start = time.perf_counter()
+        await llm.ainvoke([])
+        await llm.ainvoke([])
+        before.append(time.perf_counter() - start)
+    report("two calls (no insert)", before)
+
+    planner = compile_task_planner()
+    after = []
+    for i in range(plans):
+        start = time.perf_counter()
+        result = await planner.ainvoke({"input": f"plan {i}", "user_id": user.user_id, "approval": True})
+        after.append(time.perf_counter() - start)
+    report("one call + conflicts + insert", after)
+    print(f"last plan inserted {len(result['task_ids'] or [])} tasks, conflicts={result['conflicts']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--plans", type=int, default=50)
+    parser.add_argument("--llm-latency", type=float, default=0.8)
+    args = parser.parse_args()
+    asyncio.run(main(args.plans, args.llm_latency))
@@ -0,0 +1,83 @@
+"""One chat turn with several tool calls: sequential vs ToolExecutor.
+
+Fake tools sleep for ``--latency`` seconds (half of them in a thread, like the
+blocking weather/Gmail clients); one extra tool hangs, to show the deadline
+bounding the turn and the breaker failing fast once it opens.
+
+    python -m benchmarks.bench_tool_executor --calls 4 --latency 0.5
+"""
+
+import argparse
+import asyncio
+import time
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import Tool
+
+from ai import metrics
+from ai.tool_executor import ToolExecutor
+
+
+def make_tools(latency: float):
+    async def slow_async(query: str) -> str:
+        await asyncio.sleep(latency)
+        return f"async result for {query}"
+
+    def slow_sync(query: str) -> str:
+        time.sleep(latency)
+        return f"sync result for {query}"
+
+    async def hang(query: str) -> str:
+        await asyncio.sleep(3600)
+        return "never"
+
+    return [
+        Tool(name="async_tool", func=None, coroutine=slow_async, description="async"),
+        Tool(name="sync_tool", func=slow_sync, description="sync"),
+        Tool(name="hanging_tool", func=None, coroutine=hang, description="hangs"),
+    ]
+
+
+def turn(calls: int, hang: bool):
+    tool_calls = [
+        {"name": "async_tool" if i % 2 else "sync_tool", "args": {"query": f"q{i}"}, "id": f"call-{i}"}
+        for i in range(calls)
+    ]
+    if hang:
+        tool_calls.append({"name": "hanging_tool", "args": {"query": "x"}, "id": "call-hang"})
+    return {"messages": [AIMessage(content="", tool_calls=tool_calls)]}
+
+
+async def main(calls: int, latency: float, timeout: float):
+    tools = make_tools(latency)
+    executor = ToolExecutor(tools, default_timeout=timeout, timeouts={}, breaker_failures=2, breaker_reset_seconds=60)
+
+    start = time.perf_counter()
+    for call in turn(calls, hang=False)["messages"][-1].tool_calls:
+        await executor.tools[call["name"]].ainvoke(call["args"])
+    print(f"sequential, {calls} calls:            {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    await executor.ainvoke(turn(calls, hang=False))
+    print(f"executor, {calls} calls:              {time.perf_counter() - start:.2f}s")
+
+    for attempt in range(3):
+        start = time.perf_counter()
+        result = await executor.ainvoke(turn(calls, hang=True))
+        hung = result["messages"][-1].content
+        print(
+            f"executor, {calls} calls + hang #{attempt + 1}:    {time.perf_counter() - start:.2f}s "
+            f"(breaker {executor.breakers['hanging_tool'].state}) -> {hung[:50]}"
+        )
+
+    for name, histogram in metrics.snapshot()["histograms"].items():
+        print(f"{name:<36} count={histogram['count']} p50={histogram['p50']}s p95={histogram['p95']}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--timeout", type=float, default=2.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.latency, args.timeout))
@@ -0,0 +1,64 @@
+"""Microbenchmark for context_manager.trim_messages.
+
+Compares the previous pop-and-recount loop with the cached prefix-sum trim on
+10/100/1000-message histories, timing repeated turns over the same thread the
+way the chatbot node does.
+
+    python -m benchmarks.bench_trim_messages
+"""
+
+import argparse
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+from tiktoken import encoding_for_model
+
+from ai.context_manager import trim_messages
+
+
+def legacy_trim_messages(messages, max_tokens=4000):
+    def count_tokens(messages):
+        encoding = encoding_for_model("gpt-3.5-turbo")
+        return sum(len(encoding.encode(str(m.content))) + 4 for m in messages)
+
+    chat_messages = messages.copy()
+    current_tokens = count_tokens(chat_messages)
+    while current_tokens > max_tokens and len(chat_messages) > 1:
+        chat_messages.pop(0)
+        current_tokens = count_tokens(chat_messages)
+    return chat_messages
+
+
+def make_history(length: int):
+    messages = []
+    for i in range(length):
+        cls = HumanMessage if i % 2 == 0 else AIMessage
+        messages.append(
+            cls(content=f"message {i} " + "lorem ipsum dolor sit amet " * 20, id=str(i))
+        )
+    return messages
+
+
+def timed(fn, messages, turns: int) -> float:
+    start = time.perf_counter()
+    for _ in range(turns):
+        fn(messages, max_tokens=4000)
+    return (time.perf_counter() - start) / turns
+
+
+def main(turns: int):
+    for length in (10, 100, 1000):
+        messages = make_history(length)
+        legacy = timed(legacy_trim_messages, messages, turns)
+        current = timed(trim_messages, messages, turns)
+        print(
+            f"{length:>5} messages  legacy={legacy * 1000:9.3f}ms  "
+            f"cached={current * 1000:8.3f}ms  speedup={legacy / current:7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=5)
+    args = parser.parse_args()
+    main(args.turns)
@@ -0,0 +1,84 @@
+"""Recall@k and query latency of LocalVectorStore's HNSW index vs brute force.
+
+Uses random unit vectors (no model needed) with the production dimension.
+
+    python -m benchmarks.bench_vector_store --vectors 100000 --queries 500 --k 10
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+import numpy as np
+
+from langchain_core.embeddings import Embeddings
+
+from ai.local_vector_store import LocalVectorStore
+from config import settings
+
+
+class PrecomputedEmbeddings(Embeddings):
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = vectors
+        self.offset = 0
+
+    def embed_documents(self, texts):
+        batch = self.vectors[self.offset : self.offset + len(texts)]
+        self.offset += len(texts)
+        return batch.tolist()
+
+    def embed_query(self, text):
+        raise NotImplementedError
+
+
+def timed_search(store: LocalVectorStore, queries: np.ndarray, k: int, exact: bool):
+    results, timings = [], []
+    for query in queries:
+        start = time.perf_counter()
+        hits = store.search_vectors(query, k, exact=exact)
+        timings.append(time.perf_counter() - start)
+        results.append({row for row, _ in hits})
+    return results, timings
+
+
+def main(vectors: int, queries: int, dim: int, k: int, batch: int, ef: int):
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(vectors, dim)).astype(np.float32)
+    data /= np.linalg.norm(data, axis=1, keepdims=True)
+    # Queries near existing points, like real paraphrased questions.
+    probes = data[rng.integers(0, vectors, queries)] + rng.normal(scale=0.5 / np.sqrt(dim), size=(queries, dim))
+    probes = probes.astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as path:
+        store = LocalVectorStore(PrecomputedEmbeddings(data), path=path)
+        start = time.perf_counter()
+        for offset in range(0, vectors, batch):
+            count = min(batch, vectors - offset)
+            store.add_texts([f"chunk {offset + i}" for i in range(count)])
+        print(f"indexed {vectors} x {dim} in {time.perf_counter() - start:.1f}s")
+
+        if store.ann is not None:
+            store.ann.set_ef(ef)
+        exact, exact_times = timed_search(store, probes, k, exact=True)
+        approx, approx_times = timed_search(store, probes, k, exact=False)
+
+    recall = statistics.mean(len(a & e) / k for a, e in zip(approx, exact))
+    for label, timings in (("brute force", exact_times), ("hnsw", approx_times)):
+        timings.sort()
+        print(
+            f"{label:<12} p50={timings[len(timings) // 2] * 1000:7.3f}ms "
+            f"p95={timings[int(len(timings) * 0.95) - 1] * 1000:7.3f}ms"
+        )
+    print(f"recall@{k} (ef={ef}): {recall:.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vectors", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--ef", type=int, default=settings.LOCAL_VECTOR_STORE_HNSW_EF_SEARCH)
+    args = parser.parse_args()
+    main(args.vectors, args.queries, args.dim, args.k, args.batch, args.ef)
@@ -0,0 +1,87 @@
+"""Web search sub-graph against a local fake Serper and page server.
+
+Every search and page request sleeps for ``--latency`` seconds. With the
+fan-out, N query variants and the top pages cost about two round trips of
+wall-clock time instead of one per query and page. No API keys needed: the
+LLM is faked too.
+
+    python -m benchmarks.bench_web_search_fanout --latency 0.3
+"""
+
+import argparse
+import asyncio
+import time
+
+from aiohttp import web
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from ai import searchBuilder
+from ai.resources import override
+
+
+def fake_server(latency: float) -> web.Application:
+    async def serper_search(request: web.Request):
+        payload = await request.json()
+        await asyncio.sleep(latency)
+        base = str(request.url.origin())
+        organic = [
+            {
+                "link": f"{base}/page/{(hash(payload['q']) + i) % 6}",
+                "snippet": f"snippet {i} for {payload['q']}",
+            }
+            for i in range(5)
+        ]
+        return web.json_response({"organic": organic})
+
+    async def page(request: web.Request):
+        await asyncio.sleep(latency)
+        return web.Response(
+            text=f"<html><body><p>Page {request.match_info['n']} body text.</p></body></html>",
+            content_type="text/html",
+        )
+
+    app = web.Application()
+    app.router.add_post("/search", serper_search)
+    app.router.add_get("/page/{n}", page)
+    return app
+
+
+async def fake_llm(messages):
+    if "user_request:" in str(messages[-1].content):
+        return AIMessage(content="query one\nquery two\nquery three")
+    return AIMessage(content="answer")
+
+
+async def main(latency: float, runs: int):
+    runner = web.AppRunner(fake_server(latency))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore
+
+    searchBuilder.get_search().base_url = f"http://127.0.0.1:{port}"
+    override("llm", RunnableLambda(fake_llm))
+
+    try:
+        for run in range(runs):
+            start = time.perf_counter()
+            answer = await searchBuilder.web_search_tool_fn(
+                f"can you tell me about topic {run}"
+            )
+            elapsed = time.perf_counter() - start
+            print(
+                f"run {run}: {elapsed:.2f}s ({elapsed / latency:.1f}x one round trip), answer={answer!r}"
+            )
+    finally:
+        await searchBuilder.get_search().close()
+        await searchBuilder.get_page_fetcher().close()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.runs))
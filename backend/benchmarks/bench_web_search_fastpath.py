@@ -0,0 +1,84 @@
+"""End-to-end web_search latency with and without the rewrite fast path.
+
+Uses the fake Serper/page server from ``bench_web_search_fanout`` and a fake
+LLM that takes ``--llm-latency`` seconds per call, so the difference is the
+skipped (or memoized) query-rewrite round trip.
+
+    python -m benchmarks.bench_web_search_fastpath --llm-latency 0.8
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from aiohttp import web
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from ai import searchBuilder
+from ai.resources import override
+from config import settings
+from benchmarks.bench_web_search_fanout import fake_server
+
+QUERIES = [
+    "weather Patan Gujarat",
+    "ISRO launch schedule 2025",
+    "python 3.13 release notes",
+    "can you tell me what happened in the cricket match yesterday",
+    "I want to know the best laptops for students",
+]
+
+
+def fake_llm(latency: float):
+    async def respond(messages):
+        await asyncio.sleep(latency)
+        if "user_request:" in str(messages[-1].content):
+            return AIMessage(content="rewritten query\nalternative query")
+        return AIMessage(content="answer")
+
+    return RunnableLambda(respond)
+
+
+async def measure(label: str, fast_path: bool, repeats: int):
+    settings.WEB_SEARCH_REWRITE_FAST_PATH = fast_path
+    timings = []
+    for repeat in range(repeats):
+        for query in QUERIES:
+            # A fresh suffix per configuration keeps the Serper cache cold;
+            # repeats of the same query exercise the rewrite memo.
+            start = time.perf_counter()
+            await searchBuilder.web_search_tool_fn(f"{query} {label}")
+            timings.append(time.perf_counter() - start)
+    print(
+        f"{label:<10} mean={statistics.mean(timings):.3f}s "
+        f"p50={statistics.median(timings):.3f}s max={max(timings):.3f}s"
+    )
+
+
+async def main(llm_latency: float, http_latency: float, repeats: int):
+    runner = web.AppRunner(fake_server(http_latency))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore
+
+    searchBuilder.get_search().base_url = f"http://127.0.0.1:{port}"
+    override("llm", fake_llm(llm_latency))
+
+    try:
+        await measure("baseline", fast_path=False, repeats=repeats)
+        await measure("fast-path", fast_path=True, repeats=repeats)
+    finally:
+        await searchBuilder.get_search().close()
+        await searchBuilder.get_page_fetcher().close()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--llm-latency", type=float, default=0.8)
+    parser.add_argument("--http-latency", type=float, default=0.1)
+    parser.add_argument("--repeats", type=int, default=2)
+    args = parser.parse_args()
+    asyncio.run(main(args.llm_latency, args.http_latency, args.repeats))
@@ -25,7 +25,7 @@ class Settings(BaseSettings):
     MAIL_USERNAME: str = os.getenv("MAIL_USERNAME", "")
     MAIL_PASSWORD: SecretStr = SecretStr(os.getenv("MAIL_PASSWORD", ""))
     MAIL_FROM: str = os.getenv("MAIL_FROM", "")
-    MAIL_PORT: int = int(os.getenv("MAIL_PORT", ""))
+    MAIL_PORT: int = int(os.getenv("MAIL_PORT", "587"))
     MAIL_SERVER: str = os.getenv("MAIL_SERVER", "")
     MAIL_STARTTLS: bool = True
     MAIL_SSL_TLS: bool = False
@@ -37,11 +37,137 @@ class Settings(BaseSettings):
     GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY", "")
     GROQ_API_KEY: str = os.getenv("GROQ_API_KEY", "")
     SERPER_API_KEY: str = os.getenv("SERPER_API_KEY", "")
+    SERPER_BASE_URL: str = os.getenv("SERPER_BASE_URL", "https://google.serper.dev")
+    SERPER_TIMEOUT_SECONDS: float = 10.0
+    SERPER_CACHE_TTL_SECONDS: float = 5 * 60
+    SERPER_CACHE_STALE_SECONDS: float = 15 * 60
+    SERPER_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    PAGE_CACHE_TTL_SECONDS: float = 30 * 60
+    PAGE_CACHE_STALE_SECONDS: float = 60 * 60
+    PAGE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # Skip the LLM rewrite for queries that already look search-ready.
+    WEB_SEARCH_REWRITE_FAST_PATH: bool = True
+    WEB_SEARCH_REWRITE_CACHE_TTL_SECONDS: float = 24 * 3600
+    WEB_SEARCH_QUERY_VARIANTS: int = 3
+    WEB_SEARCH_MAX_PAGES: int = 3
+    WEB_SEARCH_FETCH_TIMEOUT_SECONDS: float = 5.0
+    WEB_SEARCH_MAX_PAGE_CHARS: int = 4000
     SERP_API_KEY: str = os.getenv("SERP_API_KEY", "")
     HYPERBROWSER_API_KEY: str = os.getenv("HYPERBROWSER_API_KEY", "")
     OPENWEATHERMAP_API_KEY: str = os.getenv("OPENWEATHERMAP_API_KEY", "")
     NEWSDATA_APIKEY: str = os.getenv("NEWSDATA_APIKEY", "")
 
+    # Heavy clients are built on first use; these are built in the
+    # background at startup so the first chat doesn't pay for them.
+    WARMUP_RESOURCES: str = "llm_model,tool_node"
+
+    TOOL_TIMEOUT_SECONDS: float = 30
+    # Per-tool overrides, "name=seconds,..."
+    TOOL_TIMEOUTS: str = "OpenWeatherMap=10,python_repl=20,web_search=45,college_search=45"
+    TOOL_BREAKER_FAILURES: int = 3
+    TOOL_BREAKER_RESET_SECONDS: float = 60
+
+    DASHBOARD_CACHE_SIZE: int = 10_000
+    DASHBOARD_CACHE_TTL_SECONDS: float = 30
+    DASHBOARD_STREAK_LOOKBACK_DAYS: int = 365
+    DASHBOARD_TOP_PROJECTS: int = 5
+    DASHBOARD_UPCOMING_TASKS: int = 10
+
+    TASK_CONFLICT_WINDOW_MINUTES: int = 30
+    CONFLICT_INDEX_CACHE_SIZE: int = 1024
+    CONFLICT_INDEX_TTL_SECONDS: float = 5 * 60
+
+    CHAT_STREAM_QUEUE_SIZE: int = 64
+    CHAT_STREAM_HEARTBEAT_SECONDS: float = 15.0
+
+    # Gemini's tokenizer is only reachable through the API, so prompts are
+    # budgeted locally with a BPE encoding of similar granularity.
+    CONTEXT_TOKENIZER_ENCODING: str = "cl100k_base"
+    CONTEXT_TOKEN_CACHE_SIZE: int = 10000
+    # Hard cap on the prompt sent to the model.
+    CONTEXT_MAX_TOKENS: int = 4000
+    # Once a thread grows past the trigger, older turns are folded into a
+    # rolling summary until only ~CONTEXT_KEEP_RECENT_TOKENS of them remain.
+    CONTEXT_COMPACTION_TRIGGER_TOKENS: int = 3000
+    CONTEXT_KEEP_RECENT_TOKENS: int = 1500
+    CONTEXT_SUMMARY_MAX_WORDS: int = 250
+
+    CHECKPOINT_RETENTION_ENABLED: bool = True
+    CHECKPOINT_KEEP_LAST: int = 20
+    CHECKPOINT_THREAD_TTL_HOURS: float = 24 * 30
+    CHECKPOINT_PRUNE_INTERVAL_SECONDS: float = 15 * 60
+    CHECKPOINT_PRUNE_BATCH_SIZE: int = 1000
+    # Blobs of threads written to within this window are left alone so a
+    # checkpoint that is being saved never loses its channel values.
+    CHECKPOINT_BLOB_GRACE_SECONDS: float = 5 * 60
+
+    # Opt-in cache of chatbot and web_search answers, keyed on the normalized
+    # question (chatbot answers per user). "memory" is per-process; "redis"
+    # shares it via REDIS_URL.
+    RESPONSE_CACHE_ENABLED: bool = False
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1000
+    RESPONSE_CACHE_SHORT_TTL_SECONDS: float = 10 * 60
+    RESPONSE_CACHE_LONG_TTL_SECONDS: float = 24 * 3600
+
+    EMBEDDING_MODEL_NAME: str = "ViT-H-14"
+    EMBEDDING_CHECKPOINT: str = "laion2b_s32b_b79k"
+    EMBEDDING_BATCH_SIZE: int = 32
+    EMBEDDING_CACHE_DIR: str = "embedding_cache"
+    # 0 leaves torch's default (all cores).
+    EMBEDDING_NUM_THREADS: int = 0
+
+    # "pinecone" or "local" (in-process HNSW index under LOCAL_VECTOR_STORE_DIR).
+    VECTOR_STORE_BACKEND: str = "pinecone"
+    LOCAL_VECTOR_STORE_DIR: str = "vector_store"
+    LOCAL_VECTOR_STORE_HNSW_M: int = 16
+    LOCAL_VECTOR_STORE_HNSW_EF_CONSTRUCTION: int = 200
+    LOCAL_VECTOR_STORE_HNSW_EF_SEARCH: int = 128
+    # persist() rewrites the files without deleted rows once they exceed this share.
+    LOCAL_VECTOR_STORE_COMPACT_RATIO: float = 0.5
+
+    RETRIEVAL_K: int = 5
+    RETRIEVAL_CANDIDATES: int = 20
+    RETRIEVAL_RRF_K: int = 60
+    RETRIEVAL_CACHE_SIZE: int = 1024
+    RETRIEVAL_CACHE_TTL_SECONDS: float = 5 * 60
+    BM25_INDEX_PATH: str = "bm25_index.json"
+    # Cross-encoder used to rerank fused candidates on CPU, e.g.
+    # "cross-encoder/ms-marco-MiniLM-L-6-v2". Empty disables reranking.
+    RERANKER_MODEL: str = ""
+    # Below these scores college_search escalates to web search. Neither is
+    # calibrated yet for the OpenCLIP text embeddings or a particular
+    # reranker: tune them from the route.local.confidence histogram in
+    # /ai/metrics against questions that should and shouldn't stay local.
+    # The rerank threshold applies to sigmoid(logit), so 0.5 is a logit of 0.
+    RETRIEVAL_MIN_VECTOR_SCORE: float = 0.8
+    RETRIEVAL_MIN_RERANK_SCORE: float = 0.5
+
+    # Record manager for incremental indexing. Defaults to DB_URL (Postgres);
+    # without one, a local SQLite file in WAL mode.
+    RECORD_MANAGER_DB_URL: str = ""
+    RECORD_MANAGER_SQLITE_PATH: str = "record_manager_cache.sql"
+    RECORD_MANAGER_POOL_SIZE: int = 5
+    RECORD_MANAGER_BUSY_TIMEOUT_SECONDS: float = 30
+    INDEX_BATCH_SIZE: int = 500
+    INDEX_CLEANUP_BATCH_SIZE: int = 5000
+
+    INGEST_JOB_WORKERS: int = 2
+    INGEST_JOBS_STATE_PATH: str = "ingest_jobs.json"
+    # PDF jobs persist the stores and checkpoint after this many files.
+    INGEST_JOB_CHECKPOINT_FILES: int = 20
+
+    PDF_INGEST_WORKERS: int = 0  # 0 = one per CPU
+    PDF_PAGE_CACHE_DIR: str = "pdf_page_cache"
+
+    CRAWLER_BASE_URL: str = "https://gecpatan.ac.in/"
+    CRAWLER_WORKERS: int = 8
+    CRAWLER_HOST_DELAY_SECONDS: float = 1.0
+    CRAWLER_MAX_PAGES: int = 5000
+    CRAWLER_TIMEOUT_SECONDS: float = 10.0
+    CRAWLER_STATE_PATH: str = "crawler_state.json"
+    CRAWLER_INDEX_BATCH_SIZE: int = 20
+
     LANGSMITH_TRACING: str = os.getenv("LANGSMITH_TRACING", "")
     LANGSMITH_ENDPOINT: str = os.getenv("LANGSMITH_ENDPOINT", "")
     LANGSMITH_API_KEY: str = os.getenv("LANGSMITH_API_KEY", "")
@@ -1,4 +1,5 @@
 import uuid
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional, List
 from datetime import datetime, timezone
@@ -9,6 +10,11 @@ def remove_timezone(dt: datetime) -> datetime:
     return dt.replace(tzinfo=None) if dt.tzinfo else dt
 
 
+def to_naive_utc(dt: datetime) -> datetime:
+    # Columns hold naive UTC; aware values are converted, not just stripped.
+    return dt.astimezone(timezone.utc).replace(tzinfo=None) if dt.tzinfo else dt
+
+
 # ------------------ Enums ------------------ #
 class TaskStatus(str, Enum):
     pending = "pending"
@@ -77,10 +83,16 @@ class TaskBase(SQLModel):
 
 
 class Task(TaskBase, table=True):
+    # "My pending tasks due this week": equality on user and status, range on
+    # due date. The composite also serves every user_id-only lookup.
+    __table_args__ = (
+        Index("ix_task_user_id_status_due_date", "user_id", "status", "due_date"),
+    )
+
     task_id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    user_id: uuid.UUID = Field(foreign_key="user.user_id", index=True)
+    user_id: uuid.UUID = Field(foreign_key="user.user_id")
     project_id: Optional[uuid.UUID] = Field(
-        foreign_key="project.project_id", default=None, nullable=True
+        foreign_key="project.project_id", default=None, nullable=True, index=True
     )
     created_at: datetime = Field(
         default_factory=lambda: remove_timezone(datetime.now(timezone.utc))
@@ -88,6 +100,9 @@ class Task(TaskBase, table=True):
     updated_at: datetime = Field(
         default_factory=lambda: remove_timezone(datetime.now(timezone.utc))
     )
+    # Stamped by the rollup flush listener whenever status moves to or away
+    # from completed, so completions are counted on the day they happened.
+    completed_at: Optional[datetime] = None
 
     project: Optional["Project"] = Relationship(back_populates="tasks")
     user: Optional["User"] = Relationship(back_populates="tasks")
@@ -96,9 +111,13 @@ class Task(TaskBase, table=True):
 
 # ------------------ Pomodoro Session ------------------ #
 class PomodoroSession(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_pomodorosession_user_id_start_time", "user_id", "start_time"),
+    )
+
     session_id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     task_id: uuid.UUID = Field(foreign_key="task.task_id", index=True)
-    user_id: uuid.UUID = Field(foreign_key="user.user_id", index=True)
+    user_id: uuid.UUID = Field(foreign_key="user.user_id")
     start_time: datetime = Field(
         default_factory=lambda: remove_timezone(datetime.now(timezone.utc))
     )
@@ -120,8 +139,13 @@ class UserDailyStatsBase(SQLModel):
 
 
 class UserDailyStats(UserDailyStatsBase, table=True):
+    # One row per user per day (midnight UTC), upserted by db.rollups.
+    __table_args__ = (
+        Index("uq_userdailystats_user_id_date", "user_id", "date", unique=True),
+    )
+
     stats_id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    user_id: uuid.UUID = Field(foreign_key="user.user_id", index=True)
+    user_id: uuid.UUID = Field(foreign_key="user.user_id")
     created_at: datetime = Field(
         default_factory=lambda: remove_timezone(datetime.now(timezone.utc))
     )
@@ -131,8 +155,12 @@ class UserDailyStats(UserDailyStatsBase, table=True):
 
 # ------------------ Task Progress Snapshot ------------------ #
 class TaskProgressSnapshot(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_taskprogresssnapshot_task_id_timestamp", "task_id", "timestamp"),
+    )
+
     snapshot_id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    task_id: uuid.UUID = Field(foreign_key="task.task_id", index=True)
+    task_id: uuid.UUID = Field(foreign_key="task.task_id")
     timestamp: datetime = Field(
         default_factory=lambda: remove_timezone(datetime.now(timezone.utc))
     )
@@ -143,8 +171,13 @@ class TaskProgressSnapshot(SQLModel, table=True):
 
 # ------------------ Weekly Focus Summary ------------------ #
 class WeeklyFocusSummary(SQLModel, table=True):
+    # One row per user per week (Monday midnight UTC), upserted by db.rollups.
+    __table_args__ = (
+        Index("uq_weeklyfocussummary_user_id_week_start", "user_id", "week_start", unique=True),
+    )
+
     summary_id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    user_id: uuid.UUID = Field(foreign_key="user.user_id", index=True)
+    user_id: uuid.UUID = Field(foreign_key="user.user_id")
     week_start: datetime
     total_pomodoros: int = 0
     total_focus_minutes: int = 0
@@ -0,0 +1,266 @@
+"""Incremental daily and weekly stats rollups.
+
+ORM flush listeners turn task creation, task completion and finished
+Pomodoro sessions into counter deltas and upsert them into
+``UserDailyStats`` / ``WeeklyFocusSummary`` inside the same transaction, so
+dashboard reads are single-row lookups. ``backfill`` rebuilds the tables
+from the raw rows in batched ``INSERT ... SELECT`` statements:
+
+    python -m db.rollups --backfill --batch-size 500
+"""
+
+import uuid
+import asyncio
+import argparse
+
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import List
+from sqlalchemy import func, inspect, literal, select, union_all, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from .models import PomodoroSession, Task, TaskStatus, UserDailyStats, WeeklyFocusSummary
+
+
+DAILY_COUNTERS = ("total_tasks_created", "tasks_completed", "pomodoro_sessions", "focus_minutes")
+WEEKLY_COUNTERS = ("total_pomodoros", "total_focus_minutes", "total_tasks_completed")
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def day_start(moment: datetime) -> datetime:
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def week_start(moment: datetime) -> datetime:
+    day = day_start(moment)
+    return day - timedelta(days=day.weekday())
+
+
+class RollupDeltas:
+    def __init__(self):
+        self.daily: defaultdict[tuple[uuid.UUID, datetime], defaultdict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.weekly: defaultdict[tuple[uuid.UUID, datetime], defaultdict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def __bool__(self):
+        return bool(self.daily or self.weekly)
+
+    def task_created(self, task: Task):
+        self.daily[(task.user_id, day_start(task.created_at))]["total_tasks_created"] += 1
+
+    def task_completed(self, task: Task, when: datetime, sign: int = 1):
+        self.daily[(task.user_id, day_start(when))]["tasks_completed"] += sign
+        self.weekly[(task.user_id, week_start(when))]["total_tasks_completed"] += sign
+
+    def session_ended(self, session: PomodoroSession):
+        assert session.end_time is not None
+        daily = self.daily[(session.user_id, day_start(session.end_time))]
+        daily["pomodoro_sessions"] += 1
+        daily["focus_minutes"] += session.duration_minutes
+        weekly = self.weekly[(session.user_id, week_start(session.end_time))]
+        weekly["total_pomodoros"] += 1
+        weekly["total_focus_minutes"] += session.duration_minutes
+
+
+def _committed(session: Session, obj, attribute: str):
+    """Value of ``attribute`` as stored before this flush. History is empty
+    when the attribute was expired (after a commit) before being assigned,
+    so in that case it is read back from the row."""
+    history = inspect(obj).attrs[attribute].history
+    if history.deleted or history.unchanged:
+        return (history.deleted or history.unchanged)[0]
+    state = inspect(obj)
+    table = state.mapper.local_table
+    key = [column == value for column, value in zip(state.mapper.primary_key, state.identity)]
+    return session.connection().execute(select(table.c[attribute]).where(*key)).scalar()
+
+
+def _assigned(obj, attribute: str):
+    added = inspect(obj).attrs[attribute].history.added
+    return added[0] if added else None
+
+
+def collect_deltas(session: Session) -> RollupDeltas:
+    deltas = RollupDeltas()
+    for obj in session.new:
+        if isinstance(obj, Task):
+            deltas.task_created(obj)
+            if obj.status == TaskStatus.completed:
+                obj.completed_at = obj.completed_at or utcnow()
+                deltas.task_completed(obj, obj.completed_at)
+        elif isinstance(obj, PomodoroSession) and obj.end_time is not None:
+            deltas.session_ended(obj)
+
+    for obj in session.dirty:
+        if isinstance(obj, Task):
+            after = _assigned(obj, "status")
+            if after is None:
+                continue
+            before = _committed(session, obj, "status")
+            if before == after:
+                continue
+            if after == TaskStatus.completed:
+                obj.completed_at = utcnow()
+                deltas.task_completed(obj, obj.completed_at)
+            elif before == TaskStatus.completed:
+                # Reopened: take it back off the day it was completed on.
+                completed_at = _committed(session, obj, "completed_at")
+                if completed_at is not None:
+                    deltas.task_completed(obj, completed_at, sign=-1)
+                obj.completed_at = None
+        elif isinstance(obj, PomodoroSession):
+            if _assigned(obj, "end_time") is not None and _committed(session, obj, "end_time") is None:
+                deltas.session_ended(obj)
+    return deltas
+
+
+def insert_for(dialect: str):
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise NotImplementedError(f"Rollup upserts are not implemented for {dialect}")
+
+
+def upsert_deltas(connection, deltas: RollupDeltas):
+    insert = insert_for(connection.dialect.name)
+    now = utcnow()
+
+    for model, key_column, counters, rows in (
+        (UserDailyStats, "date", DAILY_COUNTERS, deltas.daily),
+        (WeeklyFocusSummary, "week_start", WEEKLY_COUNTERS, deltas.weekly),
+    ):
+        if not rows:
+            continue
+        table = model.__table__  # type: ignore
+        id_column = table.primary_key.columns.values()[0].name
+        values = []
+        for (user_id, key), counts in rows.items():
+            row = {id_column: uuid.uuid4(), "user_id": user_id, key_column: key}
+            row.update({name: counts.get(name, 0) for name in counters})
+            if "created_at" in table.c:
+                row["created_at"] = now
+            values.append(row)
+        statement = insert(table).values(values)
+        # Add the deltas to whatever the row already holds.
+        statement = statement.on_conflict_do_update(
+            index_elements=["user_id", key_column],
+            set_={name: table.c[name] + statement.excluded[name] for name in counters},
+        )
+        connection.execute(statement)
+
+
+@event.listens_for(Session, "before_flush")
+def collect_rollup_deltas(session: Session, flush_context, instances):
+    # Attribute history is only available before the flush resets it.
+    deltas = collect_deltas(session)
+    if deltas:
+        session.info.setdefault("rollup_deltas", []).append(deltas)
+
+
+@event.listens_for(Session, "after_flush")
+def apply_rollup_deltas(session: Session, flush_context):
+    # Same connection and transaction as the rows that caused the deltas,
+    # so the counters commit or roll back with them.
+    for deltas in session.info.pop("rollup_deltas", []):
+        upsert_deltas(session.connection(), deltas)
+
+
+def _buckets(dialect: str):
+    if dialect == "postgresql":
+        return (
+            lambda column: func.date_trunc("day", column),
+            lambda column: func.date_trunc("week", column),
+            func.gen_random_uuid(),
+        )
+    # Same text format SQLAlchemy uses for DateTime on SQLite, so backfilled
+    # keys collide with incrementally written ones.
+    fmt = "%Y-%m-%d 00:00:00.000000"
+    return (
+        lambda column: func.strftime(fmt, column),
+        lambda column: func.strftime(fmt, column, "weekday 0", "-6 days"),
+        func.lower(func.hex(func.randomblob(16))),
+    )
+
+
+def backfill_statements(dialect: str, user_ids: List[uuid.UUID]):
+    day, week, new_id = _buckets(dialect)
+    insert = insert_for(dialect)
+    task, session = Task.__table__, PomodoroSession.__table__  # type: ignore
+    zero = literal(0)
+    ended = session.c.end_time.isnot(None) & session.c.user_id.in_(user_ids)
+    completed = (
+        (task.c.status == TaskStatus.completed) & task.c.completed_at.isnot(None) & task.c.user_id.in_(user_ids)
+    )
+
+    events = union_all(
+        select(task.c.user_id, task.c.created_at.label("at"), literal(1).label("created"),
+               zero.label("completed"), zero.label("sessions"), zero.label("minutes"))
+        .where(task.c.user_id.in_(user_ids)),
+        select(task.c.user_id, task.c.completed_at, zero, literal(1), zero, zero).where(completed),
+        select(session.c.user_id, session.c.end_time, zero, zero, literal(1), session.c.duration_minutes).where(ended),
+    ).subquery()
+
+    daily = UserDailyStats.__table__  # type: ignore
+    daily_rows = select(
+        new_id, events.c.user_id, day(events.c.at), func.sum(events.c.created), func.sum(events.c.completed),
+        func.sum(events.c.sessions), func.sum(events.c.minutes), zero, func.current_timestamp(),
+    ).group_by(events.c.user_id, day(events.c.at))
+    daily_insert = insert(daily).from_select(
+        ["stats_id", "user_id", "date", *DAILY_COUNTERS, "break_minutes", "created_at"], daily_rows
+    )
+    daily_insert = daily_insert.on_conflict_do_update(
+        index_elements=["user_id", "date"],
+        set_={name: daily_insert.excluded[name] for name in DAILY_COUNTERS},
+    )
+
+    weekly = WeeklyFocusSummary.__table__  # type: ignore
+    weekly_rows = select(
+        new_id, events.c.user_id, week(events.c.at), func.sum(events.c.sessions),
+        func.sum(events.c.minutes), func.sum(events.c.completed),
+    ).where((events.c.sessions + events.c.completed) > 0).group_by(events.c.user_id, week(events.c.at))
+    weekly_insert = insert(weekly).from_select(
+        ["summary_id", "user_id", "week_start", *WEEKLY_COUNTERS], weekly_rows
+    )
+    weekly_insert = weekly_insert.on_conflict_do_update(
+        index_elements=["user_id", "week_start"],
+        set_={name: weekly_insert.excluded[name] for name in WEEKLY_COUNTERS},
+    )
+
+    # Rows for buckets that no longer have any events would otherwise linger.
+    return [
+        daily.delete().where(daily.c.user_id.in_(user_ids)),
+        weekly.delete().where(weekly.c.user_id.in_(user_ids)),
+        daily_insert,
+        weekly_insert,
+    ]
+
+
+async def backfill(batch_size: int = 500) -> int:
+    from .models import User
+    from .session import engine
+
+    async with engine.connect() as connection:
+        user_ids = list((await connection.execute(select(User.user_id))).scalars())  # type: ignore
+        await connection.rollback()
+
+        for offset in range(0, len(user_ids), batch_size):
+            batch = user_ids[offset : offset + batch_size]
+            # One transaction per batch of users: readers never see a
+            # user's rollups half rebuilt.
+            async with connection.begin():
+                for statement in backfill_statements(connection.dialect.name, batch):
+                    await connection.execute(statement)
+            print(f"Rebuilt rollups for {offset + len(batch)}/{len(user_ids)} users")
+    return len(user_ids)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the daily and weekly stats rollups.")
+    parser.add_argument("--backfill", action="store_true", help="Rebuild all rollups from tasks and sessions")
+    parser.add_argument("--batch-size", type=int, default=500, help="Users per transaction")
+    args = parser.parse_args()
+    if args.backfill:
+        asyncio.run(backfill(args.batch_size))
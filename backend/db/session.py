@@ -2,6 +2,8 @@ from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlmodel.ext.asyncio.session import AsyncSession
 from config import settings
 
+from . import rollups  # noqa: F401  registers the stats rollup flush listeners
+
 DATABASE_URL = settings.DATABASE_URL
 
 # SQLAlchemy async engine
@@ -1,17 +1,27 @@
 import os
+import asyncio
 import logging
 import traceback
 
-from fastapi import APIRouter, FastAPI, HTTPException, Response
-from contextlib import asynccontextmanager
+from fastapi import APIRouter, FastAPI, HTTPException, Request, Response
+from contextlib import asynccontextmanager, suppress
 from dotenv import load_dotenv, find_dotenv
 from pydantic import BaseModel
+from typing import Literal, Optional
 from psycopg.rows import dict_row
 from psycopg_pool import AsyncConnectionPool
 from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 
+from config import settings
 from ai.graph import compile_graph
+from ai import metrics
+from ai.resources import init_timings, warm_up
+from ai.checkpoint_retention import retention_stats, run_retention_loop
+from ai.streaming import stream_chat_events
+from ai.jobs import job_queue
+from api.dashboard.routes import router as dashboard_router
 
 logging.basicConfig(level=logging.INFO)
 
@@ -41,14 +51,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-graph = None
-
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await database_connection_pool.open()
     logging.info("Database connection pool opened.")
+
+    # The saver checks connections out of the pool per operation, so one
+    # compiled graph can safely serve concurrent requests.
+    checkpointer = AsyncPostgresSaver(database_connection_pool)  # type: ignore
+    await checkpointer.setup()
+    app.state.graph = compile_graph(checkpointer)
+    logging.info("Chat graph compiled.")
+
+    await job_queue.start()
+
+    warmup_task = asyncio.create_task(warm_up(settings.WARMUP_RESOURCES.split(",")))
+
+    retention_task = None
+    if settings.CHECKPOINT_RETENTION_ENABLED:
+        retention_task = asyncio.create_task(run_retention_loop(database_connection_pool))
+
     yield
+    warmup_task.cancel()
+    await job_queue.stop()
+    if retention_task:
+        retention_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await retention_task
     await database_connection_pool.close()
     logging.info("Database connection pool closed.")
 
@@ -56,6 +86,13 @@ async def lifespan(app: FastAPI):
 class ChatInput(BaseModel):
     messages: list[str]
     thread_id: str
+    user_id: Optional[str] = None
+
+
+class IngestJobInput(BaseModel):
+    kind: Literal["pdf", "website"]
+    patterns: list[str] = ["sample_data/*.pdf"]
+    base_url: Optional[str] = None
 
 
 @ai_router.get("/")
@@ -64,17 +101,12 @@ async def welcome():
 
 
 @ai_router.post("/chat")
-async def chat(input: ChatInput):
-    global graph
+async def chat(input: ChatInput, request: Request):
+    graph = request.app.state.graph
     try:
-        async with database_connection_pool.connection() as conn:
-            saver = AsyncPostgresSaver(conn)
-            await saver.setup()
-            graph = compile_graph(saver)
-
-        response = await graph.ainvoke(  # type: ignore
+        response = await graph.ainvoke(
             {"messages": input.messages},
-            config={"configurable": {"thread_id": input.thread_id}},
+            config={"configurable": {"thread_id": input.thread_id, "user_id": input.user_id}},
         )
         logging.info(f"Response: {response['messages']}")
         return response["messages"][-1].content
@@ -84,4 +116,48 @@ async def chat(input: ChatInput):
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
+@ai_router.post("/chat/stream")
+async def chat_stream(input: ChatInput, request: Request):
+    return StreamingResponse(
+        stream_chat_events(
+            request.app.state.graph,
+            {"messages": input.messages},
+            {"configurable": {"thread_id": input.thread_id, "user_id": input.user_id}},
+            request,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@ai_router.get("/checkpoints/retention")
+async def checkpoint_retention():
+    return retention_stats
+
+
+@ai_router.post("/ingest/jobs", status_code=202)
+async def submit_ingest_job(input: IngestJobInput):
+    params = {"patterns": input.patterns} if input.kind == "pdf" else {"base_url": input.base_url}
+    return job_queue.submit(input.kind, params).progress()
+
+
+@ai_router.get("/ingest/jobs")
+async def list_ingest_jobs():
+    return [job.progress() for job in job_queue.list()]
+
+
+@ai_router.get("/ingest/jobs/{job_id}")
+async def get_ingest_job(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.progress()
+
+
+@ai_router.get("/metrics")
+async def ai_metrics():
+    return {**metrics.snapshot(), "resource_init_seconds": init_timings()}
+
+
 app.include_router(ai_router)
+app.include_router(dashboard_router)